@@ -0,0 +1,25 @@
+"""
+Общая подготовка бенчмарков: корень репозитория в sys.path, BOT_TOKEN для
+config и временная БД со всеми миграциями.
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('BOT_TOKEN', 'benchmark')
+
+
+def use_temp_db(name: str = 'bench.db') -> str:
+    """Направить database.py во временный файл БД; возвращает путь"""
+    import database
+    path = os.path.join(tempfile.mkdtemp(prefix='bot-bench-'), name)
+    database.DB_PATH = path
+    return path
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Перцентиль по отсортированной копии values"""
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
@@ -0,0 +1,45 @@
+"""
+Задержка вызова функций database.py: временное соединение на каждый вызов
+(поведение без пула, как до пула соединений) против общего пула.
+
+    python benchmarks/db_pool.py [--reads 500] [--writes 200]
+"""
+import argparse
+import asyncio
+import time
+
+import _common
+import database
+
+
+async def measure(label: str, reads: int, writes: int):
+    started = time.perf_counter()
+    for _ in range(reads):
+        await database.get_appointment_by_id(1)
+        await database.get_question_by_id(1)
+    read_us = (time.perf_counter() - started) / (2 * reads) * 1e6
+
+    started = time.perf_counter()
+    for _ in range(writes):
+        await database.create_appointment(2, 'Консультация', 'Клиент', '+79990000000')
+    write_us = (time.perf_counter() - started) / writes * 1e6
+    print(f"{label:24s} чтение {read_us:7.0f} мкс/вызов, запись {write_us:7.0f} мкс/вызов")
+
+
+async def main(reads: int, writes: int):
+    _common.use_temp_db()
+    await database.init_db()
+    await measure('соединение на вызов', reads, writes)
+    await database.init_db_pool()
+    try:
+        await measure('пул соединений', reads, writes)
+    finally:
+        await database.close_db_pool()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reads', type=int, default=500)
+    parser.add_argument('--writes', type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.reads, args.writes))
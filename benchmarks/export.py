@@ -0,0 +1,82 @@
+"""
+Экспорт заявок в CSV на большой таблице: время, размер файла, пиковый RSS
+процесса и самая длинная пауза event loop во время выгрузки. С --inline
+запись в файл выполняется прямо в event loop, как до переноса в поток.
+
+    python benchmarks/export.py [--rows 1000000] [--inline]
+"""
+import argparse
+import asyncio
+import resource
+import sqlite3
+import time
+from contextlib import nullcontext
+from unittest import mock
+
+import _common
+import database
+from utils import export
+
+STATUSES = ('pending', 'confirmed', 'cancelled', 'completed', 'payment_sent')
+
+
+def fill(path: str, rows: int):
+    """Заполнить appointments напрямую через sqlite3 — быстрее, чем create_appointment"""
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            """INSERT INTO appointments (user_id, service_type, client_name, client_phone, client_email,
+                                         appointment_date, appointment_time, comment, status, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            ((i % 5000 + 1, '📋 Составление исковых заявлений', f'Иванов Иван Иванович {i}', f'+7999{i:07d}',
+              f'user{i}@example.com', f'2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}', f'{10 + i % 8}:00',
+              'Комментарий клиента; нужна консультация по "делу"', STATUSES[i % 5],
+              f'2026-01-01 {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}')
+             for i in range(rows))
+        )
+
+
+async def run_inline(func, *args):
+    return func(*args)
+
+
+async def main(rows: int, inline: bool):
+    path = _common.use_temp_db()
+    await database.init_db()
+    fill(path, rows)
+    await database.init_db_pool()
+
+    longest_pause = 0.0
+    stop = asyncio.Event()
+
+    async def watch_loop():
+        nonlocal longest_pause
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            longest_pause = max(longest_pause, time.perf_counter() - started - 0.005)
+
+    watcher = asyncio.create_task(watch_loop())
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    try:
+        with mock.patch.object(export.asyncio, 'to_thread', run_inline) if inline else nullcontext():
+            started = time.perf_counter()
+            file, _ = await export.export_appointments_csv()
+            elapsed = time.perf_counter() - started
+    finally:
+        stop.set()
+        await watcher
+        await database.close_db_pool()
+    with file:
+        size = export.export_size(file)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{rows} строк ({'запись в event loop' if inline else 'запись в потоке'}): {elapsed:.2f} с, "
+          f"файл {size / 2 ** 20:.1f} МБ, пиковый RSS {peak / 1024:.0f} МБ (до выгрузки {rss_before / 1024:.0f} МБ), "
+          f"самая длинная пауза event loop {longest_pause * 1e3:.1f} мс")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--inline', action='store_true', help='писать файл прямо в event loop')
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.inline))
@@ -0,0 +1,90 @@
+"""
+Стоимость проверки и память rate limiter: MemoryBackend (GCRA, LRU) против
+скользящего окна со списками отметок времени, как было до MemoryBackend.
+
+    python benchmarks/rate_limiter.py [--users 1000000] [--repeats 100000]
+"""
+import argparse
+import logging
+import time
+import tracemalloc
+from collections import defaultdict
+
+import _common  # noqa: F401
+from middleware.rate_limit_backends import MemoryBackend
+from middleware.rate_limiter import (
+    BLOCK_DURATION, MAX_MESSAGES_PER_MINUTE, MAX_MESSAGES_PER_SECOND, MAX_TRACKED_USERS, RATE_LIMIT_COST_BUDGET,
+)
+
+
+class SlidingWindow:
+    """Прежняя схема: список отметок времени за минуту на пользователя, записи не удаляются"""
+
+    def __init__(self):
+        self.times: dict[int, list[float]] = defaultdict(list)
+        self.blocked: dict[int, float] = {}
+
+    def check_at(self, user_id: int, cost: int, now: float) -> bool:
+        if user_id in self.blocked:
+            if now < self.blocked[user_id]:
+                return True
+            del self.blocked[user_id]
+            self.times[user_id] = []
+        times = [t for t in self.times[user_id] if now - t < 60]
+        self.times[user_id] = times
+        if (len([t for t in times if now - t < 1]) >= MAX_MESSAGES_PER_SECOND
+                or len(times) >= MAX_MESSAGES_PER_MINUTE):
+            self.blocked[user_id] = now + BLOCK_DURATION
+            return True
+        times.append(now)
+        return False
+
+
+def memory_backend(max_users: int) -> MemoryBackend:
+    return MemoryBackend(MAX_MESSAGES_PER_SECOND, MAX_MESSAGES_PER_MINUTE, BLOCK_DURATION,
+                         RATE_LIMIT_COST_BUDGET, max_users=max_users)
+
+
+def fill(limiter, users: int, now: float):
+    """Все пользователи пишут в пределах одной секунды"""
+    for user_id in range(users):
+        limiter.check_at(user_id, 1, now + user_id / users)
+
+
+def measure(label: str, factory, users: int, repeats: int):
+    now = time.monotonic()
+    started = time.perf_counter()
+    fill(factory(), users, now)
+    distinct_us = (time.perf_counter() - started) / users * 1e6
+
+    # Память — отдельным проходом: tracemalloc сильно замедляет сами проверки
+    tracemalloc.start()
+    limiter = factory()
+    fill(limiter, users, now)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del limiter
+
+    # Один активный пользователь в пределах лимита: сообщение раз в 4 с
+    limiter = factory()
+    started = time.perf_counter()
+    for i in range(repeats):
+        limiter.check_at(1, 1, now + i * 4)
+    repeat_us = (time.perf_counter() - started) / repeats * 1e6
+    print(f"{label:28s} {distinct_us:5.2f} мкс/проверка, состояние {memory / 2 ** 20:5.0f} МБ; "
+          f"повторный пользователь {repeat_us:5.2f} мкс/проверка")
+
+
+def main(users: int, repeats: int):
+    logging.disable(logging.CRITICAL)
+    measure('скользящее окно', SlidingWindow, users, repeats)
+    measure('MemoryBackend без предела', lambda: memory_backend(users + 1), users, repeats)
+    measure(f'MemoryBackend, {MAX_TRACKED_USERS} польз.', lambda: memory_backend(MAX_TRACKED_USERS), users, repeats)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--repeats', type=int, default=100_000)
+    args = parser.parse_args()
+    main(args.users, args.repeats)
@@ -0,0 +1,87 @@
+"""
+Рассылка напоминаний: последовательный цикл (отправка, UPDATE на каждое
+напоминание, пауза 0.1 с — как до ReminderDispatcher) против диспетчера.
+Бот поддельный: каждая отправка занимает --latency секунд, одна отправка
+диспетчера получает RetryAfter на 1 с.
+
+    python benchmarks/reminder_dispatch.py [--reminders 300] [--old 50] [--latency 0.05]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+import _common
+import database
+from scheduler import ReminderDispatcher, send_reminder
+from telegram.error import RetryAfter
+
+
+class FakeBot:
+    def __init__(self, latency: float, retry_after_on: int | None = None):
+        self.latency = latency
+        self.retry_after_on = retry_after_on
+        self.calls = 0
+        self.sent_at: list[float] = []
+
+    async def send_message(self, chat_id: int, text: str, **kwargs):
+        await asyncio.sleep(self.latency)
+        self.calls += 1
+        if self.calls == self.retry_after_on:
+            raise RetryAfter(1)
+        self.sent_at.append(time.monotonic())
+
+
+async def create_reminders(count: int) -> list[dict]:
+    reminder_ids = []
+    for i in range(count):
+        appointment_id = await database.create_appointment(1000 + i, 'Консультация', 'Клиент', '+79990000000',
+                                                           appointment_date='2030-01-02', appointment_time='12:00')
+        reminder_ids.append(await database.create_reminder(appointment_id, 'day_before', datetime(2030, 1, 1)))
+    return await database.get_reminders_by_ids(reminder_ids)
+
+
+async def old_loop(reminders: list[dict], latency: float) -> float:
+    bot = FakeBot(latency)
+    started = time.monotonic()
+    for reminder in reminders:
+        status = await send_reminder(bot, reminder)
+        await database.mark_reminder_sent(reminder['id'], status)
+        await asyncio.sleep(0.1)
+    return len(reminders) / (time.monotonic() - started)
+
+
+async def dispatcher(reminders: list[dict], latency: float) -> tuple[float, int]:
+    bot = FakeBot(latency, retry_after_on=len(reminders) // 3)
+    started = time.monotonic()
+    await ReminderDispatcher(bot).dispatch(reminders)
+    rate = len(reminders) / (time.monotonic() - started)
+    # Наибольшее число сообщений в любом окне длиной 1 с
+    peak = max(sum(1 for t in bot.sent_at if start <= t < start + 1) for start in bot.sent_at)
+    return rate, peak
+
+
+async def main(count: int, old_count: int, latency: float):
+    _common.use_temp_db()
+    await database.init_db_pool()
+    try:
+        await database.init_db()
+        reminders = await create_reminders(count)
+        print(f"последовательный цикл: {await old_loop(reminders[:old_count], latency):5.1f} сообщ./с "
+              f"({old_count} напоминаний)")
+
+        rate, peak = await dispatcher(reminders, latency)
+        pending = len(await database.get_scheduled_reminders())
+        print(f"ReminderDispatcher:    {rate:5.1f} сообщ./с ({count} напоминаний, RetryAfter 1 с), "
+              f"пик {peak} сообщ. за 1 с, осталось pending: {pending}")
+    finally:
+        await database.close_db_pool()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reminders', type=int, default=300)
+    parser.add_argument('--old', type=int, default=50, help='сколько напоминаний прогнать старым циклом')
+    parser.add_argument('--latency', type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(main(args.reminders, args.old, args.latency))
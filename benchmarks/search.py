@@ -0,0 +1,58 @@
+"""
+Поиск услуг по каталогу data/catalog.json: задержка запросов (названия
+услуг, слова словаря индекса, слова с пропущенной буквой, случайные
+запросы из трёх слов), попадание названия на первое место и время
+построения индекса.
+
+    python benchmarks/search.py [--random 500] [--seed 1]
+"""
+import argparse
+import random
+import time
+
+import _common
+from data.catalog import get_catalog
+from data.search import SearchIndex
+
+
+def typo(word: str, rng: random.Random) -> str:
+    """Слово с одной пропущенной буквой (первая и последняя остаются)"""
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1:]
+
+
+def main(random_queries: int, seed: int):
+    rng = random.Random(seed)
+    catalog = get_catalog()
+    index = catalog.search_index
+    vocabulary = sorted(index._postings)
+    names = [service.name for service in catalog.services.values()]
+    queries = (names + vocabulary + [typo(word, rng) for word in vocabulary]
+               + [' '.join(rng.sample(vocabulary, 3)) for _ in range(random_queries)])
+
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        catalog.search(query)
+        latencies.append((time.perf_counter() - started) * 1e3)
+    print(f"{len(queries)} запросов, {len(names)} услуг, {len(vocabulary)} слов в индексе: "
+          f"p50 {_common.percentile(latencies, 0.5):.3f} мс, p99 {_common.percentile(latencies, 0.99):.3f} мс, "
+          f"max {max(latencies):.3f} мс")
+
+    found = sum(1 for name in names if [service.name for service in catalog.search(name, limit=1)] == [name])
+    print(f"название услуги на первом месте: {found} из {len(names)}")
+
+    started = time.perf_counter()
+    for _ in range(10):
+        SearchIndex(catalog.services.values())
+    print(f"построение индекса: {(time.perf_counter() - started) / 10 * 1e3:.1f} мс")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--random', type=int, default=500, help='сколько случайных запросов из трёх слов')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    main(args.random, args.seed)
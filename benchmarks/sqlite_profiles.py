@@ -0,0 +1,64 @@
+"""
+Смешанная нагрузка на пул: читатели (get_pending_appointments) параллельно
+с писателем (create_appointment + update_appointment_status) при разных
+journal_mode/synchronous.
+
+    python benchmarks/sqlite_profiles.py [--seconds 3] [--readers 4] [--rows 2000]
+"""
+import argparse
+import asyncio
+
+import _common
+import database
+
+# (journal_mode, synchronous): старое поведение SQLite по умолчанию и профиль balanced
+MODES = (('DELETE', 'FULL'), ('WAL', 'NORMAL'))
+
+
+async def run(journal_mode: str, synchronous: str, seconds: float, readers: int, rows: int):
+    _common.use_temp_db()
+    database.SQLITE_PRAGMAS.update(journal_mode=journal_mode, synchronous=synchronous)
+    await database.init_db_pool(readers)
+    try:
+        await database.init_db()
+        for i in range(rows):
+            await database.create_appointment(i, 'Консультация', 'Клиент', '+79990000000')
+
+        stop = asyncio.Event()
+        counts = {'reads': 0, 'writes': 0}
+
+        async def reader():
+            while not stop.is_set():
+                await database.get_pending_appointments()
+                counts['reads'] += 1
+
+        async def writer():
+            while not stop.is_set():
+                appointment_id = await database.create_appointment(1, 'Консультация', 'Клиент', '+79990000000')
+                await database.update_appointment_status(appointment_id, 'confirmed')
+                counts['writes'] += 1
+
+        tasks = [asyncio.create_task(reader()) for _ in range(readers)] + [asyncio.create_task(writer())]
+        await asyncio.sleep(seconds)
+        stop.set()
+        await asyncio.gather(*tasks)
+        pragmas = (await database.get_db_settings())['pragmas']
+    finally:
+        await database.close_db_pool()
+    print(f"{journal_mode}/{synchronous}: чтений {counts['reads'] / seconds:6.1f}/с, "
+          f"пар записей {counts['writes'] / seconds:6.1f}/с "
+          f"(journal_mode={pragmas['journal_mode']}, synchronous={pragmas['synchronous']})")
+
+
+async def main(seconds: float, readers: int, rows: int):
+    for journal_mode, synchronous in MODES:
+        await run(journal_mode, synchronous, seconds, readers, rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--rows', type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.seconds, args.readers, args.rows))
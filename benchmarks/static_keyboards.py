@@ -0,0 +1,64 @@
+"""
+Клавиатура на одну отправку: вызов функции клавиатуры плюс сериализация
+reply_markup так, как это делает Bot._post (RequestParameter → RequestData).
+Сравнивается с поведением без keyboards/static.py: клавиатура строится
+заново на каждый вызов, to_dict() обходит все кнопки при каждой отправке.
+
+    python benchmarks/static_keyboards.py [--repeats 5000]
+"""
+import argparse
+import timeit
+from unittest import mock
+
+import _common  # noqa: F401
+from telegram import TelegramObject
+from telegram.request import RequestData
+from telegram.request._requestparameter import RequestParameter
+
+from data.catalog import get_catalog
+from keyboards.admin import admin_keyboard, all_appointments_filter_keyboard, export_keyboard
+from keyboards.main_menu import main_menu_keyboard
+from keyboards.services import _subcategory_markup, services_keyboard, subcategory_keyboard
+from keyboards.static import _CachedPayloadMixin
+
+# Название → (клавиатура как сейчас, та же клавиатура без кэша)
+CASES = {
+    'главное меню': (main_menu_keyboard, main_menu_keyboard.__wrapped__),
+    'админ-панель': (admin_keyboard, admin_keyboard.__wrapped__),
+    'категории услуг': (services_keyboard, services_keyboard.__wrapped__),
+    'экспорт': (export_keyboard, export_keyboard.__wrapped__),
+    'фильтр по статусу': (all_appointments_filter_keyboard, all_appointments_filter_keyboard.__wrapped__),
+    'подкатегории': (lambda: subcategory_keyboard('entrepreneurs'),
+                     lambda: _subcategory_markup(get_catalog(), 'entrepreneurs')),
+}
+
+
+def send(markup) -> str:
+    """Параметры запроса sendMessage в JSON, как перед отправкой в Bot API"""
+    data = RequestData([
+        RequestParameter.from_input('chat_id', 1),
+        RequestParameter.from_input('text', 'Текст'),
+        RequestParameter.from_input('reply_markup', markup),
+    ])
+    return data.json_parameters
+
+
+def measure(keyboard, repeats: int) -> float:
+    return min(timeit.repeat(lambda: send(keyboard()), number=repeats, repeat=5)) / repeats * 1e6
+
+
+def main(repeats: int):
+    for label, (cached, uncached) in CASES.items():
+        after = measure(cached, repeats)
+        # Без кэша: словарь не считается заранее, to_dict() каждый раз обходит кнопки
+        with mock.patch.object(_CachedPayloadMixin, '_cache_payload', lambda self: None), \
+                mock.patch.object(_CachedPayloadMixin, 'to_dict', TelegramObject.to_dict):
+            before = measure(uncached, repeats)
+        print(f"{label:18s} без кэша {before:6.1f} мкс → статическая {after:6.1f} мкс")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=5000)
+    args = parser.parse_args()
+    main(args.repeats)
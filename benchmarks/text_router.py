@@ -0,0 +1,88 @@
+"""
+Выбор обработчика для текстового update: проход check_update по группе 0
+обработчиков из bot.py. С --baseline сравнивает с bot.py из указанной
+ревизии git (например, последней до handlers/text_router.py).
+
+    python benchmarks/text_router.py [--baseline REV] [--repeats 20000]
+"""
+import argparse
+import importlib.util
+import logging
+import os
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from unittest import mock
+
+import _common
+from telegram import Chat, Message, Update, User
+from telegram.ext import Application
+
+TEXTS = {
+    'первая кнопка меню': '🏠 Главное меню',
+    'последняя кнопка меню': '🔙 Назад к услугам',
+    'кнопка администратора': '📥 Экспорт данных',
+    'вход в диалог': '❓ Задать вопрос',
+    'свободный текст': 'Составление договора',
+}
+
+
+def load_handlers(path: str, name: str) -> list:
+    """Выполнить main() из bot.py без запуска бота и вернуть обработчики группы 0"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    captured = {}
+    with mock.patch.object(Application, 'run_polling', lambda self, *args, **kwargs: captured.setdefault('app', self)), \
+            mock.patch.object(module, 'WEBHOOK_URL', None, create=True):
+        module.main()
+    return captured['app'].handlers[0]
+
+
+def select(handlers: list, update: Update):
+    for handler in handlers:
+        check = handler.check_update(update)
+        if check is not None and check is not False:
+            return handler
+    return None
+
+
+def handler_name(handler) -> str:
+    callback = getattr(handler, 'callback', None)
+    return getattr(callback, '__name__', type(handler).__name__)
+
+
+def main(baseline: str | None, repeats: int):
+    logging.disable(logging.WARNING)
+    variants = {'текущий': load_handlers(os.path.join(_common.ROOT, 'bot.py'), 'bot_current')}
+    if baseline:
+        source = subprocess.run(['git', 'show', f'{baseline}:bot.py'], cwd=_common.ROOT,
+                                check=True, capture_output=True).stdout
+        with tempfile.NamedTemporaryFile('wb', suffix='.py', delete=False) as f:
+            f.write(source)
+        try:
+            variants = {baseline: load_handlers(f.name, 'bot_baseline'), **variants}
+        finally:
+            os.unlink(f.name)
+
+    for update_id, (label, text) in enumerate(TEXTS.items(), start=1):
+        user = User(1, 'Клиент', False)
+        update = Update(update_id, message=Message(update_id, datetime.now(), Chat(1, 'private'),
+                                                   from_user=user, text=text))
+        results = []
+        for name, handlers in variants.items():
+            started = time.perf_counter()
+            for _ in range(repeats):
+                chosen = select(handlers, update)
+            results.append(f"{name} {(time.perf_counter() - started) / repeats * 1e6:6.2f} мкс "
+                           f"[{handler_name(chosen)}]")
+        print(f"{label:22s} " + ' → '.join(results))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--baseline', help='ревизия git, bot.py из которой сравнивается с текущим')
+    parser.add_argument('--repeats', type=int, default=20000)
+    args = parser.parse_args()
+    main(args.baseline, args.repeats)
@@ -6,7 +6,6 @@ Telegram бот для юридической компании "Ваш юрис
 import asyncio
 import signal
 import sys
-import time
 import logging
 from telegram import Update
 from telegram.error import Conflict
@@ -16,27 +15,25 @@ from telegram.ext import (
     CommandHandler,
     MessageHandler,
     CallbackQueryHandler,
+    InlineQueryHandler,
     filters,
     ContextTypes,
-    ConversationHandler
+    ConversationHandler,
+    TypeHandler
 )
 
-from config import BOT_TOKEN
-from database import init_db
-from middleware import rate_limit_middleware
+from config import BOT_TOKEN, WEBHOOK_URL
+from database import init_db, init_db_pool, close_db_pool, load_admin_cache
+from middleware import rate_limit_middleware, close_rate_limiter
 from healthcheck import set_bot_started, set_bot_stopped, update_last_activity, start_health_server, stop_health_server
 from handlers import (
     start_handler,
     main_menu_handler,
-    services_handler,
-    legal_entities_handler,
-    entrepreneurs_handler,
-    individuals_handler,
     service_detail_handler,
     service_callback_handler,
+    inline_search_handler,
     appointment_handler,
     process_appointment,
-    my_appointments_handler,
     process_simple_appointment,
     SIMPLE_APPOINTMENT_STATES,
     submit_appointment_callback,
@@ -44,16 +41,20 @@ from handlers import (
     question_handler,
     process_question,
     admin_handler,
-    admin_commands_handler,
     admin_callback_handler,
+    reload_catalog_handler,
     admin_reply_handler,
-    contacts_handler,
-    about_handler,
     unified_message_handler,
     help_handler,
     menu_handler,
 )
+from handlers.text_router import menu_router, menu_route_filter, menu_label_filter
 from scheduler import start_reminder_scheduler, stop_reminder_scheduler
+from startup import mark_initialized, record_first_update, polling_error_callback, UpdatesRequest
+from metrics import count_update, instrument_application
+from loop_monitor import start_loop_monitor, stop_loop_monitor
+from update_processor import create_update_processor
+from data.catalog import start_catalog_watcher, stop_catalog_watcher
 from handlers.appointment import APPOINTMENT_STATES
 from handlers.question import QUESTION_STATES
 
@@ -68,21 +69,36 @@ def main():
     """Основная функция запуска бота"""
     
     # Создаем приложение
-    application = Application.builder().token(BOT_TOKEN).build()
+    # UpdatesRequest запоминает время последнего getUpdates для /ready;
+    # update разных пользователей обрабатываются параллельно, одного — по очереди
+    application = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .get_updates_request(UpdatesRequest())
+        .concurrent_updates(create_update_processor())
+        .build()
+    )
     
-    # Хранилище для health check runner и планировщика
+    # Хранилище для health check runner, планировщика и слежения за каталогом
     health_runner = None
     reminder_task = None
+    catalog_task = None
 
     # Инициализация БД и health check
     async def post_init(app: Application) -> None:
-        nonlocal health_runner, reminder_task
+        nonlocal health_runner, reminder_task, catalog_task
+        start_loop_monitor()
+        await init_db_pool()
         await init_db()
+        await load_admin_cache()
         logger.info("База данных инициализирована")
 
+        # Каталог услуг загружается сразу, дальше — перезагрузка при изменении файла
+        catalog_task = start_catalog_watcher()
+
         # Запускаем health check сервер
         try:
-            health_runner = await start_health_server(port=8080)
+            health_runner = await start_health_server(port=8080, telegram_app=app)
             set_bot_started()
         except Exception as e:
             logger.warning(f"Не удалось запустить health check сервер: {e}")
@@ -94,16 +110,22 @@ def main():
         except Exception as e:
             logger.warning(f"Не удалось запустить планировщик напоминаний: {e}")
 
+        mark_initialized()
+
     application.post_init = post_init
 
     # Graceful shutdown
     async def post_shutdown(app: Application) -> None:
-        nonlocal health_runner, reminder_task
+        nonlocal health_runner, reminder_task, catalog_task
         set_bot_stopped()
         if reminder_task:
             stop_reminder_scheduler(reminder_task)
+        await stop_catalog_watcher(catalog_task)
         if health_runner:
             await stop_health_server(health_runner)
+        await close_db_pool()
+        close_rate_limiter()
+        stop_loop_monitor()
         logger.info("Бот остановлен корректно")
 
     application.post_shutdown = post_shutdown
@@ -113,12 +135,15 @@ def main():
         """Обработчик для проверки rate limit"""
         # Обновляем время последней активности для health check
         update_last_activity()
+        record_first_update()
+        count_update(update)
 
         if await rate_limit_middleware(update, context):
             # Если лимит превышен, прерываем обработку
             raise ApplicationHandlerStop()
 
-    application.add_handler(MessageHandler(filters.ALL, rate_limit_handler), group=-1)
+    # TypeHandler(Update) — лимит действует и на нажатия inline-кнопок, а не только на сообщения
+    application.add_handler(TypeHandler(Update, rate_limit_handler), group=-1)
 
     # Обработчик команды /start
     application.add_handler(CommandHandler("start", start_handler))
@@ -127,31 +152,11 @@ def main():
     application.add_handler(CommandHandler("help", help_handler))
     application.add_handler(CommandHandler("menu", menu_handler))
     
-    # Обработчик главного меню (ДОЛЖЕН БЫТЬ ПЕРЕД unified_message_handler!)
-    # Обрабатывает оба варианта: "🏠 Главное меню" и "🔙 Главное меню"
-    application.add_handler(MessageHandler(filters.Regex("^(🏠 Главное меню|🔙 Главное меню)$"), main_menu_handler))
-    
-    # Обработчик контактов и о компании
-    application.add_handler(MessageHandler(filters.Regex("^📍 Контакты$"), contacts_handler))
-    application.add_handler(MessageHandler(filters.Regex("^ℹ️ О компании$"), about_handler))
+    # Кнопки меню: один обработчик с поиском текста кнопки в словаре
+    # (ДОЛЖЕН БЫТЬ ПЕРЕД диалогами и unified_message_handler!)
+    # Маршруты — handlers/text_router.py, кнопки входа в диалоги остаются в ConversationHandler
+    application.add_handler(MessageHandler(menu_route_filter, menu_router))
 
-    # Обработчик "Мои записи"
-    application.add_handler(MessageHandler(filters.Regex("^📝 Мои записи$"), my_appointments_handler))
-    
-    # Обработчик админ-панели (ДОЛЖЕН БЫТЬ ПЕРЕД универсальным обработчиком услуг!)
-    application.add_handler(MessageHandler(filters.Regex("^🔐 Админ-панель$"), admin_handler))
-    application.add_handler(MessageHandler(
-        filters.Regex("^(📋 Новые заявки|📁 Все заявки|📅 Календарь записей|📊 Статистика|📥 Экспорт данных)$"),
-        admin_commands_handler
-    ))
-    
-    # Обработчики услуг
-    application.add_handler(MessageHandler(filters.Regex("^📋 Наши услуги$"), services_handler))
-    application.add_handler(MessageHandler(filters.Regex("^👔 Юридическим лицам$"), legal_entities_handler))
-    application.add_handler(MessageHandler(filters.Regex("^💼 Предпринимателям$"), entrepreneurs_handler))
-    application.add_handler(MessageHandler(filters.Regex("^👤 Физическим лицам$"), individuals_handler))
-    application.add_handler(MessageHandler(filters.Regex("^🔙 Назад к услугам$"), services_handler))
-    
     # Обработчик записи на консультацию (ConversationHandler)
     appointment_conv = ConversationHandler(
         entry_points=[MessageHandler(filters.Regex("^📞 Записаться на консультацию$"), appointment_handler)],
@@ -180,7 +185,10 @@ def main():
     application.add_handler(appointment_conv)
     
     # Callback для услуг
-    application.add_handler(CallbackQueryHandler(service_callback_handler, pattern="^(start_appointment|back_to_services)$"))
+    application.add_handler(CallbackQueryHandler(service_callback_handler, pattern=r"^(start_appointment|back_to_services|svc_\d+)$"))
+    
+    # Inline-режим: поиск услуг (@бот запрос)
+    application.add_handler(InlineQueryHandler(inline_search_handler))
     
     # Callback для отправки/отмены заявки
     application.add_handler(CallbackQueryHandler(submit_appointment_callback, pattern="^submit_appointment$"))
@@ -201,6 +209,8 @@ def main():
     
     # Команда /admin для администраторов
     application.add_handler(CommandHandler("admin", admin_handler))
+    # Перечитать каталог услуг и цен (data/catalog.json) без перезапуска
+    application.add_handler(CommandHandler("reload_catalog", reload_catalog_handler))
     
     # Универсальный обработчик сообщений
     # Объединяет логику process_simple_appointment и service_detail_handler
@@ -209,68 +219,35 @@ def main():
     application.add_handler(MessageHandler(
         filters.TEXT &
         ~filters.COMMAND &
-        ~filters.Regex("^(🏠 Главное меню|🔙 Главное меню|📋 Наши услуги|👔 Юридическим лицам|💼 Предпринимателям|👤 Физическим лицам|🔙 Назад к услугам|📍 Контакты|ℹ️ О компании|📞 Записаться на консультацию|📝 Мои записи|❓ Задать вопрос|🔐 Админ-панель|📋 Новые заявки|📁 Все заявки|📅 Календарь записей|📊 Статистика|📥 Экспорт данных)$"),
+        ~menu_label_filter,
         unified_message_handler
     ))
     
     # Callback для админ-панели (admin_, appt_, q_, export_, allappt_)
     application.add_handler(CallbackQueryHandler(admin_callback_handler, pattern="^(admin_|appt_|q_|export_|allappt_)"))
-    
-    # Принудительный сброс сессии и удаление webhook перед запуском
-    import httpx
-    logger.info("Сброс сессии Telegram API...")
-
-    def reset_telegram_session():
-        """Сбрасывает сессию Telegram API"""
-        with httpx.Client(timeout=30.0) as client:
-            # Удаляем webhook и сбрасываем pending updates
-            resp = client.post(
-                f"https://api.telegram.org/bot{BOT_TOKEN}/deleteWebhook",
-                params={"drop_pending_updates": True}
-            )
-            logger.info(f"deleteWebhook: {resp.json()}")
 
-            # Делаем несколько коротких getUpdates чтобы "перехватить" сессию
-            for i in range(3):
-                try:
-                    resp = client.post(
-                        f"https://api.telegram.org/bot{BOT_TOKEN}/getUpdates",
-                        params={"offset": -1, "timeout": 1}
-                    )
-                    data = resp.json()
-                    if data.get('ok'):
-                        logger.info(f"getUpdates #{i+1}: OK")
-                    else:
-                        logger.warning(f"getUpdates #{i+1}: {data}")
-                except Exception as e:
-                    logger.warning(f"getUpdates #{i+1} error: {e}")
-                time.sleep(1)
+    # Замер времени всех обработчиков для /metrics
+    instrument_application(application)
 
-    try:
-        reset_telegram_session()
-    except Exception as e:
-        logger.warning(f"Ошибка сброса сессии: {e}")
-
-    # Ждём чтобы Telegram API освободил старую сессию
-    # 10 секунд обычно достаточно для завершения предыдущего polling
-    startup_delay = 10
-    logger.info(f"Ожидание {startup_delay} секунд перед запуском polling...")
-    time.sleep(startup_delay)
-
-    # Повторный сброс перед запуском
-    try:
-        reset_telegram_session()
-    except Exception as e:
-        logger.warning(f"Ошибка повторного сброса сессии: {e}")
+    # Режим webhook: update принимает health check сервер, polling не нужен
+    if WEBHOOK_URL:
+        from webhook import run_webhook
+        logger.info("Бот запущен (webhook)")
+        asyncio.run(run_webhook(application))
+        return
 
     # Запуск бота с обработкой сигналов для graceful shutdown
     logger.info("Бот запущен")
 
-    # run_polling уже обрабатывает SIGINT и SIGTERM корректно
+    # run_polling уже обрабатывает SIGINT и SIGTERM корректно.
+    # Webhook удаляется при старте polling (drop_pending_updates), а если старый
+    # экземпляр ещё не отпустил getUpdates, Updater повторяет запрос на Conflict
+    # с нарастающей задержкой — отдельный сброс сессии и паузы не нужны
     application.run_polling(
         allowed_updates=Update.ALL_TYPES,
         drop_pending_updates=True,  # Игнорируем сообщения, пришедшие пока бот был выключен
-        close_loop=False  # Не закрываем event loop автоматически
+        close_loop=False,  # Не закрываем event loop автоматически
+        error_callback=polling_error_callback
     )
 
 
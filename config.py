@@ -1,5 +1,6 @@
 import os
 import sys
+import secrets
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -23,14 +24,136 @@ if not BOT_TOKEN:
 # База данных
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///bot_database.db')
 
+# Количество соединений-читателей в пуле БД (писатель всегда один)
+DB_POOL_READERS = int(os.getenv('DB_POOL_READERS', '4'))
+
+# Профили настройки SQLite (PRAGMA применяются к каждому соединению пула)
+# balanced — WAL + synchronous=NORMAL: читатели не блокируются писателем
+# safe     — WAL + synchronous=FULL: максимальная устойчивость к сбою питания
+# fast     — минимум fsync, больше памяти под кеш (для тестовых стендов)
+SQLITE_PROFILES = {
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,      # ~16 МБ (отрицательное значение — в КиБ)
+        'mmap_size': 67108864,     # 64 МБ
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,      # мс
+    },
+    'safe': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -8000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 10000,
+    },
+    'fast': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -64000,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+}
+SQLITE_PROFILE = os.getenv('SQLITE_PROFILE', 'balanced')
+if SQLITE_PROFILE not in SQLITE_PROFILES:
+    print(f"ПРЕДУПРЕЖДЕНИЕ: неизвестный SQLITE_PROFILE '{SQLITE_PROFILE}', используется 'balanced'")
+    SQLITE_PROFILE = 'balanced'
+
+# Отдельные PRAGMA можно переопределить переменными SQLITE_<NAME>, например SQLITE_SYNCHRONOUS=FULL
+SQLITE_PRAGMAS = {
+    name: os.getenv(f'SQLITE_{name.upper()}', str(value))
+    for name, value in SQLITE_PROFILES[SQLITE_PROFILE].items()
+}
+
+# Режим webhook: если задан WEBHOOK_URL (публичный https-адрес, путь из него
+# становится эндпоинтом на порту health check), вместо polling используется webhook
+WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', '')
+if WEBHOOK_URL and not WEBHOOK_SECRET:
+    # Без общего секрета несколько экземпляров перезапишут токен друг друга
+    print("ПРЕДУПРЕЖДЕНИЕ: WEBHOOK_SECRET не задан, сгенерирован случайный токен для этого процесса")
+    WEBHOOK_SECRET = secrets.token_urlsafe(32)
+# Сколько принятых и ещё не обработанных update допускать, дальше webhook отвечает 503
+WEBHOOK_MAX_PENDING = int(os.getenv('WEBHOOK_MAX_PENDING', '100'))
+
+# Мониторинг event loop: как часто замерять задержку, после скольких секунд
+# блокировки записывать стек, и при каком lag (держащемся LOOP_LAG_MAX_DURATION
+# секунд) /ready начинает отвечать 503
+LOOP_LAG_INTERVAL = float(os.getenv('LOOP_LAG_INTERVAL', '0.5'))
+LOOP_STALL_THRESHOLD = float(os.getenv('LOOP_STALL_THRESHOLD', '0.5'))
+LOOP_LAG_MAX = float(os.getenv('LOOP_LAG_MAX', '0.25'))
+LOOP_LAG_MAX_DURATION = float(os.getenv('LOOP_LAG_MAX_DURATION', '30'))
+
+# Readiness (/ready): на сколько секунд кешировать результат проверок, предел
+# времени запроса к БД, допустимый возраст последнего ответа getUpdates и
+# сколько секунд может длиться один шаг планировщика напоминаний (рассылка)
+READY_CACHE_SECONDS = float(os.getenv('READY_CACHE_SECONDS', '5'))
+READY_DB_TIMEOUT = float(os.getenv('READY_DB_TIMEOUT', '1'))
+READY_UPDATES_MAX_AGE = float(os.getenv('READY_UPDATES_MAX_AGE', '60'))
+READY_SCHEDULER_MAX_BUSY = float(os.getenv('READY_SCHEDULER_MAX_BUSY', '900'))
+
+# Сколько update обрабатывать одновременно (update одного пользователя — всегда
+# по очереди) и сколько update может одновременно находиться в обработчике,
+# включая ожидающие очереди пользователя (остальные ждут семафор PTB; число
+# принятых update ограничивает только WEBHOOK_MAX_PENDING в режиме webhook)
+UPDATE_CONCURRENCY = int(os.getenv('UPDATE_CONCURRENCY', '16'))
+UPDATE_MAX_PENDING = int(os.getenv('UPDATE_MAX_PENDING', '1000'))
+# Сколько принятых и не обработанных update одного пользователя держать в очереди;
+# остальные отбрасываются, чтобы один пользователь не занял весь WEBHOOK_MAX_PENDING
+UPDATE_MAX_PER_USER = int(os.getenv('UPDATE_MAX_PER_USER', '20'))
+
+# Каталог услуг и цен (JSON). Файл проверяется каждые CATALOG_RELOAD_INTERVAL
+# секунд и при изменении перезагружается без перезапуска бота (0 — не следить)
+CATALOG_PATH = os.getenv('CATALOG_PATH') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'catalog.json')
+CATALOG_RELOAD_INTERVAL = float(os.getenv('CATALOG_RELOAD_INTERVAL', '10'))
+
 # Администраторы
 ADMIN_IDS = [int(admin_id) for admin_id in os.getenv('ADMIN_IDS', '').split(',') if admin_id.strip()]
 
+# Как часто (в секундах) перечитывать таблицу admins в кеш
+ADMIN_CACHE_TTL = int(os.getenv('ADMIN_CACHE_TTL', '300'))
+
+# Бюджет «стоимости» действий пользователя в минуту (отдельно от лимита сообщений)
+# и стоимость дорогих действий: префикс callback_data или точный текст кнопки.
+# RATE_LIMIT_COSTS дополняет/переопределяет значения по умолчанию, формат: export_=30,admin_back=1
+RATE_LIMIT_COST_BUDGET = int(os.getenv('RATE_LIMIT_COST_BUDGET', '60'))
+RATE_LIMIT_COSTS = {
+    'export_': 20,
+    'allappt_filter_': 5,
+    '📊 Статистика': 5,
+    '📅 Календарь записей': 3,
+    '📥 Экспорт данных': 2,
+}
+for item in os.getenv('RATE_LIMIT_COSTS', '').split(','):
+    if '=' in item:
+        key, cost = item.rsplit('=', 1)
+        RATE_LIMIT_COSTS[key.strip()] = int(cost)
+
+# Где хранить состояние rate limit: memory (в процессе) или sqlite (общий файл
+# для нескольких процессов бота, блокировки переживают перезапуск)
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+if RATE_LIMIT_BACKEND not in ('memory', 'sqlite'):
+    print(f"ПРЕДУПРЕЖДЕНИЕ: неизвестный RATE_LIMIT_BACKEND '{RATE_LIMIT_BACKEND}', используется 'memory'")
+    RATE_LIMIT_BACKEND = 'memory'
+RATE_LIMIT_DB_PATH = os.getenv('RATE_LIMIT_DB_PATH', 'rate_limits.db')
+
 # Настройки работы
 WORK_START_HOUR = int(os.getenv('WORK_START_HOUR', '10'))
 WORK_END_HOUR = int(os.getenv('WORK_END_HOUR', '18'))
 WORK_DAYS = [int(day) for day in os.getenv('WORK_DAYS', '1,2,3,4,5').split(',')]
 
+# Рассылка напоминаний: сколько отправок одновременно, общий лимит сообщений
+# в секунду (у Telegram ~30) и минимальный интервал между сообщениями в один чат
+REMINDER_CONCURRENCY = int(os.getenv('REMINDER_CONCURRENCY', '8'))
+REMINDER_RATE = float(os.getenv('REMINDER_RATE', '25'))
+REMINDER_CHAT_INTERVAL = float(os.getenv('REMINDER_CHAT_INTERVAL', '1'))
+
+# Сколько дней показывать в админском календаре записей
+CALENDAR_DAYS = int(os.getenv('CALENDAR_DAYS', '7'))
+
 # Контакты компании
 COMPANY_PHONE = '8 (812) 985-95-74'
 COMPANY_WEBSITE = 'https://vash-urist.spb.ru'
@@ -1,14 +1,20 @@
-from .prices import SERVICE_PRICES, get_service_info, get_all_service_names
-from .service_categories import (
-    INDIVIDUALS_CATEGORIES,
-    ENTREPRENEURS_CATEGORIES,
-    LEGAL_ENTITIES_CATEGORIES,
-    get_category_keyboard,
-    get_services_by_subcategory
+from .prices import DEFAULT_SERVICE_TEXT, get_service_info, get_all_service_names
+from .catalog import (
+    Service,
+    CatalogSnapshot,
+    get_catalog,
+    reload_catalog,
+    register_catalog_part,
+    get_service,
+    find_service,
+    get_subcategory_services,
+    search_services
 )
+from .service_categories import get_category_keyboard, get_services_by_subcategory
 
 __all__ = [
-    'SERVICE_PRICES', 'get_service_info', 'get_all_service_names',
-    'INDIVIDUALS_CATEGORIES', 'ENTREPRENEURS_CATEGORIES', 'LEGAL_ENTITIES_CATEGORIES',
-    'get_category_keyboard', 'get_services_by_subcategory'
+    'DEFAULT_SERVICE_TEXT', 'get_service_info', 'get_all_service_names',
+    'get_category_keyboard', 'get_services_by_subcategory',
+    'Service', 'CatalogSnapshot', 'get_catalog', 'reload_catalog', 'register_catalog_part',
+    'get_service', 'find_service', 'get_subcategory_services', 'search_services'
 ]
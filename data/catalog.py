@@ -0,0 +1,254 @@
+"""
+Каталог услуг: загрузка из data/catalog.json и индекс
+
+Файл каталога компилируется в неизменяемый снимок (CatalogSnapshot): услуги
+по целым ID, поиск по нормализованному названию, списки услуг подкатегорий,
+поисковый индекс и части, которые добавляют другие модули (клавиатуры —
+через register_catalog_part). ID задаются в файле и не меняются при правке
+каталога, поэтому кнопки svc_{ID} в старых сообщениях продолжают работать.
+
+Обработчики берут текущий снимок через get_catalog() — это чтение одной
+глобальной переменной, без блокировок. Перезагрузка (при изменении файла
+или по команде администратора) собирает новый снимок целиком и одним
+присваиванием заменяет старый; если файл с ошибкой, остаётся прежний снимок.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from types import MappingProxyType
+from typing import Callable, NamedTuple
+
+from config import CATALOG_PATH, CATALOG_RELOAD_INTERVAL
+from utils.text import normalize_label
+from .prices import DEFAULT_SERVICE_TEXT
+from .search import SearchIndex
+
+logger = logging.getLogger(__name__)
+
+
+class Service(NamedTuple):
+    """Услуга каталога; category и subcategory — первое место услуги в меню (или None)"""
+    id: int
+    name: str
+    category: str | None
+    subcategory: str | None
+    text: str
+
+
+# Эмодзи и знаки в начале названия кнопки: «🏷️ Регистрация товарного знака»
+_LEADING_SYMBOLS_RE = re.compile(r'^[^\w(]+')
+
+
+def label_key(text: str) -> str:
+    """Ключ для поиска услуги по тексту кнопки: без пробелов по краям, вариантов эмодзи и регистра"""
+    return normalize_label(text).casefold()
+
+
+def _bare_key(text: str) -> str:
+    """Ключ без эмодзи в начале — для названий, набранных вручную"""
+    return _LEADING_SYMBOLS_RE.sub('', label_key(text))
+
+
+class CatalogSnapshot:
+    """Скомпилированный каталог; после создания не изменяется"""
+
+    __slots__ = ('services', 'categories', 'menus', 'subcategory_services', 'search_index',
+                 'parts', 'mtime', 'loaded_at', '_ids_by_name', '_ids_by_label')
+
+    def __init__(self, data: dict, mtime: float | None = None):
+        services = {}
+        ids_by_name = {}
+        for item in data['services']:
+            service_id = item['id']
+            name = item['name']
+            if not isinstance(service_id, int) or service_id <= 0:
+                raise ValueError(f"Некорректный ID услуги: {service_id!r}")
+            if service_id in services:
+                raise ValueError(f"ID {service_id} повторяется")
+            if name in ids_by_name:
+                raise ValueError(f"Услуга «{name}» повторяется")
+            text = item.get('text')
+            if isinstance(text, list):
+                text = '\n'.join(text)
+            services[service_id] = (name, text or DEFAULT_SERVICE_TEXT.format(service_name=name))
+            ids_by_name[name] = service_id
+
+        categories = {}
+        menus = {}
+        subcategory_services = {}
+        placements = {}
+        for category, category_data in data['categories'].items():
+            menus[category] = tuple(self._resolve(ids_by_name, category_data.get('menu', []), category))
+            subcategories = {}
+            for subcategory, subcategory_data in category_data['subcategories'].items():
+                ids = tuple(self._resolve(ids_by_name, subcategory_data['services'], subcategory))
+                subcategories[subcategory] = subcategory_data['name']
+                subcategory_services[(category, subcategory)] = ids
+                for service_id in ids:
+                    placements.setdefault(service_id, (category, subcategory))
+            categories[category] = MappingProxyType(subcategories)
+
+        self.services = MappingProxyType({
+            service_id: Service(service_id, name, *placements.get(service_id, (None, None)), text)
+            for service_id, (name, text) in services.items()
+        })
+        # category → {subcategory: название подкатегории}
+        self.categories = MappingProxyType(categories)
+        # category → ID услуг reply-клавиатуры категории
+        self.menus = MappingProxyType(menus)
+        self.subcategory_services = MappingProxyType(subcategory_services)
+
+        by_label = {}
+        for name, service_id in ids_by_name.items():
+            by_label.setdefault(label_key(name), service_id)
+        # Названия без эмодзи — только если не совпадают с другим ключом
+        for name, service_id in ids_by_name.items():
+            by_label.setdefault(_bare_key(name), service_id)
+        self._ids_by_name = ids_by_name
+        self._ids_by_label = by_label
+
+        self.search_index = SearchIndex(self.services.values())
+        self.parts = MappingProxyType({name: build(self) for name, build in _parts.items()})
+        self.mtime = mtime
+        self.loaded_at = time.time()
+
+    @staticmethod
+    def _resolve(ids_by_name: dict, names: list, where: str):
+        for name in names:
+            if name not in ids_by_name:
+                raise ValueError(f"«{where}»: услуги «{name}» нет в списке services")
+            yield ids_by_name[name]
+
+    def get(self, service_id: int) -> Service | None:
+        """Услуга по ID"""
+        return self.services.get(service_id)
+
+    def find(self, label: str) -> Service | None:
+        """Услуга по тексту кнопки (точное совпадение или нормализованное название)"""
+        service_id = self._ids_by_name.get(label)
+        if service_id is None:
+            service_id = self._ids_by_label.get(label_key(label))
+            if service_id is None:
+                service_id = self._ids_by_label.get(_bare_key(label))
+        return self.services.get(service_id) if service_id is not None else None
+
+    def subcategory(self, category: str, subcategory: str) -> tuple[Service, ...]:
+        """Услуги подкатегории в порядке меню"""
+        return tuple(self.services[service_id]
+                     for service_id in self.subcategory_services.get((category, subcategory), ()))
+
+    def search(self, query: str, limit: int = 5) -> list[Service]:
+        """Нечёткий поиск по названиям и описаниям"""
+        return self.search_index.search(query, limit)
+
+
+# Части снимка, которые собирают другие модули: имя → функция(snapshot)
+_parts: dict[str, Callable[[CatalogSnapshot], object]] = {}
+
+_current: CatalogSnapshot | None = None
+
+
+def register_catalog_part(name: str, build: Callable[[CatalogSnapshot], object]):
+    """
+    Добавить в каждый снимок часть, построенную build(snapshot)
+    (например, клавиатуры). Если каталог уже загружен, он пересобирается.
+    """
+    global _current
+    _parts[name] = build
+    if _current is not None:
+        _current = load_catalog()
+
+
+def _read_catalog_file() -> dict:
+    with open(CATALOG_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _catalog_mtime() -> float | None:
+    try:
+        return os.stat(CATALOG_PATH).st_mtime
+    except OSError:
+        return None
+
+
+def load_catalog() -> CatalogSnapshot:
+    """Прочитать и скомпилировать файл каталога (без замены текущего снимка)"""
+    mtime = _catalog_mtime()
+    return CatalogSnapshot(_read_catalog_file(), mtime)
+
+
+def get_catalog() -> CatalogSnapshot:
+    """Текущий снимок каталога (при первом обращении загружается из файла)"""
+    global _current
+    snapshot = _current
+    if snapshot is None:
+        snapshot = _current = load_catalog()
+    return snapshot
+
+
+async def reload_catalog() -> CatalogSnapshot:
+    """
+    Перечитать каталог и атомарно заменить снимок.
+    При ошибке в файле исключение пробрасывается, текущий снимок не меняется.
+    """
+    global _current
+    snapshot = await asyncio.to_thread(load_catalog)
+    _current = snapshot
+    logger.info(f"Каталог услуг загружен: {len(snapshot.services)} услуг")
+    return snapshot
+
+
+async def _watch_catalog():
+    failed_mtime = None
+    while True:
+        await asyncio.sleep(CATALOG_RELOAD_INTERVAL)
+        mtime = _catalog_mtime()
+        # Файл с ошибкой не перечитываем, пока его не изменят ещё раз
+        if mtime is None or mtime == get_catalog().mtime or mtime == failed_mtime:
+            continue
+        try:
+            await reload_catalog()
+        except Exception as e:
+            failed_mtime = mtime
+            logger.error(f"Не удалось перезагрузить каталог {CATALOG_PATH}, остаётся прежний: {e}")
+
+
+def start_catalog_watcher() -> asyncio.Task | None:
+    """Следить за изменением файла каталога (CATALOG_RELOAD_INTERVAL секунд, 0 — не следить)"""
+    get_catalog()
+    if CATALOG_RELOAD_INTERVAL <= 0:
+        return None
+    return asyncio.create_task(_watch_catalog())
+
+
+async def stop_catalog_watcher(task: asyncio.Task | None):
+    """Остановить слежение за файлом каталога"""
+    if task and not task.done():
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+def get_service(service_id: int) -> Service | None:
+    """Услуга по ID"""
+    return get_catalog().get(service_id)
+
+
+def find_service(label: str) -> Service | None:
+    """Услуга по тексту кнопки (точное совпадение или нормализованное название)"""
+    return get_catalog().find(label)
+
+
+def get_subcategory_services(category: str, subcategory: str) -> tuple[Service, ...]:
+    """Услуги подкатегории в порядке меню"""
+    return get_catalog().subcategory(category, subcategory)
+
+
+def search_services(query: str, limit: int = 5) -> list[Service]:
+    """Найти услуги по свободному тексту"""
+    return get_catalog().search(query, limit)
@@ -1,534 +1,10 @@
 """
 Прайс-лист услуг юридической компании
-Вынесен в отдельный файл для удобства редактирования
-"""
-
-# Информация об услугах - ФИЗИЧЕСКИЕ ЛИЦА
-INDIVIDUALS_SERVICES = {
-    '💬 Консультации юриста': """
-💬 Устные консультации (для физических лиц)
-
-Продолжительность до 60 минут, включая объяснение ситуации для подготовки документов.
-
-Категории дел:
-• Трудовое, семейное право
-• Налоговое, наследственное, административное
-• Гражданское, жилищное, земельное
-
-💰 Стоимость:
-• 7 000 ₽/час — стандартная консультация
-• 9 000 ₽/час — консультация по судебным делам (с ознакомлением с документами)
-• от 10 000 ₽/час — консультация Е.В. Гришиной
-
-📝 Письменные консультации (составление документов):
-• от 7 000 ₽ (в зависимости от сложности)
-• Срок подготовки: 2-3 рабочих дня
-
-Запишитесь на консультацию!
-""",
-    '📋 Составление исковых заявлений': """
-📋 Подготовка исковых заявлений (для физических лиц)
-
-Подготовка искового заявления, отзыва, ходатайств (без подачи):
-
-💰 Стоимость:
-• 7 000 ₽ — развод, алименты, вопросы отцовства
-• от 15 000 ₽ — взыскание долга с расчетом процентов, снятие с регистрационного учета, признание утратившим право на жилье, возмещение материального/морального вреда, споры со страховыми, налоговые споры
-• от 20 000 ₽ — наследственные дела, жилищные дела, споры с банками, трудовые споры
-
-📌 Алгоритм: консультация → подготовка иска
-Если нужна вторая встреча — дополнительная оплата как устной консультации.
-
-Запишитесь на консультацию!
-""",
-    '🏛️ Судебное сопровождение': """
-🏛️ Ведение дела в суде первой инстанции (для физических лиц)
-
-💰 Стоимость: от 50 000 ₽ (зависит от сложности дела)
-
-В стоимость включено:
-• Консультация
-• Ознакомление с документами
-• Подготовка искового заявления
-• Изготовление копий документов для суда
-• Подача искового заявления
-• Получение информации о деле в суде
-• Судебные заседания (до трёх)
-
-⚠️ При количестве заседаний более трёх — дополнительная оплата.
-❌ Исполнительное производство не включается.
-
-📍 Представительство в суде (отдельная оплата):
-• от 10 000 ₽ за заседание (мировые и районные суды СПб)
-• Доплата за выезд в пригороды СПб/Ленобласть: от 4 000 ₽
-
-⚠️ Если истец отказывается от иска, заключает мировое соглашение или заседание перенесено — деньги за заседание не возвращаются.
-
-Запишитесь на консультацию для оценки дела!
-""",
-    '📄 Подача иска в суд': """
-📄 Подача искового заявления в суд (для физических лиц)
-
-Территория СПб (кроме Кронштадта, Петергофа, Зеленогорска, Павловска, Пушкина, Колпино и др. городов в составе СПб).
-
-💰 Стоимость:
-• 7 000 ₽ — личная подача (за один выезд)
-• от 3 000 ₽ — подача электронно
-• от 5 000 ₽ — отправка почтой
-
-📍 Доплата за выезд в города СПб или Ленобласть (в пределах 2 часов от СПб): от 2 000 ₽
-
-Необходимые документы предоставляет клиент.
-
-Запишитесь на консультацию!
-""",
-    '📋 Ознакомление с делом': """
-📋 Ознакомление с материалами дела
-
-💰 Стоимость: 5 000 ₽/час
-
-Запишитесь на консультацию!
-""",
-    '📜 Получение решения суда': """
-📜 Получение решения и исполнительного листа (только СПб)
-
-💰 Стоимость:
-• 7 000 ₽ — заказ электронно + выезд в суд для получения документов
-• 10 000 ₽ — личная подача в службу судебных приставов + подготовка заявления на возбуждение исполнительного производства
-
-Запишитесь на консультацию!
-""",
-    '⚖️ Апелляция и кассация': """
-⚖️ Апелляционные и кассационные жалобы (для физических лиц)
-
-💰 Стоимость:
-• Подготовка жалобы: от 15 000 ₽
-• Представительство во второй инстанции: 14 000 ₽
-
-📋 Надзорные жалобы (в пределах СПб):
-• Подготовка жалобы: от 20 000 ₽
-• Представительство в надзорной инстанции: 14 000 ₽
-
-Запишитесь на консультацию!
-""",
-    '📊 Налоговые декларации 3-НДФЛ': """
-📊 Подготовка декларации 3-НДФЛ
-
-💰 Стоимость: от 3 500 ₽ за 1 декларацию за один год
-
-⏱️ Срок подготовки: 2-3 рабочих дня
-
-Запишитесь на консультацию!
-""",
-    '📝 Регистрация ИП': """
-📝 Регистрация физического лица в качестве ИП
-
-См. раздел «Для ИП» — услуги, связанные с регистрацией.
-
-Запишитесь на консультацию!
-""",
-    '📑 Анализ документов': """
-📑 Анализ письменного документа (договора, письма и т.д.)
-
-💰 Цена договорная — в зависимости от объема, сложности и срочности работы.
-• от 5 000 ₽ при объеме документа до 3 страниц
-
-Запишитесь на консультацию!
-""",
-    '🏠 Сделки с недвижимостью': """
-🏠 Сопровождение сделок с недвижимостью
-
-💰 Стоимость:
-• от 5 000 ₽ — анализ договора, дача рекомендаций клиенту
-• от 12 000 ₽ — приватизация (без учета пошлин, нотариуса)
-• от 10 000 ₽ — оформление документов в ФРС (проверка документов, подача и получение без учета пошлины, нотариуса)
-
-Запишитесь на консультацию!
-""",
-    '🚗 Выезд на проверку': """
-🚗 Выезд на проверку в гос. органы
-
-💰 Стоимость: от 7 000 ₽ за выезд
-
-Запишитесь на консультацию!
-""",
-    '📄 Ксерокопирование': """
-📄 Ксерокопирование документов
-
-💰 Стоимость: 25 ₽/страница
-
-📌 Ксерокопии паспорта, ИНН для регистрации ИП/ООО делаются бесплатно.
-
-Запишитесь на консультацию!
-""",
-    '⚡ Срочная подготовка': """
-⚡ Срочная подготовка документов
-
-💰 Надбавки за срочность:
-• В течение суток (24 часа): двойная цена
-• В течение рабочего дня (заказ не позже 15:00, на подготовку не менее 4 часов): тройная цена
-
-Запишитесь на консультацию!
-""",
-    '💻 Онлайн-консультация': """
-💻 Онлайн-консультация
-
-Юридическая консультация онлайн по видеосвязи, телефону или в мессенджерах.
-
-💰 Стоимость: по тарифам устных консультаций
-• 7 000 ₽/час — стандартная
-• от 10 000 ₽/час — консультация Е.В. Гришиной
-
-Запишитесь на консультацию!
-""",
-}
-
-# Услуги для ИП
-ENTREPRENEURS_SERVICES = {
-    '💬 Юридические консультации': """
-💬 Консультация по налогам и ведению деятельности ИП
-
-• Порядок ведения деятельности в качестве ИП
-• Уплата взносов в ПФР
-• Ведение отчетности
-
-💰 Стоимость: 3 000 ₽ за полчаса
-
-📌 Если после консультации обращаетесь за помощью в регистрации — эта сумма засчитывается в стоимость услуги по регистрации.
-
-Запишитесь на консультацию!
-""",
-    '📝 Регистрация ИП (подробно)': """
-📝 Регистрация в качестве ИП
-
-💰 Стоимость:
-• 4 000 ₽ — электронная процедура через госключ либо консультация и подготовка документов для самостоятельной подачи
-• 10 000 ₽ — личная подача по доверенности (консультация, подготовка документов, подача в налоговую)
-
-Запишитесь на консультацию!
-""",
-    '📄 Изменение ЕГРИП': """
-📄 Внесение изменений в сведения об ИП
-
-Изменение паспортных данных, кодов ОКВЭД.
-
-💰 Стоимость:
-• 2 500 ₽ — подготовка, подача через ЭЦП без подбора кодов ОКВЭД
-• Если необходим подбор кодов — оплачивается дополнительно как консультация
-
-Запишитесь на консультацию!
-""",
-    '🗑️ Ликвидация ИП': """
-🗑️ Ликвидация ИП
-
-💰 Стоимость: 3 000 ₽
-• Подготовка документов
-• Подача через ЭЦП
-
-Запишитесь на консультацию!
-""",
-    '💎 Регистрация ювелиров': """
-💎 Регистрация ювелиров в пробирной палате
-
-💰 Стоимость: 15 000 ₽
-
-Запишитесь на консультацию!
-""",
-    '📋 Регистрация в надзорных органах': """
-📋 Регистрация в надзорных органах
-
-• Роспотребнадзор
-• Надзор в сфере транспорта
-• Роскомнадзор
-• И другие
-
-💰 Стоимость: от 10 000 ₽
-
-Запишитесь на консультацию!
-""",
-    '🔒 Оператор персональных данных': """
-🔒 Подготовка документов оператора персональных данных
-
-💰 Стоимость: от 10 000 ₽
-
-Запишитесь на консультацию!
-""",
-    '💬 Консультации для ИП': """
-💬 Устные консультации для ИП
-
-💰 Стоимость:
-• 7 000 ₽/час — стандартная консультация
-• от 10 000 ₽/час — консультация Е.В. Гришиной
-
-📝 Письменные консультации (составление документов):
-• от 7 000 ₽ (в зависимости от сложности вопроса)
-• Если оформить как юридическое заключение на следующий день — двойной тариф
-
-Запишитесь на консультацию!
-""",
-    '📋 Составление договоров': """
-📋 Составление договоров для ИП
-
-💰 Стоимость: от 10 000 ₽ (в зависимости от вида договора и объема)
-💳 Аванс: 100%
 
-📑 Юридический анализ договора, изменения в текст, протокол разногласий:
-• от 5 000 ₽ (при объеме договора не более 3 страниц)
-• Срок: 3-4 рабочих дня
-
-Запишитесь на консультацию!
-""",
-    '👥 Оформление сотрудников': """
-👥 Оформление документов для приема сотрудника
-
-💰 Стоимость:
-• 5 000 ₽ — образцы документов
-• от 7 000 ₽ — подготовка и заполнение документов по представленным данным
-
-Запишитесь на консультацию!
-""",
-    '🏛️ Судебное сопровождение ИП': """
-🏛️ Ведение дела в суде первой инстанции (для ИП)
-
-💰 Стоимость: от 50 000 ₽ (зависит от сложности дела)
-
-В стоимость включено:
-• Консультация
-• Ознакомление с документами
-• Подготовка искового заявления
-• Изготовление копий документов для суда
-• Отправка документов участникам процесса
-• Подача искового заявления в суд
-• Получение информации о деле в суде
-• Судебные заседания (до пяти)
-
-⚠️ При количестве заседаний более пяти — дополнительная оплата.
-❌ Исполнительное производство не включается.
-
-📋 Подготовка искового заявления (отзыва и т.п.): от 10 000 ₽
-
-📍 Представительство в суде: 10 000 ₽ за заседание
-
-⚠️ Если истец отказывается от иска, заключает мировое соглашение или заседание перенесено — деньги за заседание не возвращаются.
-
-Запишитесь на консультацию!
-""",
-    '📄 Подача иска (ИП)': """
-📄 Подача искового заявления в суд (для ИП)
-
-Территория СПб (кроме пригородов).
-
-💰 Стоимость:
-• 7 000 ₽ — личная подача (за один выезд)
-• от 3 000 ₽ — подача электронно
-• от 5 000 ₽ — отправка почтой
-
-📍 Доплата за выезд в пригороды СПб/Ленобласть: от 2 000 ₽
-
-Запишитесь на консультацию!
-""",
-    '⚖️ Апелляция и кассация (ИП)': """
-⚖️ Апелляционные и кассационные жалобы (для ИП)
-
-В пределах города Санкт-Петербурга.
-
-💰 Стоимость:
-• Подготовка жалобы: от 10 000 ₽
-• Представительство во второй и последующих инстанциях: 15 000 ₽
-
-Запишитесь на консультацию!
-""",
-    '📊 Бухгалтерские услуги': """
-📊 Бухгалтерские услуги для ИП
-
-Зависят от системы налогообложения и количества работников.
-
-💰 Стоимость: от 5 000 ₽ в квартал
-
-📦 Тарифы на абонентское обслуживание:
-
-1️⃣ Тариф «Бухгалтерский» (для тех, у кого работники):
-• от 5 000 ₽/месяц
-
-2️⃣ Тариф «Годовая отчетность» (без работников):
-• при УСНО: 20 000 ₽/год (без НДС)
-• при патентной системе: 2 000 ₽/год
-
-Запишитесь на консультацию!
-""",
-    '🚗 Выезд к клиенту': """
-🚗 Выезд к клиенту
-
-💰 Стоимость: 5 000 ₽ + оплата за время работы
-
-🚨 Выезд на проверку в гос. органы: от 7 000 ₽
-
-Запишитесь на консультацию!
-""",
-}
-
-# Услуги для юридических лиц
-LEGAL_ENTITIES_SERVICES = {
-    '📝 Регистрация ООО': """
-📝 Регистрация юридических лиц
-
-💰 Стоимость: 10 000 ₽
-• Консультация
-• Подготовка документов для регистрации
-• При одном учредителе (стандартный устав)
-
-📌 При количестве учредителей свыше одного: +1 000 ₽ за каждого
-
-⏱️ Срок подготовки: 2-3 рабочих дня с момента предоставления документов
-
-⚡ Доплата за срочность (документы в день обращения): 5 000 ₽
-
-📄 Разработка индивидуального устава: от 10 000 ₽ (доплата)
-
-Запишитесь на консультацию!
-""",
-    '💬 Консультации для юрлиц': """
-💬 Устные консультации для юридических лиц
-
-💰 Стоимость:
-• 7 000 ₽/час — стандартная консультация
-• от 10 000 ₽/час — консультация Е.В. Гришиной
-
-📝 Письменные консультации (составление документов):
-• от 5 000 ₽ (в зависимости от сложности вопроса)
-• Срок подготовки: 4 рабочих дня
-• Если оформить как юридическое заключение в день обращения — двойной тариф
-
-Запишитесь на консультацию!
-""",
-    '📋 Составление договоров (юрлица)': """
-📋 Составление договоров для юридических лиц
-
-💰 Стоимость: от 12 000 ₽ (в зависимости от вида договора)
-💳 Аванс: 100%
-⏱️ Срок: 4 рабочих дня
-
-📑 Юридический анализ договора, изменения в текст, протокол разногласий:
-• от 5 000 ₽
-
-Запишитесь на консультацию!
-""",
-    '📄 Изменения в устав, ЕГРЮЛ': """
-📄 Регистрация изменений в учредительные документы
-
-Изменения ОКВЭД, смена руководителя, изменение паспортных данных руководителя и т.д.
-
-💰 Стоимость:
-• от 5 000 ₽ — если не вносятся изменения в устав
-• +3 000 ₽ — если изменения вносятся в устав
-• +10 000 ₽ — разработка индивидуального устава
-
-Запишитесь на консультацию!
-""",
-    '🏛️ Судебное сопровождение (юрлица)': """
-🏛️ Ведение дела в суде первой инстанции (для юридических лиц)
-
-💰 Стоимость: от 70 000 ₽ (зависит от сложности дела)
-
-В стоимость включено:
-• Консультация
-• Ознакомление с документами
-• Подготовка искового заявления
-• Изготовление копий документов для суда
-• Отправка документов участникам процесса
-• Подача искового заявления в суд
-• Получение информации о деле в суде
-• Судебные заседания (до пяти)
-
-⚠️ При количестве заседаний более пяти — дополнительная оплата.
-❌ Исполнительное производство не включается.
-
-📋 Подготовка искового заявления (отзыва и т.п.): от 15 000 ₽
-
-📍 Представительство в суде: 12 000 ₽ за заседание (суды СПб)
-📍 Доплата за выезд в пригороды СПб/Ленобласть: от 4 000 ₽
-
-⚠️ Если истец отказывается от иска, заключает мировое соглашение или заседание перенесено — деньги за заседание не возвращаются.
-
-Запишитесь на консультацию!
-""",
-    '📄 Подача иска (юрлица)': """
-📄 Подача искового заявления в суд (для юридических лиц)
-
-Любой выезд в суд для получения/подачи документов на территории СПб (кроме пригородов).
-
-💰 Стоимость:
-• 7 000 ₽ — личная подача (за один выезд)
-• от 3 000 ₽ — подача электронно
-• от 5 000 ₽ — отправка почтой
-
-📍 Доплата за выезд в пригороды СПб/Ленобласть: от 2 000 ₽
-
-Запишитесь на консультацию!
-""",
-    '⚖️ Апелляция и кассация (юрлица)': """
-⚖️ Апелляционные и кассационные жалобы (для юридических лиц)
-
-В пределах города Санкт-Петербурга.
-
-💰 Стоимость:
-• Подготовка жалобы: от 15 000 ₽
-• Представительство во второй и последующих инстанциях: 15 000 ₽
-
-Запишитесь на консультацию!
-""",
-    '📊 Бухгалтерские услуги (юрлица)': """
-📊 Бухгалтерские услуги для юридических лиц
-
-Зависят от системы налогообложения и количества работников.
-
-💰 Стоимость: от 5 000 ₽ в месяц
-
-Запишитесь на консультацию для расчета стоимости!
-""",
-}
-
-# Общие услуги (для нескольких категорий)
-COMMON_SERVICES = {
-    '🏷️ Регистрация товарного знака': """
-🏷️ Регистрация товарного знака
-
-💰 Стоимость: 15 000 ₽
-
-В стоимость включено:
-• Анализ товарного знака
-• Помощь в подборе классов
-• Подготовка заявления
-• Подготовка документов для Роспатента
-
-Запишитесь на консультацию!
-""",
-    '📦 Абонентское обслуживание': """
-📦 Абонентское юридическое обслуживание
-
-Комплексное юридическое обслуживание для бизнеса.
-
-💰 Стоимость зависит от объема услуг и категории клиента.
-
-Для ИП (тарифы):
-• «Бухгалтерский» (с работниками): от 5 000 ₽/месяц
-• «Годовая отчетность» (без работников, УСНО): 20 000 ₽/год
-• «Годовая отчетность» (патент): 2 000 ₽/год
-
-Для юридических лиц:
-• Бухгалтерские услуги: от 5 000 ₽/месяц
-
-Запишитесь на консультацию для расчета стоимости!
-""",
-}
-
-# Объединенный словарь всех услуг
-SERVICE_PRICES = {
-    **INDIVIDUALS_SERVICES,
-    **ENTREPRENEURS_SERVICES,
-    **LEGAL_ENTITIES_SERVICES,
-    **COMMON_SERVICES,
-}
+Тексты услуг и цены хранятся в data/catalog.json и подхватываются без
+перезапуска бота (см. data/catalog.py). Здесь — шаблон текста для услуг
+без описания и функции для совместимости со старым кодом.
+"""
 
 # Стандартный текст для неизвестных услуг
 DEFAULT_SERVICE_TEXT = """
@@ -544,9 +20,12 @@ DEFAULT_SERVICE_TEXT = """
 
 def get_service_info(service_name: str) -> str:
     """Получить информацию об услуге по названию"""
-    return SERVICE_PRICES.get(service_name, DEFAULT_SERVICE_TEXT.format(service_name=service_name))
+    from .catalog import find_service
+    service = find_service(service_name)
+    return service.text if service else DEFAULT_SERVICE_TEXT.format(service_name=service_name)
 
 
 def get_all_service_names() -> list[str]:
     """Получить список всех названий услуг"""
-    return list(SERVICE_PRICES.keys())
+    from .catalog import get_catalog
+    return [service.name for service in get_catalog().services.values()]
@@ -0,0 +1,128 @@
+"""
+Нечёткий поиск услуг по названиям и описаниям из каталога
+
+Инвертированный индекс: слово → {ID услуги: вес}. Слова из названия весят
+больше, чем слова из описания, редкие слова — больше частых (idf). Чтобы
+находить другие формы слова и опечатки («развод» → «развода»,
+«товарный знак» → «товарного знака»), слова запроса сопоставляются со
+словарём индекса через триграммы: похожесть — коэффициент Дайса по общим
+триграммам, для начала слова (поиск по мере набора) — не ниже PREFIX_SIMILARITY.
+Служебные слова (STOPWORDS) не индексируются и в запросе не учитываются, а
+результаты слабее MIN_SCORE отбрасываются: свободный текст вроде «как дела»
+не должен превращаться в список случайных услуг.
+"""
+import math
+import re
+from collections import defaultdict
+from typing import Iterable
+
+# Вес слова из названия услуги и из описания
+NAME_WEIGHT = 3.0
+TEXT_WEIGHT = 1.0
+# Минимальная похожесть слова запроса на слово из словаря
+MIN_SIMILARITY = 0.5
+# Похожесть, если слово словаря начинается со слова запроса
+PREFIX_SIMILARITY = 0.8
+# Результаты слабее этой доли лучшего результата отбрасываются
+MIN_RELATIVE_SCORE = 0.25
+# Минимальная оценка результата: одно редкое слово описания проходит,
+# случайное совпадение с частым словом или далёкой формой — нет
+MIN_SCORE = 2.2
+
+_WORD_RE = re.compile(r'\w+')
+
+# Служебные слова и обороты переписки: ни в названиях, ни в запросах не ищем,
+# иначе «на», «у меня вопрос», «как дела» находят случайные услуги
+STOPWORDS = frozenset("""
+    без более бы был была были было быть вам вас ваш ваша ваше ваши вот все всё всего
+    да даже для до его ее её если есть еще ещё же за здесь из или им их как ко когда кто
+    ли либо мне меня мной мой мы на над нам нас наш не него нее неё нет ни них но ну об
+    от по под при про раз со так также там тем то того тоже только том ты уже чем что
+    чтобы эта эти это этот я
+
+    вопрос вопросы вопроса вопросом дела добрый доброе доброго день вечер утро
+    здравствуйте здравствуй привет спасибо пожалуйста подскажите помогите можно
+    нужно нужна нужен нужны надо хочу хотел хотела хотим могу могли
+""".replace('ё', 'е').split())
+
+
+def _words(text: str) -> list[str]:
+    """Значимые слова текста: нижний регистр, ё → е, без однобуквенных и STOPWORDS"""
+    return [
+        word for word in _WORD_RE.findall(text.casefold().replace('ё', 'е'))
+        if len(word) > 1 and word not in STOPWORDS
+    ]
+
+
+def _trigrams(word: str) -> set[str]:
+    padded = f' {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Индекс для поиска услуг (объектов с полями id, name, text); строится один раз, дальше только читается"""
+
+    def __init__(self, services: Iterable):
+        self.services = {service.id: service for service in services}
+
+        postings: dict[str, dict[int, float]] = defaultdict(dict)
+        for service in self.services.values():
+            for word in _words(service.text):
+                postings[word][service.id] = TEXT_WEIGHT
+            for word in _words(service.name):
+                postings[word][service.id] = NAME_WEIGHT
+
+        total = len(self.services) or 1
+        self._postings = {
+            word: {service_id: weight * math.log(1 + total / len(ids)) for service_id, weight in ids.items()}
+            for word, ids in postings.items()
+        }
+
+        self._word_trigrams = {word: _trigrams(word) for word in self._postings}
+        trigram_words: dict[str, list[str]] = defaultdict(list)
+        for word, trigrams in self._word_trigrams.items():
+            for trigram in trigrams:
+                trigram_words[trigram].append(word)
+        self._trigram_words = dict(trigram_words)
+
+    def _similar_words(self, query_word: str) -> dict[str, float]:
+        """Слова словаря, похожие на слово запроса, с их похожестью"""
+        if query_word in self._postings:
+            similar = {query_word: 1.0}
+        else:
+            similar = {}
+
+        query_trigrams = _trigrams(query_word)
+        overlaps: dict[str, int] = defaultdict(int)
+        for trigram in query_trigrams:
+            for word in self._trigram_words.get(trigram, ()):
+                overlaps[word] += 1
+
+        for word, overlap in overlaps.items():
+            similarity = 2 * overlap / (len(query_trigrams) + len(self._word_trigrams[word]))
+            if len(query_word) >= 3 and word.startswith(query_word):
+                similarity = max(similarity, PREFIX_SIMILARITY)
+            if similarity >= MIN_SIMILARITY and similarity > similar.get(word, 0):
+                similar[word] = similarity
+        return similar
+
+    def search(self, query: str, limit: int = 5) -> list:
+        """Услуги, подходящие под запрос, от лучшей к худшей"""
+        scores: dict[int, float] = defaultdict(float)
+        for query_word in set(_words(query)):
+            # Для каждого слова запроса берём лучшее совпадение в каждой услуге
+            best: dict[int, float] = {}
+            for word, similarity in self._similar_words(query_word).items():
+                for service_id, weight in self._postings[word].items():
+                    score = similarity * weight
+                    if score > best.get(service_id, 0):
+                        best[service_id] = score
+            for service_id, score in best.items():
+                scores[service_id] += score
+
+        if not scores:
+            return []
+        threshold = max(max(scores.values()) * MIN_RELATIVE_SCORE, MIN_SCORE)
+        ranked = sorted((item for item in scores.items() if item[1] >= threshold), key=lambda item: -item[1])
+        return [self.services[service_id] for service_id, _ in ranked[:limit]]
+
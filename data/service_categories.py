@@ -1,131 +1,27 @@
 """
 Структура категорий и подкатегорий услуг
-"""
-
-# Услуги для физических лиц - группировка по подкатегориям
-INDIVIDUALS_CATEGORIES = {
-    'consultations': {
-        'name': '💬 Консультации',
-        'services': [
-            '💬 Консультации юриста',
-            '💻 Онлайн-консультация',
-            '📑 Анализ документов',
-        ]
-    },
-    'court': {
-        'name': '🏛️ Судебные услуги',
-        'services': [
-            '📋 Составление исковых заявлений',
-            '🏛️ Судебное сопровождение',
-            '📄 Подача иска в суд',
-            '📋 Ознакомление с делом',
-            '📜 Получение решения суда',
-            '⚖️ Апелляция и кассация',
-        ]
-    },
-    'documents': {
-        'name': '📄 Документы и прочее',
-        'services': [
-            '📊 Налоговые декларации 3-НДФЛ',
-            '🏠 Сделки с недвижимостью',
-            '🏷️ Регистрация товарного знака',
-            '🚗 Выезд на проверку',
-            '📄 Ксерокопирование',
-            '⚡ Срочная подготовка',
-        ]
-    }
-}
 
-# Услуги для ИП - группировка по подкатегориям
-ENTREPRENEURS_CATEGORIES = {
-    'registration': {
-        'name': '📝 Регистрация',
-        'services': [
-            '💬 Юридические консультации',
-            '📝 Регистрация ИП (подробно)',
-            '📄 Изменение ЕГРИП',
-            '🗑️ Ликвидация ИП',
-            '💎 Регистрация ювелиров',
-            '📋 Регистрация в надзорных органах',
-            '🔒 Оператор персональных данных',
-        ]
-    },
-    'legal_support': {
-        'name': '⚖️ Юридическая поддержка',
-        'services': [
-            '💬 Консультации для ИП',
-            '📋 Составление договоров',
-            '👥 Оформление сотрудников',
-            '🏷️ Регистрация товарного знака',
-        ]
-    },
-    'court': {
-        'name': '🏛️ Судебные услуги',
-        'services': [
-            '🏛️ Судебное сопровождение ИП',
-            '📄 Подача иска (ИП)',
-            '⚖️ Апелляция и кассация (ИП)',
-        ]
-    },
-    'accounting': {
-        'name': '📊 Бухгалтерия',
-        'services': [
-            '📊 Бухгалтерские услуги',
-            '🚗 Выезд к клиенту',
-        ]
-    }
-}
-
-# Услуги для юридических лиц - группировка по подкатегориям
-LEGAL_ENTITIES_CATEGORIES = {
-    'registration': {
-        'name': '📝 Регистрация и документы',
-        'services': [
-            '📝 Регистрация ООО',
-            '📄 Изменения в устав, ЕГРЮЛ',
-            '🏷️ Регистрация товарного знака',
-        ]
-    },
-    'legal_support': {
-        'name': '⚖️ Юридическая поддержка',
-        'services': [
-            '💬 Консультации для юрлиц',
-            '📋 Составление договоров (юрлица)',
-        ]
-    },
-    'court': {
-        'name': '🏛️ Судебные услуги',
-        'services': [
-            '🏛️ Судебное сопровождение (юрлица)',
-            '📄 Подача иска (юрлица)',
-            '⚖️ Апелляция и кассация (юрлица)',
-        ]
-    },
-    'accounting': {
-        'name': '📊 Бухгалтерия',
-        'services': [
-            '📊 Бухгалтерские услуги (юрлица)',
-        ]
-    }
-}
+Категории, подкатегории и порядок услуг в меню задаются в data/catalog.json
+(раздел categories); функции читают текущий снимок каталога.
+"""
+from .catalog import get_catalog
 
 
 def get_category_keyboard(category_type: str):
     """
-    Возвращает список подкатегорий для категории.
+    Возвращает подкатегории категории: {id подкатегории: {'name': ..., 'services': [...]}}.
     category_type: 'individuals', 'entrepreneurs', 'legal_entities'
     """
-    categories = {
-        'individuals': INDIVIDUALS_CATEGORIES,
-        'entrepreneurs': ENTREPRENEURS_CATEGORIES,
-        'legal_entities': LEGAL_ENTITIES_CATEGORIES,
+    catalog = get_catalog()
+    return {
+        subcategory: {
+            'name': name,
+            'services': [service.name for service in catalog.subcategory(category_type, subcategory)],
+        }
+        for subcategory, name in catalog.categories.get(category_type, {}).items()
     }
-    return categories.get(category_type, {})
 
 
 def get_services_by_subcategory(category_type: str, subcategory: str) -> list[str]:
     """Возвращает список услуг для подкатегории"""
-    categories = get_category_keyboard(category_type)
-    if subcategory in categories:
-        return categories[subcategory]['services']
-    return []
+    return [service.name for service in get_catalog().subcategory(category_type, subcategory)]
@@ -1,21 +1,232 @@
+import asyncio
+import logging
+import os
+import re
 import sqlite3
+import time as time_module
 import aiosqlite
+from contextlib import asynccontextmanager
 from datetime import datetime, date, time
-from typing import List, Optional, Dict
-from config import DATABASE_URL
+from typing import AsyncIterator, Callable, List, Optional, Dict
+from metrics import timed_query, register_gauge
+from config import DATABASE_URL, DB_POOL_READERS, SQLITE_PROFILE, SQLITE_PRAGMAS, ADMIN_IDS, ADMIN_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+# Путь к файлу БД вычисляем один раз, а не при каждом запросе
+DB_PATH = DATABASE_URL.replace('sqlite:///', '')
+
+
+# Настройка соединений
+_PRAGMA_VALUE_RE = re.compile(r'^-?[A-Za-z0-9]+$')
+
+
+async def _apply_pragmas(db: aiosqlite.Connection):
+    """Применить PRAGMA из профиля SQLITE_PROFILE к соединению"""
+    for name, value in SQLITE_PRAGMAS.items():
+        if not _PRAGMA_VALUE_RE.match(value):
+            logger.warning(f"Некорректное значение PRAGMA {name}={value!r}, пропускаем")
+            continue
+        await db.execute(f"PRAGMA {name} = {value}")
+
+
+# Пул соединений
+class ConnectionPool:
+    """
+    Пул долгоживущих соединений aiosqlite.
+
+    Читатели берут свободное соединение из очереди, все записи идут
+    через одно выделенное соединение-писатель под asyncio.Lock —
+    SQLite всё равно допускает только одного писателя одновременно.
+    """
+
+    def __init__(self, path: str, readers: int = 4):
+        self.path = path
+        self.readers_count = max(1, readers)
+        self._readers: asyncio.Queue | None = None
+        self._writer: aiosqlite.Connection | None = None
+        self._writer_lock = asyncio.Lock()
+        self._connections: list[aiosqlite.Connection] = []
+
+    async def _connect(self) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(self.path)
+        db.row_factory = aiosqlite.Row
+        await _apply_pragmas(db)
+        self._connections.append(db)
+        return db
+
+    async def open(self):
+        """Открыть все соединения пула"""
+        self._readers = asyncio.Queue()
+        for _ in range(self.readers_count):
+            self._readers.put_nowait(await self._connect())
+        self._writer = await self._connect()
+        logger.info(f"Пул соединений БД открыт: {self.readers_count} читателей + 1 писатель")
+
+    async def close(self):
+        """Закрыть все соединения пула"""
+        for db in self._connections:
+            try:
+                await db.close()
+            except Exception as e:
+                logger.warning(f"Ошибка закрытия соединения БД: {e}")
+        self._connections.clear()
+        self._readers = None
+        self._writer = None
+        logger.info("Пул соединений БД закрыт")
+
+    @asynccontextmanager
+    async def reader(self):
+        """Взять соединение для чтения"""
+        db = await self._readers.get()
+        try:
+            yield db
+        finally:
+            self._readers.put_nowait(db)
+
+    @asynccontextmanager
+    async def writer(self):
+        """Взять единственное соединение для записи"""
+        async with self._writer_lock:
+            try:
+                yield self._writer
+            except BaseException:
+                # Не оставляем незавершённую транзакцию на общем соединении
+                await self._writer.rollback()
+                raise
+
+
+_pool: Optional[ConnectionPool] = None
+
+
+async def init_db_pool(readers: int = DB_POOL_READERS):
+    """Открыть общий пул соединений (вызывается в post_init)"""
+    global _pool
+    if _pool is not None:
+        return
+    pool = ConnectionPool(DB_PATH, readers)
+    await pool.open()
+    _pool = pool
+
+
+async def close_db_pool():
+    """Закрыть общий пул соединений (вызывается в post_shutdown)"""
+    global _pool
+    if _pool is None:
+        return
+    pool, _pool = _pool, None
+    await pool.close()
+
+
+@asynccontextmanager
+async def _reader():
+    """Соединение для чтения: из пула или временное, если пул не открыт"""
+    if _pool is None:
+        async with aiosqlite.connect(DB_PATH) as db:
+            db.row_factory = aiosqlite.Row
+            await _apply_pragmas(db)
+            yield db
+    else:
+        async with _pool.reader() as db:
+            yield db
+
+
+@asynccontextmanager
+async def _writer():
+    """Соединение для записи: из пула или временное, если пул не открыт"""
+    if _pool is None:
+        async with aiosqlite.connect(DB_PATH) as db:
+            db.row_factory = aiosqlite.Row
+            await _apply_pragmas(db)
+            yield db
+    else:
+        async with _pool.writer() as db:
+            yield db
+
+
+async def ping_db() -> float:
+    """Выполнить SELECT 1 на соединении-читателе, вернуть время в секундах"""
+    started = time_module.perf_counter()
+    async with _reader() as db:
+        async with db.execute("SELECT 1") as cursor:
+            await cursor.fetchone()
+    return time_module.perf_counter() - started
+
+
+async def get_db_settings() -> Dict:
+    """Отчёт о фактических настройках SQLite (для health check)"""
+    settings = {
+        'profile': SQLITE_PROFILE,
+        'path': DB_PATH,
+        'pool': {
+            'open': _pool is not None,
+            'readers': _pool.readers_count if _pool else 0,
+            'idle_readers': _pool._readers.qsize() if _pool else 0,
+        },
+        'pragmas': {},
+    }
+    async with _reader() as db:
+        for name in SQLITE_PRAGMAS:
+            async with db.execute(f"PRAGMA {name}") as cursor:
+                row = await cursor.fetchone()
+                settings['pragmas'][name] = row[0] if row else None
+    return settings
+
+
+# Инициализация базы данных и миграции
+# Файлы миграций: database/migrations/NNNN_описание.sql, применяются по возрастанию номера.
+# Номер последней применённой миграции хранится в PRAGMA user_version.
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database', 'migrations')
+_MIGRATION_FILE_RE = re.compile(r'^(\d+)_[\w-]+\.sql$')
+
+
+def get_migrations() -> list[tuple[int, str]]:
+    """Список миграций [(версия, путь к файлу)] по возрастанию версии"""
+    migrations = []
+    for name in os.listdir(MIGRATIONS_DIR):
+        match = _MIGRATION_FILE_RE.match(name)
+        if match:
+            migrations.append((int(match.group(1)), os.path.join(MIGRATIONS_DIR, name)))
+    migrations.sort()
+    return migrations
+
+
+async def run_migrations(db: aiosqlite.Connection) -> list[int]:
+    """
+    Применить все миграции новее текущей версии схемы.
+    Каждая миграция выполняется в своей транзакции вместе с обновлением user_version.
+    Возвращает список применённых версий.
+    """
+    async with db.execute("PRAGMA user_version") as cursor:
+        current = (await cursor.fetchone())[0]
+
+    applied = []
+    for version, path in get_migrations():
+        if version <= current:
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            sql = f.read()
+        try:
+            await db.executescript(f"BEGIN;\n{sql}\nPRAGMA user_version = {version};\nCOMMIT;")
+        except Exception:
+            await db.rollback()
+            logger.error(f"Ошибка применения миграции {os.path.basename(path)}")
+            raise
+        logger.info(f"Применена миграция {os.path.basename(path)}")
+        applied.append(version)
+    return applied
+
 
-# Инициализация базы данных
 async def init_db():
-    """Инициализация базы данных"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
-        with open('database/init.sql', 'r', encoding='utf-8') as f:
-            await db.executescript(f.read())
-        await db.commit()
+    """Инициализация базы данных: применение миграций схемы"""
+    async with _writer() as db:
+        await run_migrations(db)
 
 # Работа с пользователями
+@timed_query
 async def add_user(telegram_id: int, username: str = None, first_name: str = None, last_name: str = None):
     """Добавить пользователя"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
+    async with _writer() as db:
         await db.execute(
             """INSERT OR IGNORE INTO users (telegram_id, username, first_name, last_name) 
                VALUES (?, ?, ?, ?)""",
@@ -23,9 +234,10 @@ async def add_user(telegram_id: int, username: str = None, first_name: str = Non
         )
         await db.commit()
 
+@timed_query
 async def update_user_phone(telegram_id: int, phone: str):
     """Обновить телефон пользователя"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
+    async with _writer() as db:
         await db.execute(
             "UPDATE users SET phone = ? WHERE telegram_id = ?",
             (phone, telegram_id)
@@ -33,6 +245,7 @@ async def update_user_phone(telegram_id: int, phone: str):
         await db.commit()
 
 # Работа с записями
+@timed_query
 async def create_appointment(
     user_id: int,
     service_type: str,
@@ -44,7 +257,7 @@ async def create_appointment(
     comment: str = None
 ) -> int:
     """Создать запись на консультацию"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
+    async with _writer() as db:
         cursor = await db.execute(
             """INSERT INTO appointments 
                (user_id, service_type, client_name, client_phone, client_email, appointment_date, appointment_time, comment)
@@ -54,10 +267,10 @@ async def create_appointment(
         await db.commit()
         return cursor.lastrowid
 
+@timed_query
 async def get_appointments_by_date(appointment_date: date) -> List[Dict]:
     """Получить записи на конкретную дату"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         async with db.execute(
             """SELECT * FROM appointments 
                WHERE appointment_date = ? AND status != 'cancelled'
@@ -67,10 +280,26 @@ async def get_appointments_by_date(appointment_date: date) -> List[Dict]:
             rows = await cursor.fetchall()
             return [dict(row) for row in rows]
 
+@timed_query
+async def get_appointments_in_range(date_from: date, date_to: date) -> List[Dict]:
+    """
+    Получить записи за период [date_from; date_to] одним запросом.
+    Строки уже упорядочены по дате и времени (по индексу idx_appointments_date).
+    """
+    async with _reader() as db:
+        async with db.execute(
+            """SELECT * FROM appointments
+               WHERE appointment_date BETWEEN ? AND ? AND status != 'cancelled'
+               ORDER BY appointment_date, appointment_time""",
+            (date_from.isoformat(), date_to.isoformat())
+        ) as cursor:
+            rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+
+@timed_query
 async def get_user_appointments(user_id: int) -> List[Dict]:
     """Получить записи пользователя"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         async with db.execute(
             """SELECT * FROM appointments 
                WHERE user_id = ? AND status != 'cancelled'
@@ -80,10 +309,10 @@ async def get_user_appointments(user_id: int) -> List[Dict]:
             rows = await cursor.fetchall()
             return [dict(row) for row in rows]
 
+@timed_query
 async def get_appointment_by_id(appointment_id: int) -> Optional[Dict]:
     """Получить запись по ID"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         async with db.execute(
             "SELECT * FROM appointments WHERE id = ?",
             (appointment_id,)
@@ -91,9 +320,14 @@ async def get_appointment_by_id(appointment_id: int) -> Optional[Dict]:
             row = await cursor.fetchone()
             return dict(row) if row else None
 
+# Статусы записи, после которых напоминания не нужны
+CLOSED_APPOINTMENT_STATUSES = ('cancelled', 'completed')
+
+
+@timed_query
 async def update_appointment_status(appointment_id: int, status: str, changed_by: int = None, comment: str = None):
     """Обновить статус записи с записью в историю"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
+    async with _writer() as db:
         # Получаем текущий статус
         async with db.execute(
             "SELECT status FROM appointments WHERE id = ?",
@@ -116,12 +350,20 @@ async def update_appointment_status(appointment_id: int, status: str, changed_by
             (appointment_id, old_status, status, changed_by, comment)
         )
 
+        # Напоминания о снятой записи больше не отправляются
+        if status in CLOSED_APPOINTMENT_STATUSES:
+            await db.execute(
+                """UPDATE reminders SET status = 'skipped'
+                   WHERE appointment_id = ? AND status = 'pending'""",
+                (appointment_id,)
+            )
+
         await db.commit()
 
+@timed_query
 async def get_pending_appointments() -> List[Dict]:
     """Получить все ожидающие записи"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         async with db.execute(
             """SELECT * FROM appointments
                WHERE status = 'pending'
@@ -131,11 +373,10 @@ async def get_pending_appointments() -> List[Dict]:
             return [dict(row) for row in rows]
 
 
+@timed_query
 async def get_appointments_by_status(status: str = None) -> List[Dict]:
     """Получить заявки с фильтрацией по статусу (None = все)"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
-        db.row_factory = aiosqlite.Row
-
+    async with _reader() as db:
         if status and status != 'all':
             query = """SELECT * FROM appointments
                        WHERE status = ?
@@ -150,10 +391,108 @@ async def get_appointments_by_status(status: str = None) -> List[Dict]:
             rows = await cursor.fetchall()
             return [dict(row) for row in rows]
 
+# Keyset-пагинация списков (новые сверху, порядок по (created_at, id))
+PAGE_SIZE = 5
+
+# Таблицы, для которых доступна постраничная выборка
+_PAGED_TABLES = ('appointments', 'questions')
+
+
+def make_cursor(row: Dict) -> str:
+    """
+    Закодировать позицию строки для callback_data.
+    '2024-01-31 12:00:00', id=123 -> '20240131120000-123'
+    """
+    created_at = re.sub(r'\D', '', str(row.get('created_at') or ''))
+    return f"{created_at}-{row['id']}"
+
+
+def parse_cursor(cursor: str) -> tuple[str, int]:
+    """Разобрать курсор из make_cursor() обратно в (created_at, id). ValueError при ошибке"""
+    created_at, row_id = cursor.split('-')
+    if len(created_at) != 14 or not created_at.isdigit():
+        raise ValueError(f"Некорректный курсор: {cursor}")
+    c = created_at
+    return f"{c[0:4]}-{c[4:6]}-{c[6:8]} {c[8:10]}:{c[10:12]}:{c[12:14]}", int(row_id)
+
+
+async def _fetch_page(table: str, status: str = None, cursor: str = None,
+                      direction: str = 'next', limit: int = PAGE_SIZE) -> tuple[List[Dict], bool, bool]:
+    """
+    Выбрать одну страницу строк таблицы без OFFSET.
+
+    direction='next' — строки старше cursor (cursor = последняя строка текущей страницы),
+    direction='prev' — строки новее cursor (cursor = первая строка текущей страницы).
+    Возвращает (строки, есть_предыдущая_страница, есть_следующая_страница).
+    """
+    if table not in _PAGED_TABLES:
+        raise ValueError(f"Неизвестная таблица: {table}")
+
+    conditions = []
+    params: list = []
+    if status and status != 'all':
+        conditions.append("status = ?")
+        params.append(status)
+
+    if cursor:
+        created_at, row_id = parse_cursor(cursor)
+        op = '<' if direction == 'next' else '>'
+        conditions.append(f"(created_at, id) {op} (?, ?)")
+        params.extend([created_at, row_id])
+
+    order = 'DESC' if direction == 'next' else 'ASC'
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    query = f"""SELECT * FROM {table} {where}
+                ORDER BY created_at {order}, id {order}
+                LIMIT ?"""
+    # Берём на одну строку больше, чтобы узнать, есть ли продолжение
+    params.append(limit + 1)
+
+    async with _reader() as db:
+        async with db.execute(query, params) as cursor_:
+            rows = [dict(row) for row in await cursor_.fetchall()]
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if direction == 'next':
+        return rows, cursor is not None, has_more
+    rows.reverse()
+    return rows, has_more, True
+
+
+@timed_query
+async def get_appointments_page(status: str = None, cursor: str = None,
+                                direction: str = 'next', limit: int = PAGE_SIZE) -> tuple[List[Dict], bool, bool]:
+    """Страница заявок с фильтром по статусу (None/'all' = все), см. _fetch_page"""
+    return await _fetch_page('appointments', status, cursor, direction, limit)
+
+
+@timed_query
+async def get_questions_page(status: str = 'new', cursor: str = None,
+                             direction: str = 'next', limit: int = PAGE_SIZE) -> tuple[List[Dict], bool, bool]:
+    """Страница вопросов с фильтром по статусу (None/'all' = все), см. _fetch_page"""
+    return await _fetch_page('questions', status, cursor, direction, limit)
+
+
+@timed_query
+async def count_appointments(status: str = None) -> int:
+    """Количество заявок с фильтром по статусу (None/'all' = все)"""
+    async with _reader() as db:
+        if status and status != 'all':
+            query, params = "SELECT COUNT(*) FROM appointments WHERE status = ?", (status,)
+        else:
+            query, params = "SELECT COUNT(*) FROM appointments", ()
+        async with db.execute(query, params) as cursor:
+            row = await cursor.fetchone()
+            return row[0]
+
+
 # Работа с вопросами
+@timed_query
 async def create_question(user_id: int, question_text: str, client_name: str = None, client_phone: str = None) -> int:
     """Создать вопрос от клиента"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
+    async with _writer() as db:
         cursor = await db.execute(
             """INSERT INTO questions (user_id, question_text, client_name, client_phone)
                VALUES (?, ?, ?, ?)""",
@@ -162,10 +501,10 @@ async def create_question(user_id: int, question_text: str, client_name: str = N
         await db.commit()
         return cursor.lastrowid
 
+@timed_query
 async def get_new_questions() -> List[Dict]:
     """Получить новые вопросы"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         async with db.execute(
             """SELECT * FROM questions 
                WHERE status = 'new'
@@ -174,10 +513,10 @@ async def get_new_questions() -> List[Dict]:
             rows = await cursor.fetchall()
             return [dict(row) for row in rows]
 
+@timed_query
 async def get_question_by_id(question_id: int) -> Optional[Dict]:
     """Получить вопрос по ID"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         async with db.execute(
             "SELECT * FROM questions WHERE id = ?",
             (question_id,)
@@ -185,9 +524,10 @@ async def get_question_by_id(question_id: int) -> Optional[Dict]:
             row = await cursor.fetchone()
             return dict(row) if row else None
 
+@timed_query
 async def update_question_status(question_id: int, status: str):
     """Обновить статус вопроса"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
+    async with _writer() as db:
         await db.execute(
             "UPDATE questions SET status = ? WHERE id = ?",
             (status, question_id)
@@ -195,34 +535,111 @@ async def update_question_status(question_id: int, status: str):
         await db.commit()
 
 # Работа с администраторами
+@timed_query
+async def _load_admin_ids() -> set[int]:
+    """Все telegram_id из таблицы admins"""
+    async with _reader() as db:
+        async with db.execute("SELECT telegram_id FROM admins") as cursor:
+            return {row[0] async for row in cursor}
+
+
+class AdminRegistry:
+    """
+    Кеш администраторов из таблицы admins в виде множества.
+
+    Загружается при старте, после ADMIN_CACHE_TTL секунд обновляется в фоне
+    (проверка в это время отвечает по старым данным), add_admin сразу
+    добавляет ID в множество. Проверка — O(1) без обращения к БД.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._ids: set[int] = set()
+        self._loaded_at: float | None = None
+        self._refresh_task: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    async def load(self):
+        """Загрузить список администраторов из БД"""
+        self._ids = await _load_admin_ids()
+        self._loaded_at = time_module.monotonic()
+        self.refreshes += 1
+
+    async def _refresh(self):
+        try:
+            await self.load()
+        except Exception as e:
+            logger.error(f"Ошибка обновления кеша администраторов: {e}")
+
+    async def contains(self, telegram_id: int) -> bool:
+        if self._loaded_at is None:
+            self.misses += 1
+            await self.load()
+        else:
+            self.hits += 1
+            expired = time_module.monotonic() - self._loaded_at > self.ttl
+            if expired and (self._refresh_task is None or self._refresh_task.done()):
+                self._refresh_task = asyncio.create_task(self._refresh())
+        return telegram_id in self._ids
+
+    def add(self, telegram_id: int):
+        self._ids.add(telegram_id)
+
+    def stats(self) -> Dict:
+        return {
+            'size': len(self._ids),
+            'hits': self.hits,
+            'misses': self.misses,
+            'refreshes': self.refreshes,
+            'age_seconds': round(time_module.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+            'ttl_seconds': self.ttl,
+        }
+
+
+_admin_registry = AdminRegistry(ADMIN_CACHE_TTL)
+
+register_gauge('bot_admin_cache_hits_total', 'Проверки is_admin, отвеченные из кеша',
+               lambda: _admin_registry.hits, kind='counter')
+register_gauge('bot_admin_cache_misses_total', 'Проверки is_admin с обращением к БД',
+               lambda: _admin_registry.misses, kind='counter')
+_CONFIG_ADMIN_IDS = frozenset(ADMIN_IDS)
+
+
+async def load_admin_cache():
+    """Загрузить кеш администраторов (вызывается в post_init)"""
+    await _admin_registry.load()
+
+
+def get_admin_cache_stats() -> Dict:
+    """Счётчики кеша администраторов (для health check)"""
+    return _admin_registry.stats()
+
+
 async def is_admin(telegram_id: int) -> bool:
     """Проверить, является ли пользователь администратором"""
-    from config import ADMIN_IDS
-    if telegram_id in ADMIN_IDS:
+    if telegram_id in _CONFIG_ADMIN_IDS:
         return True
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
-        async with db.execute(
-            "SELECT COUNT(*) FROM admins WHERE telegram_id = ?",
-            (telegram_id,)
-        ) as cursor:
-            count = await cursor.fetchone()
-            return count[0] > 0
+    return await _admin_registry.contains(telegram_id)
 
+@timed_query
 async def add_admin(telegram_id: int):
     """Добавить администратора"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
+    async with _writer() as db:
         await db.execute(
             "INSERT OR IGNORE INTO admins (telegram_id) VALUES (?)",
             (telegram_id,)
         )
         await db.commit()
+    _admin_registry.add(telegram_id)
 
 
 # История статусов
+@timed_query
 async def get_appointment_history(appointment_id: int) -> List[Dict]:
     """Получить историю изменений статуса заявки"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         async with db.execute(
             """SELECT * FROM appointment_status_history
                WHERE appointment_id = ?
@@ -234,22 +651,84 @@ async def get_appointment_history(appointment_id: int) -> List[Dict]:
 
 
 # Работа с напоминаниями
+# Подписчики на создание напоминаний: callback(reminder_id, scheduled_at).
+# Через них планировщик узнаёт о новых напоминаниях без опроса БД.
+_reminder_listeners: list[Callable[[int, datetime], None]] = []
+
+
+def add_reminder_listener(callback: Callable[[int, datetime], None]):
+    """Подписаться на создание напоминаний"""
+    _reminder_listeners.append(callback)
+
+
+def remove_reminder_listener(callback: Callable[[int, datetime], None]):
+    """Отписаться от создания напоминаний"""
+    if callback in _reminder_listeners:
+        _reminder_listeners.remove(callback)
+
+
+def _notify_reminder_listeners(reminder_id: int, scheduled_at: datetime):
+    for callback in list(_reminder_listeners):
+        try:
+            callback(reminder_id, scheduled_at)
+        except Exception as e:
+            logger.error(f"Ошибка подписчика напоминаний: {e}")
+
+
+@timed_query
 async def create_reminder(appointment_id: int, reminder_type: str, scheduled_at: datetime) -> int:
     """Создать напоминание"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
+    async with _writer() as db:
         cursor = await db.execute(
             """INSERT INTO reminders (appointment_id, reminder_type, scheduled_at)
                VALUES (?, ?, ?)""",
             (appointment_id, reminder_type, scheduled_at.isoformat())
         )
         await db.commit()
-        return cursor.lastrowid
+        reminder_id = cursor.lastrowid
+    _notify_reminder_listeners(reminder_id, scheduled_at)
+    return reminder_id
+
+
+@timed_query
+async def get_scheduled_reminders() -> List[Dict]:
+    """Все ещё не отправленные напоминания (id и время) — для восстановления очереди планировщика"""
+    async with _reader() as db:
+        async with db.execute(
+            """SELECT id, scheduled_at FROM reminders
+               WHERE status = 'pending'
+               ORDER BY scheduled_at""",
+        ) as cursor:
+            rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+
 
+@timed_query
+async def get_reminders_by_ids(reminder_ids: List[int]) -> List[Dict]:
+    """Получить ожидающие напоминания по ID вместе с данными записи"""
+    if not reminder_ids:
+        return []
+    placeholders = ', '.join('?' * len(reminder_ids))
+    async with _reader() as db:
+        async with db.execute(
+            f"""SELECT r.*, a.user_id, a.client_name, a.service_type,
+                       a.appointment_date, a.appointment_time, a.status as appointment_status
+                FROM reminders r
+                JOIN appointments a ON r.appointment_id = a.id
+                WHERE r.id IN ({placeholders})
+                AND r.status = 'pending'
+                AND a.status NOT IN ('cancelled', 'completed')
+                ORDER BY r.scheduled_at""",
+            reminder_ids
+        ) as cursor:
+            rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
 
+
+@timed_query
 async def get_pending_reminders() -> List[Dict]:
     """Получить напоминания, которые нужно отправить"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         async with db.execute(
             """SELECT r.*, a.user_id, a.client_name, a.service_type,
                       a.appointment_date, a.appointment_time, a.status as appointment_status
@@ -264,9 +743,10 @@ async def get_pending_reminders() -> List[Dict]:
             return [dict(row) for row in rows]
 
 
+@timed_query
 async def mark_reminder_sent(reminder_id: int, status: str = 'sent'):
     """Отметить напоминание как отправленное"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
+    async with _writer() as db:
         await db.execute(
             """UPDATE reminders
                SET status = ?, sent_at = datetime('now')
@@ -276,66 +756,227 @@ async def mark_reminder_sent(reminder_id: int, status: str = 'sent'):
         await db.commit()
 
 
-# Экспорт данных
-async def get_all_appointments(
-    status: str = None,
-    date_from: date = None,
-    date_to: date = None
-) -> List[Dict]:
-    """Получить все заявки с фильтрацией для экспорта"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
-        db.row_factory = aiosqlite.Row
-
-        query = "SELECT * FROM appointments WHERE 1=1"
-        params = []
-
-        if status:
-            query += " AND status = ?"
-            params.append(status)
-        if date_from:
-            query += " AND (appointment_date >= ? OR appointment_date IS NULL)"
-            params.append(date_from.isoformat())
-        if date_to:
-            query += " AND (appointment_date <= ? OR appointment_date IS NULL)"
-            params.append(date_to.isoformat())
-
-        query += " ORDER BY created_at DESC"
-
-        async with db.execute(query, params) as cursor:
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
-
-
-async def get_all_questions(status: str = None) -> List[Dict]:
-    """Получить все вопросы с фильтрацией для экспорта"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
-        db.row_factory = aiosqlite.Row
+@timed_query
+async def mark_reminders_sent(results: List[tuple]):
+    """Отметить пачку напоминаний одним UPDATE: results — список (reminder_id, status)"""
+    if not results:
+        return
+    async with _writer() as db:
+        await db.executemany(
+            """UPDATE reminders
+               SET status = ?, sent_at = datetime('now')
+               WHERE id = ?""",
+            [(status, reminder_id) for reminder_id, status in results]
+        )
+        await db.commit()
 
-        query = "SELECT * FROM questions WHERE 1=1"
-        params = []
 
-        if status:
-            query += " AND status = ?"
-            params.append(status)
+# Экспорт данных
+# Колонки выгрузки в порядке столбцов CSV
+EXPORT_APPOINTMENT_COLUMNS = (
+    'id', 'created_at', 'client_name', 'client_phone', 'client_email', 'service_type',
+    'appointment_date', 'appointment_time', 'comment', 'status'
+)
+EXPORT_QUESTION_COLUMNS = ('id', 'created_at', 'client_name', 'client_phone', 'question_text', 'status')
 
-        query += " ORDER BY created_at DESC"
 
+async def _iter_export_rows(query: str, params: list, chunk_size: int) -> AsyncIterator[list]:
+    """Строки запроса порциями по chunk_size, не загружая всю выборку в память"""
+    async with _reader() as db:
         async with db.execute(query, params) as cursor:
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
+            while True:
+                rows = await cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
 
 
-async def get_appointments_for_reminder(target_date: date) -> List[Dict]:
-    """Получить заявки на определённую дату для создания напоминаний"""
-    async with aiosqlite.connect(DATABASE_URL.replace('sqlite:///', '')) as db:
-        db.row_factory = aiosqlite.Row
+def iter_appointments_for_export(
+    status: str = None,
+    date_from: date = None,
+    date_to: date = None,
+    chunk_size: int = 1000
+) -> AsyncIterator[list]:
+    """
+    Заявки для экспорта порциями (строки с колонками EXPORT_APPOINTMENT_COLUMNS).
+    Соединение-читатель занято, пока итерация не закончится.
+    """
+    query = f"SELECT {', '.join(EXPORT_APPOINTMENT_COLUMNS)} FROM appointments WHERE 1=1"
+    params = []
+
+    if status:
+        query += " AND status = ?"
+        params.append(status)
+    if date_from:
+        query += " AND (appointment_date >= ? OR appointment_date IS NULL)"
+        params.append(date_from.isoformat())
+    if date_to:
+        query += " AND (appointment_date <= ? OR appointment_date IS NULL)"
+        params.append(date_to.isoformat())
+
+    # Порядок совпадает с индексами (status, created_at, id) и (created_at, id) — без сортировки
+    query += " ORDER BY created_at DESC, id DESC"
+    return _iter_export_rows(query, params, chunk_size)
+
+
+def iter_questions_for_export(status: str = None, chunk_size: int = 1000) -> AsyncIterator[list]:
+    """Вопросы для экспорта порциями (строки с колонками EXPORT_QUESTION_COLUMNS)"""
+    query = f"SELECT {', '.join(EXPORT_QUESTION_COLUMNS)} FROM questions WHERE 1=1"
+    params = []
+
+    if status:
+        query += " AND status = ?"
+        params.append(status)
+
+    query += " ORDER BY created_at DESC, id DESC"
+    return _iter_export_rows(query, params, chunk_size)
+
+
+@timed_query
+async def create_reminders_for_date(target_date: date, day_before_at: datetime) -> int:
+    """
+    Создать напоминания для всех активных записей на target_date одной транзакцией:
+    'day_before' на время day_before_at и 'hour_before' за час до приёма
+    (если у записи указано время). Уже существующие напоминания не дублируются
+    (UNIQUE(appointment_id, reminder_type) + INSERT OR IGNORE), так что вызов
+    можно безопасно повторять. Подписчики add_reminder_listener получают
+    каждое созданное напоминание, как и при create_reminder.
+    Возвращает число созданных напоминаний.
+    """
+    created = []
+    async with _writer() as db:
+        # RETURNING отдаёт только реально вставленные строки, пропущенные OR IGNORE в него не попадают
         async with db.execute(
-            """SELECT a.* FROM appointments a
-               LEFT JOIN reminders r ON a.id = r.appointment_id AND r.reminder_type = 'day_before'
-               WHERE a.appointment_date = ?
-               AND a.status IN ('pending', 'confirmed')
-               AND r.id IS NULL""",
+            """INSERT OR IGNORE INTO reminders (appointment_id, reminder_type, scheduled_at)
+               SELECT id, 'day_before', ?
+               FROM appointments
+               WHERE appointment_date = ?
+               AND status IN ('pending', 'confirmed')
+               RETURNING id, scheduled_at""",
+            (day_before_at.isoformat(), target_date.isoformat())
+        ) as cursor:
+            created += await cursor.fetchall()
+        async with db.execute(
+            """INSERT OR IGNORE INTO reminders (appointment_id, reminder_type, scheduled_at)
+               SELECT id, 'hour_before',
+                      strftime('%Y-%m-%dT%H:%M:%S', appointment_date || ' ' || appointment_time, '-1 hour')
+               FROM appointments
+               WHERE appointment_date = ?
+               AND status IN ('pending', 'confirmed')
+               AND strftime('%Y-%m-%dT%H:%M:%S', appointment_date || ' ' || appointment_time) IS NOT NULL
+               RETURNING id, scheduled_at""",
             (target_date.isoformat(),)
         ) as cursor:
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
+            created += await cursor.fetchall()
+        await db.commit()
+    for reminder_id, scheduled_at in created:
+        _notify_reminder_listeners(reminder_id, datetime.fromisoformat(scheduled_at))
+    return len(created)
+
+
+# Статистика
+# Этапы воронки заявок в порядке прохождения
+FUNNEL_STAGES = ('pending', 'confirmed', 'payment_sent', 'completed')
+
+
+@timed_query
+async def get_statistics(days: int = 7, weeks: int = 4, top_services: int = 5) -> Dict:
+    """
+    Сводная статистика одним агрегирующим запросом.
+
+    Возвращает словарь:
+        by_status   — {статус: количество заявок}
+        by_service  — {услуга: количество} (top_services самых частых)
+        by_day      — {'YYYY-MM-DD': количество} за последние days дней
+        by_week     — {'YYYY-MM-DD' понедельника: количество} за последние weeks недель
+        questions   — {статус: количество вопросов}
+        total       — всего заявок
+        funnel      — [(этап, сколько заявок дошли до этапа)] по FUNNEL_STAGES
+    """
+    stats = {
+        'by_status': {},
+        'by_service': {},
+        'by_day': {},
+        'by_week': {},
+        'questions': {},
+        'total': 0,
+        'funnel': [],
+    }
+    # Максимальный этап каждой заявки по истории статусов:
+    # 1 — подтверждена, 2 — отправлена в оплату, 3 — завершена
+    query = """
+        SELECT 'status' AS dim, status AS key, COUNT(*) AS cnt
+        FROM appointments GROUP BY status
+        UNION ALL
+        SELECT * FROM (
+            SELECT 'service', service_type, COUNT(*) AS cnt
+            FROM appointments GROUP BY service_type
+            ORDER BY cnt DESC LIMIT ?
+        )
+        UNION ALL
+        SELECT 'day', date(created_at, 'localtime'), COUNT(*)
+        FROM appointments
+        WHERE created_at >= datetime('now', 'localtime', 'start of day', ?, 'utc')
+        GROUP BY date(created_at, 'localtime')
+        UNION ALL
+        SELECT 'week', date(created_at, 'localtime', 'weekday 0', '-6 days'), COUNT(*)
+        FROM appointments
+        WHERE created_at >= datetime('now', 'localtime', 'start of day', 'weekday 0', '-6 days', ?, 'utc')
+        GROUP BY date(created_at, 'localtime', 'weekday 0', '-6 days')
+        UNION ALL
+        SELECT 'question', status, COUNT(*)
+        FROM questions GROUP BY status
+        UNION ALL
+        SELECT 'funnel', stage, COUNT(*) FROM (
+            SELECT MAX(CASE new_status
+                           WHEN 'confirmed' THEN 1
+                           WHEN 'payment_sent' THEN 2
+                           WHEN 'completed' THEN 3
+                           ELSE 0
+                       END) AS stage
+            FROM appointment_status_history
+            GROUP BY appointment_id
+        ) GROUP BY stage
+    """
+    # created_at хранится в UTC (CURRENT_TIMESTAMP), а дни и недели считаются
+    # по местному времени: границы переводятся обратно в UTC, чтобы сравнение
+    # шло по индексу created_at
+    params = (top_services, f'-{max(days, 1) - 1} days', f'-{(max(weeks, 1) - 1) * 7} days')
+
+    reached = [0] * len(FUNNEL_STAGES)
+    async with _reader() as db:
+        async with db.execute(query, params) as cursor:
+            async for dim, key, cnt in cursor:
+                if dim == 'status':
+                    stats['by_status'][key] = cnt
+                    stats['total'] += cnt
+                elif dim == 'service':
+                    stats['by_service'][key] = cnt
+                elif dim == 'day':
+                    stats['by_day'][key] = cnt
+                elif dim == 'week':
+                    stats['by_week'][key] = cnt
+                elif dim == 'question':
+                    stats['questions'][key] = cnt
+                elif dim == 'funnel':
+                    # Заявка, дошедшая до этапа N, прошла и все предыдущие
+                    for stage in range(1, int(key) + 1):
+                        reached[stage] += cnt
+
+    # На первом этапе — все созданные заявки
+    reached[0] = stats['total']
+    stats['funnel'] = list(zip(FUNNEL_STAGES, reached))
+    return stats
+
+
+@timed_query
+async def get_new_items_counts() -> Dict:
+    """Количество ожидающих заявок и новых вопросов (без выборки самих строк)"""
+    async with _reader() as db:
+        async with db.execute(
+            """SELECT
+                   (SELECT COUNT(*) FROM appointments WHERE status = 'pending'),
+                   (SELECT COUNT(*) FROM questions WHERE status = 'new')"""
+        ) as cursor:
+            row = await cursor.fetchone()
+            return {'appointments': row[0], 'questions': row[1]}
@@ -1,3 +1,5 @@
+-- Миграция 0001: исходная схема (бывший database/init.sql)
+
 -- Таблица пользователей
 CREATE TABLE IF NOT EXISTS users (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
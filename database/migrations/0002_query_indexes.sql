@@ -0,0 +1,35 @@
+-- Миграция 0002: составные и частичные индексы под основные запросы database.py
+
+-- Записи на дату / за период, сортировка по времени
+-- (get_appointments_by_date, get_appointments_in_range, get_appointments_for_reminder)
+DROP INDEX IF EXISTS idx_appointments_date;
+CREATE INDEX IF NOT EXISTS idx_appointments_date ON appointments(appointment_date, appointment_time);
+
+-- Записи пользователя, сортировка по дате (get_user_appointments)
+CREATE INDEX IF NOT EXISTS idx_appointments_user ON appointments(user_id, appointment_date, appointment_time);
+
+-- Списки по статусу, новые сверху, keyset-пагинация по (created_at, id)
+-- (get_pending_appointments, get_appointments_by_status, get_appointments_page, get_all_appointments)
+DROP INDEX IF EXISTS idx_appointments_status;
+CREATE INDEX IF NOT EXISTS idx_appointments_status_created ON appointments(status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_appointments_created ON appointments(created_at, id);
+
+-- Группировка по услугам в статистике (get_statistics)
+CREATE INDEX IF NOT EXISTS idx_appointments_service ON appointments(service_type);
+
+-- Вопросы по статусу, новые сверху (get_new_questions, get_questions_page, get_all_questions)
+DROP INDEX IF EXISTS idx_questions_status;
+CREATE INDEX IF NOT EXISTS idx_questions_status_created ON questions(status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_questions_created ON questions(created_at, id);
+
+-- История заявки по времени (get_appointment_history)
+DROP INDEX IF EXISTS idx_status_history_appointment;
+CREATE INDEX IF NOT EXISTS idx_status_history_appointment ON appointment_status_history(appointment_id, created_at);
+
+-- Только ожидающие напоминания, по времени отправки (get_pending_reminders)
+DROP INDEX IF EXISTS idx_reminders_scheduled;
+DROP INDEX IF EXISTS idx_reminders_status;
+CREATE INDEX IF NOT EXISTS idx_reminders_pending ON reminders(scheduled_at) WHERE status = 'pending';
+
+-- LEFT JOIN напоминаний по (appointment_id, reminder_type) (get_appointments_for_reminder)
+CREATE INDEX IF NOT EXISTS idx_reminders_appointment ON reminders(appointment_id, reminder_type);
@@ -0,0 +1,18 @@
+-- Не больше одного напоминания каждого типа на запись.
+-- Повторный запуск планирования (или два параллельных) больше не создаёт дублей:
+-- массовая вставка идёт через INSERT OR IGNORE.
+
+-- Удаляем накопившиеся дубли, оставляя уже отправленное напоминание (или самое раннее)
+DELETE FROM reminders WHERE id IN (
+    SELECT id FROM (
+        SELECT id, ROW_NUMBER() OVER (
+            PARTITION BY appointment_id, reminder_type
+            ORDER BY status = 'pending', id
+        ) AS rn
+        FROM reminders
+    )
+    WHERE rn > 1
+);
+
+DROP INDEX IF EXISTS idx_reminders_appointment;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_reminders_appointment ON reminders(appointment_id, reminder_type);
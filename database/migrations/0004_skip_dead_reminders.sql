@@ -0,0 +1,6 @@
+-- Напоминания отменённых и завершённых записей больше не ждут отправки:
+-- update_appointment_status переводит их в 'skipped', а здесь закрываются
+-- накопившиеся до этого (иначе они вечно грузятся в очередь планировщика)
+UPDATE reminders SET status = 'skipped'
+WHERE status = 'pending'
+AND appointment_id IN (SELECT id FROM appointments WHERE status IN ('cancelled', 'completed'));
@@ -1,9 +1,9 @@
 from .start import start_handler, main_menu_handler
-from .services import services_handler, legal_entities_handler, entrepreneurs_handler, individuals_handler, service_detail_handler, service_callback_handler
+from .services import services_handler, legal_entities_handler, entrepreneurs_handler, individuals_handler, service_detail_handler, service_callback_handler, inline_search_handler
 from .appointment import appointment_handler, appointment_callback_handler, process_appointment, my_appointments_handler
 from .simple_appointment import process_simple_appointment, SIMPLE_APPOINTMENT_STATES, submit_appointment_callback, cancel_appointment_callback
 from .question import question_handler, process_question
-from .admin import admin_handler, admin_commands_handler, admin_callback_handler
+from .admin import admin_handler, admin_commands_handler, admin_callback_handler, reload_catalog_handler
 from .admin_reply import admin_reply_handler
 from .contacts import contacts_handler, about_handler
 from .unified_message_handler import unified_message_handler
@@ -18,6 +18,7 @@ __all__ = [
     'individuals_handler',
     'service_detail_handler',
     'service_callback_handler',
+    'inline_search_handler',
     'appointment_handler',
     'appointment_callback_handler',
     'process_appointment',
@@ -31,6 +32,7 @@ __all__ = [
     'admin_handler',
     'admin_commands_handler',
     'admin_callback_handler',
+    'reload_catalog_handler',
     'admin_reply_handler',
     'contacts_handler',
     'about_handler',
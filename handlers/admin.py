@@ -1,18 +1,25 @@
 from telegram import Update, InputFile
 from telegram.ext import ContextTypes
 from database import (
-    is_admin, get_pending_appointments, get_new_questions, get_appointments_by_date,
+    is_admin, get_appointments_in_range, get_appointments_page, get_questions_page, count_appointments,
     update_appointment_status, update_question_status, get_appointment_by_id, get_question_by_id,
-    get_appointment_history, get_appointments_by_status
+    get_appointment_history, get_statistics, get_new_items_counts
 )
 from keyboards.admin import (
     admin_keyboard, appointments_list_keyboard, questions_list_keyboard,
     appointment_actions_keyboard, question_actions_keyboard, export_keyboard,
-    all_appointments_filter_keyboard, all_appointments_list_keyboard, all_appointment_actions_keyboard
+    all_appointments_filter_keyboard, all_appointments_list_keyboard, all_appointment_actions_keyboard,
+    new_requests_keyboard
 )
 from keyboards.main_menu import main_menu_keyboard
-from utils.export import export_appointments_csv, export_questions_csv, format_history_entry
+from utils.export import (
+    export_appointments_csv, export_questions_csv, export_size, format_history_entry,
+    STATUS_NAMES, TELEGRAM_UPLOAD_LIMIT
+)
 from utils.notifications import notify_client_status_change
+from utils.text import split_message
+from data.catalog import reload_catalog
+from config import CALENDAR_DAYS, CATALOG_PATH
 from datetime import date, timedelta
 import logging
 
@@ -39,6 +46,111 @@ async def admin_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         reply_markup=admin_keyboard()
     )
 
+async def reload_catalog_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Команда /reload_catalog: перечитать каталог услуг и цен без перезапуска"""
+    if not await is_admin(update.effective_user.id):
+        return
+
+    try:
+        catalog = await reload_catalog()
+    except Exception as e:
+        logger.error(f"Ошибка перезагрузки каталога по команде: {e}")
+        await update.message.reply_text(
+            f"❌ Каталог не перезагружен, действует прежний.\n\nОшибка в {CATALOG_PATH}:\n{e}"
+        )
+        return
+
+    await update.message.reply_text(
+        f"✅ Каталог перезагружен: услуг — {len(catalog.services)}, категорий — {len(catalog.categories)}"
+    )
+
+async def _send_export(query, export, caption: str):
+    """Сформировать CSV (корутина export_*_csv) и отправить документом; временный файл закрывается"""
+    await query.answer("⏳ Формирую файл...")
+    try:
+        file_data, filename = await export
+    except Exception as e:
+        logger.error(f"Ошибка экспорта: {e}")
+        await query.edit_message_text(f"❌ Ошибка экспорта: {e}", reply_markup=None)
+        return
+
+    with file_data:
+        size = export_size(file_data)
+        if size > TELEGRAM_UPLOAD_LIMIT:
+            await query.edit_message_text(
+                f"❌ Файл получился слишком большим ({size / 1024 / 1024:.0f} МБ, "
+                f"Telegram принимает до {TELEGRAM_UPLOAD_LIMIT // 1024 // 1024} МБ). Выберите фильтр по статусу.",
+                reply_markup=None
+            )
+            return
+        try:
+            await query.message.reply_document(
+                document=InputFile(file_data, filename=filename),
+                caption=caption
+            )
+            await query.edit_message_text("✅ Файл экспортирован", reply_markup=None)
+        except Exception as e:
+            logger.error(f"Ошибка экспорта: {e}")
+            await query.edit_message_text(f"❌ Ошибка экспорта: {e}", reply_markup=None)
+
+def format_statistics(stats: dict, days: int = 7) -> str:
+    """Форматирование сводной статистики для экрана «📊 Статистика»"""
+    msg = "📊 Статистика\n\n"
+
+    msg += f"📞 Всего заявок: {stats['total']}\n"
+    for status, count in sorted(stats['by_status'].items(), key=lambda x: -x[1]):
+        msg += f"   • {STATUS_NAMES.get(status, status)}: {count}\n"
+
+    questions_total = sum(stats['questions'].values())
+    msg += f"\n❓ Всего вопросов: {questions_total}\n"
+    for status, count in sorted(stats['questions'].items(), key=lambda x: -x[1]):
+        msg += f"   • {STATUS_NAMES.get(status, status)}: {count}\n"
+
+    # По дням — показываем и дни без заявок
+    msg += f"\n📅 Новые заявки за {days} дн.:\n"
+    today = date.today()
+    for i in range(days - 1, -1, -1):
+        day = today - timedelta(days=i)
+        msg += f"   {day.strftime('%d.%m')}: {stats['by_day'].get(day.isoformat(), 0)}\n"
+
+    if stats['by_week']:
+        msg += "\n🗓 По неделям:\n"
+        for monday, count in sorted(stats['by_week'].items()):
+            msg += f"   с {date.fromisoformat(monday).strftime('%d.%m.%Y')}: {count}\n"
+
+    if stats['by_service']:
+        msg += "\n🏷 Популярные услуги:\n"
+        for i, (service, count) in enumerate(stats['by_service'].items(), start=1):
+            name = service[:30] + '...' if len(service) > 30 else service
+            msg += f"   {i}. {name} — {count}\n"
+
+    # Воронка: доля заявок, дошедших до каждого этапа
+    funnel_names = {
+        'pending': 'Созданы',
+        'confirmed': 'Подтверждены',
+        'payment_sent': 'Отправлены в оплату',
+        'completed': 'Завершены',
+    }
+    total = stats['total']
+    if total:
+        msg += "\n🔀 Воронка:\n"
+        for stage, count in stats['funnel']:
+            msg += f"   {funnel_names.get(stage, stage)}: {count} ({count * 100 // total}%)\n"
+
+    return msg
+
+
+def _parse_page_callback(payload: str) -> tuple[str, int, str]:
+    """
+    Разобрать хвост callback_data пагинации: {p|n}_{страница}_{курсор}.
+    Возвращает (направление для get_*_page, номер страницы, курсор).
+    """
+    direction, page, cursor = payload.split('_')
+    if direction not in ('p', 'n'):
+        raise ValueError(f"Неизвестное направление: {direction}")
+    return ('prev' if direction == 'p' else 'next'), int(page), cursor
+
+
 async def admin_commands_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработка команд админа"""
     user_id = update.effective_user.id
@@ -49,10 +161,9 @@ async def admin_commands_handler(update: Update, context: ContextTypes.DEFAULT_T
     text = update.message.text
     
     if text == '📋 Новые заявки':
-        appointments = await get_pending_appointments()
-        questions = await get_new_questions()
+        counts = await get_new_items_counts()
         
-        if not appointments and not questions:
+        if not counts['appointments'] and not counts['questions']:
             await update.message.reply_text(
                 "✅ Нет новых заявок и вопросов.",
                 reply_markup=admin_keyboard()
@@ -60,60 +171,50 @@ async def admin_commands_handler(update: Update, context: ContextTypes.DEFAULT_T
             return
         
         msg = f"📋 Новые заявки:\n\n"
-        msg += f"📞 Записи на консультацию: {len(appointments)}\n"
-        msg += f"❓ Вопросы: {len(questions)}\n\n"
+        msg += f"📞 Записи на консультацию: {counts['appointments']}\n"
+        msg += f"❓ Вопросы: {counts['questions']}\n\n"
         msg += "Используйте кнопки ниже для просмотра:"
         
-        from telegram import InlineKeyboardMarkup, InlineKeyboardButton
-        keyboard = [
-            [InlineKeyboardButton('📞 Записи', callback_data='appt_list')],
-            [InlineKeyboardButton('❓ Вопросы', callback_data='q_list')],
-            [InlineKeyboardButton('🔙 Назад', callback_data='admin_back')]
-        ]
-        
         await update.message.reply_text(
             msg,
-            reply_markup=InlineKeyboardMarkup(keyboard)
+            reply_markup=new_requests_keyboard()
         )
     
     elif text == '📅 Календарь записей':
         today = date.today()
-        week_appointments = []
-        
-        for i in range(7):
-            check_date = today + timedelta(days=i)
-            appointments = await get_appointments_by_date(check_date)
-            if appointments:
-                week_appointments.extend(appointments)
-        
-        if not week_appointments:
+        date_to = today + timedelta(days=max(CALENDAR_DAYS, 1) - 1)
+        period = f"{today.strftime('%d.%m')} – {date_to.strftime('%d.%m')}"
+
+        # Один запрос за весь период, строки уже отсортированы по дате и времени
+        appointments = await get_appointments_in_range(today, date_to)
+
+        if not appointments:
             await update.message.reply_text(
-                "📅 На ближайшую неделю нет записей.",
+                f"📅 На период {period} нет записей.",
                 reply_markup=admin_keyboard()
             )
             return
-        
-        msg = "📅 Записи на ближайшую неделю:\n\n"
-        for apt in sorted(week_appointments, key=lambda x: (x['appointment_date'], x['appointment_time'])):
-            msg += f"📅 {apt['appointment_date']} {apt['appointment_time']}\n"
-            msg += f"   {apt['client_name']} - {apt['client_phone']}\n"
-            msg += f"   {apt['service_type']}\n\n"
-        
-        await update.message.reply_text(
-            msg,
-            reply_markup=admin_keyboard()
-        )
-    
-    elif text == '📊 Статистика':
-        appointments = await get_pending_appointments()
-        questions = await get_new_questions()
 
-        msg = f"""
-📊 Статистика
+        blocks = [
+            f"📅 {apt['appointment_date']} {apt['appointment_time']}\n"
+            f"   {apt['client_name']} - {apt['client_phone']}\n"
+            f"   {apt['service_type']}\n\n"
+            for apt in appointments
+        ]
 
-📞 Ожидающих записей: {len(appointments)}
-❓ Новых вопросов: {len(questions)}
-"""
+        # Разбиваем на сообщения в пределах лимита Telegram (запас под номер страницы)
+        pages = split_message(blocks, header=f"📅 Записи на период {period}:\n\n", limit=4000)
+        for i, page in enumerate(pages, start=1):
+            if len(pages) > 1:
+                page += f"📄 Страница {i} из {len(pages)}"
+            await update.message.reply_text(
+                page,
+                reply_markup=admin_keyboard() if i == len(pages) else None
+            )
+    
+    elif text == '📊 Статистика':
+        stats = await get_statistics(days=7, weeks=4)
+        msg = format_statistics(stats, days=7)
         await update.message.reply_text(
             msg,
             reply_markup=admin_keyboard()
@@ -158,7 +259,7 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
         )
     
     elif data == 'appt_list':
-        appointments = await get_pending_appointments()
+        appointments, has_prev, has_next = await get_appointments_page(status='pending')
         if not appointments:
             await query.edit_message_text(
                 "✅ Нет новых записей на консультацию.",
@@ -168,13 +269,21 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
         
         await query.edit_message_text(
             "📞 Записи на консультацию:",
-            reply_markup=appointments_list_keyboard(appointments, page=0)
+            reply_markup=appointments_list_keyboard(appointments, page=0, has_prev=has_prev, has_next=has_next)
         )
     
     elif data.startswith('appt_page_'):
-        # Обработка пагинации списка заявок
-        page = int(data.split('_')[-1])
-        appointments = await get_pending_appointments()
+        # Обработка пагинации списка заявок (курсор в callback_data)
+        try:
+            direction, page, cursor = _parse_page_callback(data[len('appt_page_'):])
+            appointments, has_prev, has_next = await get_appointments_page(
+                status='pending', cursor=cursor, direction=direction
+            )
+        except ValueError as e:
+            logger.error(f"Ошибка разбора пагинации из '{data}': {e}")
+            await query.answer("❌ Ошибка навигации", show_alert=True)
+            return
+
         if not appointments:
             await query.edit_message_text(
                 "✅ Нет новых записей на консультацию.",
@@ -184,7 +293,7 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
         
         await query.edit_message_text(
             f"📞 Записи на консультацию (страница {page + 1}):",
-            reply_markup=appointments_list_keyboard(appointments, page=page)
+            reply_markup=appointments_list_keyboard(appointments, page=page, has_prev=has_prev, has_next=has_next)
         )
     
     elif data.startswith('appt_detail_'):
@@ -392,7 +501,7 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
             await query.answer("❌ Ошибка: неверный ID вопроса", show_alert=True)
     
     elif data == 'q_list':
-        questions = await get_new_questions()
+        questions, has_prev, has_next = await get_questions_page(status='new')
         if not questions:
             await query.edit_message_text(
                 "✅ Нет новых вопросов.",
@@ -402,13 +511,21 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
         
         await query.edit_message_text(
             "❓ Новые вопросы:",
-            reply_markup=questions_list_keyboard(questions, page=0)
+            reply_markup=questions_list_keyboard(questions, page=0, has_prev=has_prev, has_next=has_next)
         )
     
     elif data.startswith('q_page_'):
-        # Обработка пагинации списка вопросов
-        page = int(data.split('_')[-1])
-        questions = await get_new_questions()
+        # Обработка пагинации списка вопросов (курсор в callback_data)
+        try:
+            direction, page, cursor = _parse_page_callback(data[len('q_page_'):])
+            questions, has_prev, has_next = await get_questions_page(
+                status='new', cursor=cursor, direction=direction
+            )
+        except ValueError as e:
+            logger.error(f"Ошибка разбора пагинации из '{data}': {e}")
+            await query.answer("❌ Ошибка навигации", show_alert=True)
+            return
+
         if not questions:
             await query.edit_message_text(
                 "✅ Нет новых вопросов.",
@@ -418,7 +535,7 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
         
         await query.edit_message_text(
             f"❓ Новые вопросы (страница {page + 1}):",
-            reply_markup=questions_list_keyboard(questions, page=page)
+            reply_markup=questions_list_keyboard(questions, page=page, has_prev=has_prev, has_next=has_next)
         )
     
     elif data.startswith('q_detail_'):
@@ -547,56 +664,16 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
 
     # Экспорт данных
     elif data == 'export_appointments_all':
-        await query.answer("⏳ Формирую файл...")
-        try:
-            file_data, filename = await export_appointments_csv()
-            await query.message.reply_document(
-                document=InputFile(file_data, filename=filename),
-                caption="📥 Все заявки"
-            )
-            await query.edit_message_text("✅ Файл экспортирован", reply_markup=None)
-        except Exception as e:
-            logger.error(f"Ошибка экспорта: {e}")
-            await query.edit_message_text(f"❌ Ошибка экспорта: {e}", reply_markup=None)
+        await _send_export(query, export_appointments_csv(), "📥 Все заявки")
 
     elif data == 'export_appointments_pending':
-        await query.answer("⏳ Формирую файл...")
-        try:
-            file_data, filename = await export_appointments_csv(status='pending')
-            await query.message.reply_document(
-                document=InputFile(file_data, filename=filename),
-                caption="📥 Ожидающие заявки"
-            )
-            await query.edit_message_text("✅ Файл экспортирован", reply_markup=None)
-        except Exception as e:
-            logger.error(f"Ошибка экспорта: {e}")
-            await query.edit_message_text(f"❌ Ошибка экспорта: {e}", reply_markup=None)
+        await _send_export(query, export_appointments_csv(status='pending'), "📥 Ожидающие заявки")
 
     elif data == 'export_appointments_confirmed':
-        await query.answer("⏳ Формирую файл...")
-        try:
-            file_data, filename = await export_appointments_csv(status='confirmed')
-            await query.message.reply_document(
-                document=InputFile(file_data, filename=filename),
-                caption="📥 Подтверждённые заявки"
-            )
-            await query.edit_message_text("✅ Файл экспортирован", reply_markup=None)
-        except Exception as e:
-            logger.error(f"Ошибка экспорта: {e}")
-            await query.edit_message_text(f"❌ Ошибка экспорта: {e}", reply_markup=None)
+        await _send_export(query, export_appointments_csv(status='confirmed'), "📥 Подтверждённые заявки")
 
     elif data == 'export_questions':
-        await query.answer("⏳ Формирую файл...")
-        try:
-            file_data, filename = await export_questions_csv()
-            await query.message.reply_document(
-                document=InputFile(file_data, filename=filename),
-                caption="📥 Все вопросы"
-            )
-            await query.edit_message_text("✅ Файл экспортирован", reply_markup=None)
-        except Exception as e:
-            logger.error(f"Ошибка экспорта: {e}")
-            await query.edit_message_text(f"❌ Ошибка экспорта: {e}", reply_markup=None)
+        await _send_export(query, export_questions_csv(), "📥 Все вопросы")
 
     # ========== ВСЕ ЗАЯВКИ ==========
 
@@ -613,7 +690,7 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
         status_filter = data.replace('allappt_filter_', '')
         context.user_data['allappt_filter'] = status_filter
 
-        appointments = await get_appointments_by_status(status_filter if status_filter != 'all' else None)
+        appointments, has_prev, has_next = await get_appointments_page(status=status_filter)
 
         if not appointments:
             status_names = {
@@ -639,18 +716,28 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
             'cancelled': '❌ Отменённые заявки'
         }
 
+        total = await count_appointments(status_filter)
         await query.edit_message_text(
-            f"{status_titles.get(status_filter, '📁 Заявки')} ({len(appointments)}):",
-            reply_markup=all_appointments_list_keyboard(appointments, page=0, status_filter=status_filter)
+            f"{status_titles.get(status_filter, '📁 Заявки')} ({total}):",
+            reply_markup=all_appointments_list_keyboard(
+                appointments, page=0, has_prev=has_prev, has_next=has_next, status_filter=status_filter
+            )
         )
 
     elif data.startswith('allappt_page_'):
-        # Пагинация в разделе "Все заявки"
-        parts = data.split('_')
-        status_filter = parts[2]
-        page = int(parts[3])
-
-        appointments = await get_appointments_by_status(status_filter if status_filter != 'all' else None)
+        # Пагинация в разделе "Все заявки": allappt_page_{статус}_{p|n}_{страница}_{курсор}
+        # Статус может содержать '_' (payment_sent), поэтому разбираем справа
+        try:
+            parts = data[len('allappt_page_'):].rsplit('_', 3)
+            status_filter = parts[0]
+            direction, page, cursor = _parse_page_callback('_'.join(parts[1:]))
+            appointments, has_prev, has_next = await get_appointments_page(
+                status=status_filter, cursor=cursor, direction=direction
+            )
+        except ValueError as e:
+            logger.error(f"Ошибка разбора пагинации из '{data}': {e}")
+            await query.answer("❌ Ошибка навигации", show_alert=True)
+            return
 
         if not appointments:
             await query.edit_message_text(
@@ -661,7 +748,9 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
 
         await query.edit_message_text(
             f"📁 Заявки (страница {page + 1}):",
-            reply_markup=all_appointments_list_keyboard(appointments, page=page, status_filter=status_filter)
+            reply_markup=all_appointments_list_keyboard(
+                appointments, page=page, has_prev=has_prev, has_next=has_next, status_filter=status_filter
+            )
         )
 
     elif data.startswith('allappt_detail_'):
@@ -735,7 +824,7 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
     elif data == 'allappt_back_to_list':
         # Вернуться к списку заявок
         status_filter = context.user_data.get('allappt_filter', 'all')
-        appointments = await get_appointments_by_status(status_filter if status_filter != 'all' else None)
+        appointments, has_prev, has_next = await get_appointments_page(status=status_filter)
 
         if not appointments:
             await query.edit_message_text(
@@ -744,9 +833,12 @@ async def admin_callback_handler(update: Update, context: ContextTypes.DEFAULT_T
             )
             return
 
+        total = await count_appointments(status_filter)
         await query.edit_message_text(
-            f"📁 Заявки ({len(appointments)}):",
-            reply_markup=all_appointments_list_keyboard(appointments, page=0, status_filter=status_filter)
+            f"📁 Заявки ({total}):",
+            reply_markup=all_appointments_list_keyboard(
+                appointments, page=0, has_prev=has_prev, has_next=has_next, status_filter=status_filter
+            )
         )
 
     elif data.startswith('allappt_confirm_'):
@@ -1,13 +1,17 @@
-from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
+from telegram import Update, InlineQueryResultArticle, InputTextMessageContent
 from telegram.ext import ContextTypes
 from keyboards.services import (
     services_keyboard,
     legal_entities_keyboard,
     entrepreneurs_keyboard,
-    individuals_keyboard
+    individuals_keyboard,
+    service_actions_keyboard,
+    search_results_keyboard
 )
 from keyboards.main_menu import main_menu_keyboard, cancel_keyboard
-from data.prices import get_service_info
+from data.catalog import get_catalog
+from data.prices import DEFAULT_SERVICE_TEXT
+from config import CATALOG_RELOAD_INTERVAL
 import logging
 
 logger = logging.getLogger(__name__)
@@ -119,21 +123,33 @@ async def service_detail_handler(update: Update, context: ContextTypes.DEFAULT_T
     
     logger.info(f"service_detail_handler: обрабатываем выбор услуги: {service_name}")
 
+    # Ищем услугу в индексе каталога (название кнопки с точностью до пробелов и эмодзи)
+    # Один снимок на весь обработчик: каталог может перезагрузиться во время await
+    catalog = get_catalog()
+    service = catalog.find(service_name)
+    if service is not None:
+        service_name = service.name
+        info_text = service.text
+    else:
+        # Точного совпадения нет — ищем по словам в названиях и описаниях услуг
+        found = catalog.search(service_name)
+        if found:
+            logger.info(f"service_detail_handler: по запросу '{service_name}' найдено услуг: {len(found)}")
+            await update.message.reply_text(
+                f"🔎 По запросу «{service_name}» нашлись услуги:",
+                reply_markup=search_results_keyboard(found)
+            )
+            return
+        info_text = DEFAULT_SERVICE_TEXT.format(service_name=service_name)
+
     # Сохраняем выбранную услугу в контексте
     context.user_data['selected_service'] = service_name
     logger.info(f"Услуга сохранена в контексте: {service_name}")
 
-    # Получаем информацию об услуге из data/prices.py
-    info_text = get_service_info(service_name)
-    
     logger.info(f"Информация об услуге: длина текста={len(info_text)}")
     
     # Кнопки для действий
-    keyboard = [
-        [InlineKeyboardButton('📝 Оставить заявку', callback_data='start_appointment')],
-        [InlineKeyboardButton('🔙 Назад к услугам', callback_data='back_to_services')]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    reply_markup = service_actions_keyboard()
     
     logger.info(f"Отправляем описание услуги с кнопками: {service_name}")
     try:
@@ -194,6 +210,18 @@ async def service_callback_handler(update: Update, context: ContextTypes.DEFAULT
         logger.info(f"Запрос на ввод ФИО отправлен. user_data = {context.user_data}")
         return
 
+    elif query.data.startswith('svc_'):
+        # Услуга из inline-списка подкатегории: callback_data = svc_{ID}
+        service_id = query.data[len('svc_'):]
+        service = get_catalog().get(int(service_id)) if service_id.isdigit() else None
+        if service is None:
+            await query.edit_message_text("Услуга не найдена. Выберите категорию в меню ниже.")
+            return
+
+        context.user_data['selected_service'] = service.name
+        await query.edit_message_text(service.text, reply_markup=service_actions_keyboard())
+        return
+
     elif query.data == 'back_to_services':
         # Просто редактируем сообщение, убирая кнопки
         await query.edit_message_text(
@@ -206,3 +234,38 @@ async def service_callback_handler(update: Update, context: ContextTypes.DEFAULT
             reply_markup=services_keyboard()
         )
         return
+
+
+# Сколько результатов показывать в inline-режиме
+INLINE_RESULTS_LIMIT = 20
+
+
+def _service_summary(text: str) -> str:
+    """Строка с ценой (или первая строка описания) для подписи результата"""
+    lines = [line.strip() for line in text.strip().splitlines()[1:] if line.strip()]
+    for line in lines:
+        if '₽' in line:
+            return line.lstrip('•💰 ')
+    return lines[0] if lines else ''
+
+
+async def inline_search_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Inline-режим (@бот запрос): поиск услуг по тому же индексу"""
+    query = update.inline_query.query.strip()
+    catalog = get_catalog()
+    if query:
+        services = catalog.search(query, limit=INLINE_RESULTS_LIMIT)
+    else:
+        services = list(catalog.services.values())[:INLINE_RESULTS_LIMIT]
+
+    results = [
+        InlineQueryResultArticle(
+            id=str(service.id),
+            title=service.name,
+            description=_service_summary(service.text),
+            input_message_content=InputTextMessageContent(service.text),
+        )
+        for service in services
+    ]
+    # Telegram кеширует ответ; дольше интервала проверки каталога держать его незачем
+    await update.inline_query.answer(results, cache_time=int(max(CATALOG_RELOAD_INTERVAL, 10)))
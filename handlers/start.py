@@ -1,7 +1,7 @@
 from telegram import Update
 from telegram.ext import ContextTypes
 from database import add_user, is_admin
-from keyboards.main_menu import main_menu_keyboard
+from keyboards.main_menu import main_menu_keyboard, admin_main_menu_keyboard
 import logging
 
 logger = logging.getLogger(__name__)
@@ -37,15 +37,7 @@ async def start_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     # Если админ, показываем кнопку админ-панели
     if is_user_admin:
-        from telegram import ReplyKeyboardMarkup, KeyboardButton
-        keyboard = [
-            [KeyboardButton('📋 Наши услуги')],
-            [KeyboardButton('📞 Записаться на консультацию')],
-            [KeyboardButton('❓ Задать вопрос')],
-            [KeyboardButton('ℹ️ О компании'), KeyboardButton('📍 Контакты')],
-            [KeyboardButton('🔐 Админ-панель')],
-        ]
-        reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+        reply_markup = admin_main_menu_keyboard()
     else:
         reply_markup = main_menu_keyboard()
     
@@ -66,15 +58,7 @@ async def main_menu_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     is_user_admin = await is_admin(user.id)
     
     if is_user_admin:
-        from telegram import ReplyKeyboardMarkup, KeyboardButton
-        keyboard = [
-            [KeyboardButton('📋 Наши услуги')],
-            [KeyboardButton('📞 Записаться на консультацию')],
-            [KeyboardButton('❓ Задать вопрос')],
-            [KeyboardButton('ℹ️ О компании'), KeyboardButton('📍 Контакты')],
-            [KeyboardButton('🔐 Админ-панель')],
-        ]
-        reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+        reply_markup = admin_main_menu_keyboard()
     else:
         reply_markup = main_menu_keyboard()
     
@@ -0,0 +1,88 @@
+"""
+Маршрутизация кнопок меню по точному тексту
+
+Вместо цепочки MessageHandler(filters.Regex(...)) — один обработчик и
+словарь «текст кнопки → обработчик»: выбор обработчика стоит один поиск в
+словаре. Если точного совпадения нет, текст нормализуется (пробелы,
+вариационные селекторы эмодзи) и ищется ещё раз.
+"""
+from telegram import Message, Update
+from telegram.ext import ContextTypes
+from telegram.ext.filters import MessageFilter
+
+from metrics import timed_handler
+from utils.text import normalize_label
+from .start import main_menu_handler
+from .services import services_handler, legal_entities_handler, entrepreneurs_handler, individuals_handler
+from .appointment import my_appointments_handler
+from .admin import admin_handler, admin_commands_handler
+from .contacts import contacts_handler, about_handler
+
+# Кнопки, которые запускают ConversationHandler: они остаются в entry_points
+# своих диалогов, но общий обработчик текста не должен их перехватывать
+CONVERSATION_ENTRY_LABELS = frozenset({
+    '📞 Записаться на консультацию',
+    '❓ Задать вопрос',
+})
+
+# Текст кнопки → обработчик
+MENU_ROUTES = {
+    '🏠 Главное меню': main_menu_handler,
+    '🔙 Главное меню': main_menu_handler,
+    '📍 Контакты': contacts_handler,
+    'ℹ️ О компании': about_handler,
+    '📝 Мои записи': my_appointments_handler,
+    '🔐 Админ-панель': admin_handler,
+    '📋 Новые заявки': admin_commands_handler,
+    '📁 Все заявки': admin_commands_handler,
+    '📅 Календарь записей': admin_commands_handler,
+    '📊 Статистика': admin_commands_handler,
+    '📥 Экспорт данных': admin_commands_handler,
+    '📋 Наши услуги': services_handler,
+    '👔 Юридическим лицам': legal_entities_handler,
+    '💼 Предпринимателям': entrepreneurs_handler,
+    '👤 Физическим лицам': individuals_handler,
+    '🔙 Назад к услугам': services_handler,
+}
+
+# Все тексты кнопок меню (для исключения из общего обработчика текста)
+MENU_LABELS = frozenset(MENU_ROUTES) | CONVERSATION_ENTRY_LABELS
+
+# Обработчики обёрнуты замером времени, чтобы в /metrics было видно каждый отдельно
+_ROUTES = {label: timed_handler(handler) for label, handler in MENU_ROUTES.items()}
+_NORMALIZED_ROUTES = {normalize_label(label): handler for label, handler in _ROUTES.items()}
+
+
+def _find_route(text: str):
+    handler = _ROUTES.get(text)
+    if handler is None:
+        handler = _NORMALIZED_ROUTES.get(normalize_label(text))
+    return handler
+
+
+class _LabelFilter(MessageFilter):
+    """Фильтр: текст сообщения — одна из заданных кнопок (поиск в frozenset)"""
+
+    def __init__(self, labels: frozenset, name: str):
+        super().__init__(name=name)
+        self.labels = labels
+        self.normalized = frozenset(normalize_label(label) for label in labels)
+
+    def filter(self, message: Message) -> bool:
+        text = message.text
+        if not text:
+            return False
+        return text in self.labels or normalize_label(text) in self.normalized
+
+
+# Кнопки, которые обрабатывает menu_router
+menu_route_filter = _LabelFilter(frozenset(MENU_ROUTES), 'menu_route_filter')
+# Все кнопки меню, включая кнопки входа в диалоги
+menu_label_filter = _LabelFilter(MENU_LABELS, 'menu_label_filter')
+
+
+async def menu_router(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Вызвать обработчик нажатой кнопки меню"""
+    handler = _find_route(update.effective_message.text)
+    if handler is not None:
+        return await handler(update, context)
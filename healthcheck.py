@@ -3,10 +3,13 @@ Health Check сервер для мониторинга состояния бо
 Запускается параллельно с основным ботом
 """
 import asyncio
+import time
 from aiohttp import web
 import logging
 from datetime import datetime
 
+from config import WEBHOOK_URL, READY_CACHE_SECONDS, READY_DB_TIMEOUT, READY_UPDATES_MAX_AGE
+
 logger = logging.getLogger(__name__)
 
 # Глобальные переменные для отслеживания состояния
@@ -14,6 +17,10 @@ bot_started_at: datetime | None = None
 last_update_at: datetime | None = None
 is_healthy = False
 
+# Последний результат readiness-проверок: (monotonic время проверки, готов ли, ответ)
+_ready_cache: tuple[float, bool, dict] | None = None
+_ready_lock = asyncio.Lock()
+
 
 def set_bot_started():
     """Вызывается при старте бота"""
@@ -46,28 +53,152 @@ async def health_handler(request):
     if bot_started_at:
         uptime = (datetime.now() - bot_started_at).total_seconds()
 
+    from database import get_admin_cache_stats
+    from startup import get_startup_stats
+    from loop_monitor import loop_monitor
+    from data.catalog import get_catalog
+
+    catalog = get_catalog()
     return web.json_response({
         "status": "healthy",
         "started_at": bot_started_at.isoformat() if bot_started_at else None,
         "uptime_seconds": uptime,
         "last_activity": last_update_at.isoformat() if last_update_at else None,
+        "admin_cache": get_admin_cache_stats(),
+        "startup": get_startup_stats(),
+        "event_loop": loop_monitor.stats() if loop_monitor else None,
+        "catalog": {
+            "services": len(catalog.services),
+            "loaded_at": datetime.fromtimestamp(catalog.loaded_at).isoformat(),
+        },
     })
 
 
+async def _check_db() -> dict:
+    """Пробный запрос к БД с ограничением по времени"""
+    from database import ping_db
+    try:
+        elapsed = await asyncio.wait_for(ping_db(), READY_DB_TIMEOUT)
+        return {"ok": True, "seconds": round(elapsed, 4)}
+    except asyncio.TimeoutError:
+        return {"ok": False, "error": f"SELECT 1 дольше {READY_DB_TIMEOUT} с"}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+
+def _check_scheduler() -> dict:
+    """Задача планировщика напоминаний жива и не проспала свой шаг"""
+    from scheduler import reminder_scheduler
+    if reminder_scheduler is None:
+        return {"ok": False, "error": "планировщик не запущен"}
+    return reminder_scheduler.health()
+
+
+def _check_updates() -> dict:
+    """Бот получает обновления от Telegram"""
+    if WEBHOOK_URL:
+        from webhook import last_webhook_at
+        age = (datetime.now() - last_webhook_at).total_seconds() if last_webhook_at else None
+        # Без сообщений от пользователей Telegram ничего не присылает — это не ошибка
+        return {"ok": True, "mode": "webhook",
+                "last_delivery_age_seconds": round(age, 1) if age is not None else None}
+
+    from startup import seconds_since_get_updates
+    age = seconds_since_get_updates()
+    return {"ok": age is not None and age <= READY_UPDATES_MAX_AGE, "mode": "polling",
+            "last_get_updates_age_seconds": round(age, 1) if age is not None else None}
+
+
+def _check_event_loop() -> dict:
+    """Event loop не тормозит дольше допустимого"""
+    from loop_monitor import loop_monitor
+    if not loop_monitor:
+        return {"ok": True}
+    stats = loop_monitor.stats()
+    return {**stats, "ok": not stats["lagging"]}
+
+
+async def _run_readiness_checks() -> tuple[bool, dict]:
+    components = {}
+    started = time.perf_counter()
+    components["database"] = await _check_db()
+    for name, check in (("scheduler", _check_scheduler), ("updates", _check_updates),
+                        ("event_loop", _check_event_loop)):
+        try:
+            components[name] = check()
+        except Exception as e:
+            components[name] = {"ok": False, "error": str(e)}
+
+    ready = is_healthy and all(component["ok"] for component in components.values())
+    return ready, {
+        "status": "ready" if ready else "not ready",
+        "checked_at": datetime.now().isoformat(),
+        "check_seconds": round(time.perf_counter() - started, 4),
+        "components": components,
+    }
+
+
 async def ready_handler(request):
-    """Обработчик /ready эндпоинта (для Kubernetes)"""
-    if is_healthy:
-        return web.json_response({"status": "ready"})
-    return web.json_response({"status": "not ready"}, status=503)
+    """
+    Обработчик /ready эндпоинта (для Kubernetes).
+    Проверяет БД, планировщик, получение обновлений и event loop; результат
+    кешируется на READY_CACHE_SECONDS, чтобы частые пробы не нагружали бота.
+    """
+    global _ready_cache
+    if not is_healthy:
+        return web.json_response({"status": "not ready"}, status=503)
+
+    async with _ready_lock:
+        if _ready_cache is None or time.monotonic() - _ready_cache[0] >= READY_CACHE_SECONDS:
+            ready, body = await _run_readiness_checks()
+            _ready_cache = (time.monotonic(), ready, body)
+        _, ready, body = _ready_cache
+
+    return web.json_response(body, status=200 if ready else 503)
 
 
-async def start_health_server(port: int = 8080):
-    """Запускает HTTP сервер для health check"""
+async def loop_handler(request):
+    """Обработчик /health/loop эндпоинта: lag event loop и стеки последних блокировок"""
+    from loop_monitor import loop_monitor
+    if not loop_monitor:
+        return web.json_response({"status": "disabled"}, status=503)
+    return web.json_response({**loop_monitor.stats(), "recent_stalls": list(loop_monitor.stalls)})
+
+
+async def db_settings_handler(request):
+    """Обработчик /health/db эндпоинта: фактические настройки SQLite"""
+    from database import get_db_settings
+    try:
+        settings = await get_db_settings()
+    except Exception as e:
+        logger.error(f"Не удалось получить настройки БД: {e}")
+        return web.json_response({"status": "error", "message": str(e)}, status=503)
+    return web.json_response({"status": "ok", **settings})
+
+
+async def metrics_handler(request):
+    """Обработчик /metrics эндпоинта (формат Prometheus)"""
+    from metrics import render_metrics
+    return web.Response(text=render_metrics(), content_type='text/plain', charset='utf-8')
+
+
+async def start_health_server(port: int = 8080, telegram_app=None):
+    """
+    Запускает HTTP сервер для health check.
+    В режиме webhook (WEBHOOK_URL) на нём же принимаются update для telegram_app.
+    """
     app = web.Application()
     app.router.add_get('/health', health_handler)
     app.router.add_get('/ready', ready_handler)
+    app.router.add_get('/health/db', db_settings_handler)
+    app.router.add_get('/health/loop', loop_handler)
+    app.router.add_get('/metrics', metrics_handler)
     app.router.add_get('/', health_handler)  # Для удобства
 
+    if telegram_app is not None and WEBHOOK_URL:
+        from webhook import add_webhook_route
+        add_webhook_route(app, telegram_app)
+
     runner = web.AppRunner(app)
     await runner.setup()
 
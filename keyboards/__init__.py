@@ -1,6 +1,10 @@
 from .main_menu import main_menu_keyboard, back_to_main_keyboard
 from .services import services_keyboard, legal_entities_keyboard, entrepreneurs_keyboard, individuals_keyboard
 from .admin import admin_keyboard, appointments_list_keyboard, questions_list_keyboard
+from .static import build_static_keyboards
+
+# Статические клавиатуры собираем сразу при импорте, а не при первом нажатии
+build_static_keyboards()
 
 __all__ = [
     'main_menu_keyboard',
@@ -1,5 +1,8 @@
-from telegram import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
+from telegram import KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
+from database import make_cursor
+from .static import StaticReplyKeyboardMarkup, StaticInlineKeyboardMarkup, static_keyboard
 
+@static_keyboard
 def admin_keyboard():
     """Админ-панель"""
     keyboard = [
@@ -9,15 +12,40 @@ def admin_keyboard():
         [KeyboardButton('📥 Экспорт данных')],
         [KeyboardButton('🏠 Главное меню')]
     ]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+    return StaticReplyKeyboardMarkup(keyboard, resize_keyboard=True)
 
-def appointments_list_keyboard(appointments: list, page: int = 0, per_page: int = 5):
-    """Список записей с пагинацией"""
+@static_keyboard
+def new_requests_keyboard():
+    """Переход к новым записям и вопросам"""
+    keyboard = [
+        [InlineKeyboardButton('📞 Записи', callback_data='appt_list')],
+        [InlineKeyboardButton('❓ Вопросы', callback_data='q_list')],
+        [InlineKeyboardButton('🔙 Назад', callback_data='admin_back')]
+    ]
+    return StaticInlineKeyboardMarkup(keyboard)
+
+def _page_nav_buttons(prefix: str, rows: list, page: int, has_prev: bool, has_next: bool) -> list:
+    """
+    Кнопки навигации для keyset-пагинации.
+    callback_data: {prefix}_{p|n}_{номер страницы}_{курсор}
+    """
+    nav_buttons = []
+    if rows and has_prev:
+        nav_buttons.append(InlineKeyboardButton(
+            '◀️ Назад', callback_data=f'{prefix}_p_{max(page - 1, 0)}_{make_cursor(rows[0])}'
+        ))
+    if rows and has_next:
+        nav_buttons.append(InlineKeyboardButton(
+            'Вперед ▶️', callback_data=f'{prefix}_n_{page + 1}_{make_cursor(rows[-1])}'
+        ))
+    return nav_buttons
+
+
+def appointments_list_keyboard(appointments: list, page: int = 0, has_prev: bool = False, has_next: bool = False):
+    """Страница списка записей (строки уже выбраны get_appointments_page)"""
     keyboard = []
-    start = page * per_page
-    end = start + per_page
     
-    for appointment in appointments[start:end]:
+    for appointment in appointments:
         name = appointment['client_name']
         service = appointment['service_type'][:20] + '...' if len(appointment['service_type']) > 20 else appointment['service_type']
         # Формируем текст кнопки
@@ -32,11 +60,7 @@ def appointments_list_keyboard(appointments: list, page: int = 0, per_page: int
             )
         ])
     
-    nav_buttons = []
-    if page > 0:
-        nav_buttons.append(InlineKeyboardButton('◀️ Назад', callback_data=f'appt_page_{page-1}'))
-    if end < len(appointments):
-        nav_buttons.append(InlineKeyboardButton('Вперед ▶️', callback_data=f'appt_page_{page+1}'))
+    nav_buttons = _page_nav_buttons('appt_page', appointments, page, has_prev, has_next)
     
     if nav_buttons:
         keyboard.append(nav_buttons)
@@ -45,13 +69,11 @@ def appointments_list_keyboard(appointments: list, page: int = 0, per_page: int
     
     return InlineKeyboardMarkup(keyboard)
 
-def questions_list_keyboard(questions: list, page: int = 0, per_page: int = 5):
-    """Список вопросов с пагинацией"""
+def questions_list_keyboard(questions: list, page: int = 0, has_prev: bool = False, has_next: bool = False):
+    """Страница списка вопросов (строки уже выбраны get_questions_page)"""
     keyboard = []
-    start = page * per_page
-    end = start + per_page
     
-    for question in questions[start:end]:
+    for question in questions:
         text = question['question_text'][:30] + '...' if len(question['question_text']) > 30 else question['question_text']
         keyboard.append([
             InlineKeyboardButton(
@@ -60,11 +82,7 @@ def questions_list_keyboard(questions: list, page: int = 0, per_page: int = 5):
             )
         ])
     
-    nav_buttons = []
-    if page > 0:
-        nav_buttons.append(InlineKeyboardButton('◀️ Назад', callback_data=f'q_page_{page-1}'))
-    if end < len(questions):
-        nav_buttons.append(InlineKeyboardButton('Вперед ▶️', callback_data=f'q_page_{page+1}'))
+    nav_buttons = _page_nav_buttons('q_page', questions, page, has_prev, has_next)
     
     if nav_buttons:
         keyboard.append(nav_buttons)
@@ -90,6 +108,7 @@ def appointment_actions_keyboard(appointment_id: int):
     return InlineKeyboardMarkup(keyboard)
 
 
+@static_keyboard
 def export_keyboard():
     """Клавиатура выбора типа экспорта"""
     keyboard = [
@@ -99,7 +118,7 @@ def export_keyboard():
         [InlineKeyboardButton('❓ Экспорт вопросов', callback_data='export_questions')],
         [InlineKeyboardButton('🔙 Назад', callback_data='admin_back')]
     ]
-    return InlineKeyboardMarkup(keyboard)
+    return StaticInlineKeyboardMarkup(keyboard)
 
 def question_actions_keyboard(question_id: int):
     """Действия с вопросом"""
@@ -115,6 +134,7 @@ def question_actions_keyboard(question_id: int):
     return InlineKeyboardMarkup(keyboard)
 
 
+@static_keyboard
 def all_appointments_filter_keyboard():
     """Клавиатура фильтрации всех заявок по статусу"""
     keyboard = [
@@ -130,14 +150,13 @@ def all_appointments_filter_keyboard():
         [InlineKeyboardButton('❌ Отменённые', callback_data='allappt_filter_cancelled')],
         [InlineKeyboardButton('🔙 Назад', callback_data='admin_back')]
     ]
-    return InlineKeyboardMarkup(keyboard)
+    return StaticInlineKeyboardMarkup(keyboard)
 
 
-def all_appointments_list_keyboard(appointments: list, page: int = 0, per_page: int = 5, status_filter: str = 'all'):
-    """Список всех записей с пагинацией (для раздела 'Все заявки')"""
+def all_appointments_list_keyboard(appointments: list, page: int = 0, has_prev: bool = False,
+                                   has_next: bool = False, status_filter: str = 'all'):
+    """Страница списка всех записей (для раздела 'Все заявки')"""
     keyboard = []
-    start = page * per_page
-    end = start + per_page
 
     # Эмодзи статусов
     status_emoji = {
@@ -148,7 +167,7 @@ def all_appointments_list_keyboard(appointments: list, page: int = 0, per_page:
         'payment_sent': '💳'
     }
 
-    for appointment in appointments[start:end]:
+    for appointment in appointments:
         name = appointment['client_name']
         status = appointment.get('status', 'pending')
         emoji = status_emoji.get(status, '❓')
@@ -167,11 +186,7 @@ def all_appointments_list_keyboard(appointments: list, page: int = 0, per_page:
             )
         ])
 
-    nav_buttons = []
-    if page > 0:
-        nav_buttons.append(InlineKeyboardButton('◀️ Назад', callback_data=f'allappt_page_{status_filter}_{page-1}'))
-    if end < len(appointments):
-        nav_buttons.append(InlineKeyboardButton('Вперед ▶️', callback_data=f'allappt_page_{status_filter}_{page+1}'))
+    nav_buttons = _page_nav_buttons(f'allappt_page_{status_filter}', appointments, page, has_prev, has_next)
 
     if nav_buttons:
         keyboard.append(nav_buttons)
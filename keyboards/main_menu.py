@@ -1,5 +1,7 @@
-from telegram import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
+from telegram import KeyboardButton
+from .static import StaticReplyKeyboardMarkup, static_keyboard
 
+@static_keyboard
 def main_menu_keyboard():
     """Главное меню"""
     keyboard = [
@@ -9,23 +11,38 @@ def main_menu_keyboard():
         [KeyboardButton('❓ Задать вопрос')],
         [KeyboardButton('ℹ️ О компании'), KeyboardButton('📍 Контакты')],
     ]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+    return StaticReplyKeyboardMarkup(keyboard, resize_keyboard=True)
 
+@static_keyboard
+def admin_main_menu_keyboard():
+    """Главное меню администратора (с кнопкой админ-панели)"""
+    keyboard = [
+        [KeyboardButton('📋 Наши услуги')],
+        [KeyboardButton('📞 Записаться на консультацию')],
+        [KeyboardButton('❓ Задать вопрос')],
+        [KeyboardButton('ℹ️ О компании'), KeyboardButton('📍 Контакты')],
+        [KeyboardButton('🔐 Админ-панель')],
+    ]
+    return StaticReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+
+@static_keyboard
 def back_to_main_keyboard():
     """Кнопка возврата в главное меню"""
     keyboard = [[KeyboardButton('🏠 Главное меню')]]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+    return StaticReplyKeyboardMarkup(keyboard, resize_keyboard=True)
 
 
+@static_keyboard
 def cancel_keyboard():
     """Клавиатура с кнопкой отмены для процесса записи"""
     keyboard = [[KeyboardButton('❌ Отменить запись')]]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+    return StaticReplyKeyboardMarkup(keyboard, resize_keyboard=True)
 
+@static_keyboard
 def contact_keyboard():
     """Клавиатура с контактами"""
     keyboard = [
         [KeyboardButton('📞 Позвонить', request_contact=False)],
         [KeyboardButton('🏠 Главное меню')]
     ]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+    return StaticReplyKeyboardMarkup(keyboard, resize_keyboard=True)
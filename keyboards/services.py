@@ -1,11 +1,9 @@
 from telegram import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
-from data.service_categories import (
-    INDIVIDUALS_CATEGORIES,
-    ENTREPRENEURS_CATEGORIES,
-    LEGAL_ENTITIES_CATEGORIES
-)
+from data.catalog import CatalogSnapshot, get_catalog, register_catalog_part
+from .static import StaticReplyKeyboardMarkup, StaticInlineKeyboardMarkup, static_keyboard
 
 
+@static_keyboard
 def services_keyboard():
     """Меню выбора категории услуг"""
     keyboard = [
@@ -14,7 +12,60 @@ def services_keyboard():
         [KeyboardButton('👤 Физическим лицам')],
         [KeyboardButton('🏠 Главное меню')]
     ]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+    return StaticReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+
+
+def _subcategory_markup(catalog: CatalogSnapshot, category_type: str) -> InlineKeyboardMarkup:
+    keyboard = [
+        [InlineKeyboardButton(name, callback_data=f"subcat_{category_type}_{subcat_id}")]
+        for subcat_id, name in catalog.categories.get(category_type, {}).items()
+    ]
+    keyboard.append([InlineKeyboardButton('🔙 Назад к категориям', callback_data='back_to_categories')])
+    return StaticInlineKeyboardMarkup(keyboard)
+
+
+def _services_list_markup(catalog: CatalogSnapshot, category_type: str, subcategory: str) -> InlineKeyboardMarkup:
+    keyboard = [
+        [InlineKeyboardButton(service.name, callback_data=f"svc_{service.id}")]
+        for service in catalog.subcategory(category_type, subcategory)
+    ]
+    keyboard.append([InlineKeyboardButton('🔙 Назад', callback_data=f"back_subcat_{category_type}")])
+    return StaticInlineKeyboardMarkup(keyboard)
+
+
+def _category_menu_markup(catalog: CatalogSnapshot, category_type: str) -> ReplyKeyboardMarkup:
+    keyboard = [[KeyboardButton(catalog.services[service_id].name)] for service_id in catalog.menus.get(category_type, ())]
+    keyboard.append([KeyboardButton('🔙 Назад к услугам'), KeyboardButton('🏠 Главное меню')])
+    return StaticReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+
+
+def _build_catalog_keyboards(catalog: CatalogSnapshot) -> dict:
+    """Клавиатуры, зависящие от каталога; собираются вместе с каждым снимком каталога"""
+    keyboards = {}
+    for category_type in catalog.categories:
+        keyboards[('subcategories', category_type)] = _subcategory_markup(catalog, category_type)
+        keyboards[('menu', category_type)] = _category_menu_markup(catalog, category_type)
+    for category_type, subcategory in catalog.subcategory_services:
+        keyboards[('services', category_type, subcategory)] = _services_list_markup(catalog, category_type, subcategory)
+    return keyboards
+
+
+register_catalog_part('keyboards', _build_catalog_keyboards)
+
+_BUILDERS = {
+    'subcategories': _subcategory_markup,
+    'services': _services_list_markup,
+    'menu': _category_menu_markup,
+}
+
+
+def _catalog_keyboard(*key):
+    """Готовая клавиатура из текущего снимка каталога (для неизвестной категории — собирается)"""
+    catalog = get_catalog()
+    markup = catalog.parts['keyboards'].get(key)
+    if markup is None:
+        markup = _BUILDERS[key[0]](catalog, *key[1:])
+    return markup
 
 
 def subcategory_keyboard(category_type: str) -> InlineKeyboardMarkup:
@@ -22,121 +73,51 @@ def subcategory_keyboard(category_type: str) -> InlineKeyboardMarkup:
     Inline клавиатура с подкатегориями услуг.
     category_type: 'individuals', 'entrepreneurs', 'legal_entities'
     """
-    categories_map = {
-        'individuals': INDIVIDUALS_CATEGORIES,
-        'entrepreneurs': ENTREPRENEURS_CATEGORIES,
-        'legal_entities': LEGAL_ENTITIES_CATEGORIES,
-    }
-
-    categories = categories_map.get(category_type, {})
-    keyboard = []
-
-    for subcat_id, subcat_data in categories.items():
-        keyboard.append([
-            InlineKeyboardButton(
-                subcat_data['name'],
-                callback_data=f"subcat_{category_type}_{subcat_id}"
-            )
-        ])
-
-    keyboard.append([InlineKeyboardButton('🔙 Назад к категориям', callback_data='back_to_categories')])
-
-    return InlineKeyboardMarkup(keyboard)
+    return _catalog_keyboard('subcategories', category_type)
 
 
 def services_list_keyboard(category_type: str, subcategory: str) -> InlineKeyboardMarkup:
     """
     Inline клавиатура со списком услуг подкатегории.
+    callback_data: svc_{ID услуги из data/catalog.json}
     """
-    categories_map = {
-        'individuals': INDIVIDUALS_CATEGORIES,
-        'entrepreneurs': ENTREPRENEURS_CATEGORIES,
-        'legal_entities': LEGAL_ENTITIES_CATEGORIES,
-    }
-
-    categories = categories_map.get(category_type, {})
-    services = categories.get(subcategory, {}).get('services', [])
-
-    keyboard = []
-    for service in services:
-        # Укорачиваем callback_data (макс 64 байта)
-        # Используем индекс услуги
-        service_idx = services.index(service)
-        keyboard.append([
-            InlineKeyboardButton(
-                service,
-                callback_data=f"svc_{category_type}_{subcategory}_{service_idx}"
-            )
-        ])
+    return _catalog_keyboard('services', category_type, subcategory)
 
-    keyboard.append([InlineKeyboardButton('🔙 Назад', callback_data=f"back_subcat_{category_type}")])
 
-    return InlineKeyboardMarkup(keyboard)
+@static_keyboard
+def service_actions_keyboard():
+    """Кнопки под описанием услуги"""
+    keyboard = [
+        [InlineKeyboardButton('📝 Оставить заявку', callback_data='start_appointment')],
+        [InlineKeyboardButton('🔙 Назад к услугам', callback_data='back_to_services')]
+    ]
+    return StaticInlineKeyboardMarkup(keyboard)
 
 
-# Сохраняем старые функции для обратной совместимости (используются в других частях бота)
-def legal_entities_keyboard():
-    """Услуги для юридических лиц (reply keyboard для совместимости)"""
+def search_results_keyboard(services: list) -> InlineKeyboardMarkup:
+    """Найденные услуги: кнопки ведут на описание услуги (svc_{ID})"""
     keyboard = [
-        [KeyboardButton('📝 Регистрация ООО')],
-        [KeyboardButton('📄 Изменения в устав, ЕГРЮЛ')],
-        [KeyboardButton('💬 Консультации для юрлиц')],
-        [KeyboardButton('📋 Составление договоров (юрлица)')],
-        [KeyboardButton('🏛️ Судебное сопровождение (юрлица)')],
-        [KeyboardButton('📄 Подача иска (юрлица)')],
-        [KeyboardButton('⚖️ Апелляция и кассация (юрлица)')],
-        [KeyboardButton('📊 Бухгалтерские услуги (юрлица)')],
-        [KeyboardButton('🏷️ Регистрация товарного знака')],
-        [KeyboardButton('🔙 Назад к услугам'), KeyboardButton('🏠 Главное меню')]
+        [InlineKeyboardButton(service.name, callback_data=f"svc_{service.id}")]
+        for service in services
     ]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+    keyboard.append([InlineKeyboardButton('🔙 Назад к услугам', callback_data='back_to_services')])
+    return InlineKeyboardMarkup(keyboard)
+
+
+# Reply-клавиатуры категорий: порядок кнопок — раздел menu категории в каталоге
+def legal_entities_keyboard():
+    """Услуги для юридических лиц"""
+    return _catalog_keyboard('menu', 'legal_entities')
 
 
 def entrepreneurs_keyboard():
-    """Услуги для предпринимателей (reply keyboard для совместимости)"""
-    keyboard = [
-        [KeyboardButton('💬 Юридические консультации')],
-        [KeyboardButton('📝 Регистрация ИП (подробно)')],
-        [KeyboardButton('📄 Изменение ЕГРИП')],
-        [KeyboardButton('🗑️ Ликвидация ИП')],
-        [KeyboardButton('💎 Регистрация ювелиров')],
-        [KeyboardButton('📋 Регистрация в надзорных органах')],
-        [KeyboardButton('🔒 Оператор персональных данных')],
-        [KeyboardButton('🏷️ Регистрация товарного знака')],
-        [KeyboardButton('💬 Консультации для ИП')],
-        [KeyboardButton('📋 Составление договоров')],
-        [KeyboardButton('👥 Оформление сотрудников')],
-        [KeyboardButton('🏛️ Судебное сопровождение ИП')],
-        [KeyboardButton('📄 Подача иска (ИП)')],
-        [KeyboardButton('⚖️ Апелляция и кассация (ИП)')],
-        [KeyboardButton('📊 Бухгалтерские услуги')],
-        [KeyboardButton('🚗 Выезд к клиенту')],
-        [KeyboardButton('🔙 Назад к услугам'), KeyboardButton('🏠 Главное меню')]
-    ]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+    """Услуги для предпринимателей"""
+    return _catalog_keyboard('menu', 'entrepreneurs')
 
 
 def individuals_keyboard():
-    """Услуги для физических лиц (reply keyboard для совместимости)"""
-    keyboard = [
-        [KeyboardButton('💬 Консультации юриста')],
-        [KeyboardButton('📋 Составление исковых заявлений')],
-        [KeyboardButton('🏛️ Судебное сопровождение')],
-        [KeyboardButton('📄 Подача иска в суд')],
-        [KeyboardButton('📋 Ознакомление с делом')],
-        [KeyboardButton('📜 Получение решения суда')],
-        [KeyboardButton('⚖️ Апелляция и кассация')],
-        [KeyboardButton('📊 Налоговые декларации 3-НДФЛ')],
-        [KeyboardButton('📑 Анализ документов')],
-        [KeyboardButton('🏠 Сделки с недвижимостью')],
-        [KeyboardButton('🏷️ Регистрация товарного знака')],
-        [KeyboardButton('🚗 Выезд на проверку')],
-        [KeyboardButton('📄 Ксерокопирование')],
-        [KeyboardButton('⚡ Срочная подготовка')],
-        [KeyboardButton('💻 Онлайн-консультация')],
-        [KeyboardButton('🔙 Назад к услугам'), KeyboardButton('🏠 Главное меню')]
-    ]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+    """Услуги для физических лиц"""
+    return _catalog_keyboard('menu', 'individuals')
 
 
 def service_info_keyboard(service_name: str):
@@ -0,0 +1,79 @@
+"""
+Статические клавиатуры: собираются один раз и переиспользуются
+
+Клавиатуры главного меню, админ-панели, категорий услуг и т.п. не зависят
+от пользователя, поэтому функции, которые их строят, помечены
+@static_keyboard: объект создаётся при первом вызове (или при
+build_static_keyboards() во время импорта), дальше возвращается тот же.
+Объекты telegram после создания заморожены, так что общий экземпляр
+безопасно отдавать всем обработчикам.
+
+Кроме того, такие клавиатуры хранят готовый результат to_dict(): при каждой
+отправке PTB превращает reply_markup в словарь, обходя все кнопки, — для
+статической клавиатуры этот обход делается один раз.
+"""
+import functools
+
+from telegram import ReplyKeyboardMarkup, InlineKeyboardMarkup
+
+_registry: list = []
+
+
+class _CachedPayloadMixin:
+    """Кэширует словарь, который PTB сериализует в JSON при отправке"""
+
+    __slots__ = ()
+
+    def _cache_payload(self):
+        with self._unfrozen():
+            self._payload = super().to_dict()
+
+    def to_dict(self, recursive: bool = True) -> dict:
+        # Один и тот же словарь отдаётся на каждую отправку — PTB его не изменяет
+        if recursive:
+            return self._payload
+        return super().to_dict(recursive=False)
+
+
+class StaticReplyKeyboardMarkup(_CachedPayloadMixin, ReplyKeyboardMarkup):
+    """ReplyKeyboardMarkup с заранее посчитанным to_dict()"""
+
+    __slots__ = ('_payload',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cache_payload()
+
+
+class StaticInlineKeyboardMarkup(_CachedPayloadMixin, InlineKeyboardMarkup):
+    """InlineKeyboardMarkup с заранее посчитанным to_dict()"""
+
+    __slots__ = ('_payload',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cache_payload()
+
+
+def static_keyboard(func=None, *, variants=((),)):
+    """
+    Декоратор: функция клавиатуры вызывается один раз для каждого набора
+    аргументов. variants — наборы аргументов, с которыми клавиатура
+    строится заранее в build_static_keyboards().
+    """
+    if func is None:
+        return lambda f: static_keyboard(f, variants=variants)
+
+    cached = functools.cache(func)
+    _registry.append((cached, tuple(variants)))
+    return cached
+
+
+def build_static_keyboards() -> int:
+    """Построить все статические клавиатуры заранее; возвращает их количество"""
+    built = 0
+    for func, variants in _registry:
+        for args in variants:
+            func(*args)
+            built += 1
+    return built
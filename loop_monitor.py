@@ -0,0 +1,139 @@
+"""
+Мониторинг задержки event loop и поиск блокирующих вызовов
+
+Корутина в цикле спит interval секунд и замеряет, насколько позже она
+проснулась — это задержка (lag) event loop. Отдельный поток-сторож следит
+за «сердцебиением» этой корутины: если loop не отвечает дольше
+stall_threshold, сторож снимает стек потока event loop через
+sys._current_frames() — это и есть код, который заблокировал loop.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+
+from config import LOOP_LAG_INTERVAL, LOOP_STALL_THRESHOLD, LOOP_LAG_MAX, LOOP_LAG_MAX_DURATION
+from metrics import register_gauge
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+
+class LoopMonitor:
+    """Замер lag event loop и запись стеков долгих блокировок"""
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL, stall_threshold: float = LOOP_STALL_THRESHOLD,
+                 lag_max: float = LOOP_LAG_MAX, lag_max_duration: float = LOOP_LAG_MAX_DURATION,
+                 samples: int = 600, keep_stalls: int = 10):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.lag_max = lag_max
+        self.lag_max_duration = lag_max_duration
+        self.samples: deque[float] = deque(maxlen=samples)
+        self.stalls: deque[dict] = deque(maxlen=keep_stalls)
+        self.stall_count = 0
+        self._heartbeat = time.monotonic()
+        self._high_since: float | None = None
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._stop = threading.Event()
+        self._watchdog: threading.Thread | None = None
+
+    async def _measure(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            lag = max(now - started - self.interval, 0.0)
+            self.samples.append(lag)
+
+            # Запоминаем, с какого момента lag держится выше порога
+            if lag > self.lag_max:
+                if self._high_since is None:
+                    self._high_since = now
+            else:
+                self._high_since = None
+
+    def _watch(self):
+        reported_heartbeat = None
+        while not self._stop.wait(self.stall_threshold / 4):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat - self.interval
+            # Об одной блокировке сообщаем один раз
+            if blocked_for < self.stall_threshold or heartbeat == reported_heartbeat:
+                continue
+            reported_heartbeat = heartbeat
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame else ''
+            self.stall_count += 1
+            self.stalls.append({
+                'at': datetime.now().isoformat(),
+                'blocked_seconds': round(blocked_for, 3),
+                'stack': stack,
+            })
+            logger.warning(f"Event loop заблокирован дольше {blocked_for:.2f} с:\n{stack}")
+
+    def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.create_task(self._measure())
+        self._watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    def is_lagging(self) -> bool:
+        """Lag выше lag_max держится дольше lag_max_duration"""
+        return self._high_since is not None and time.monotonic() - self._high_since >= self.lag_max_duration
+
+    def stats(self) -> dict:
+        samples = list(self.samples)
+        if not samples:
+            return {'samples': 0, 'stalls': self.stall_count, 'lagging': False}
+        return {
+            'samples': len(samples),
+            'p50_ms': round(_percentile(samples, 50) * 1000, 2),
+            'p99_ms': round(_percentile(samples, 99) * 1000, 2),
+            'max_ms': round(max(samples) * 1000, 2),
+            'stalls': self.stall_count,
+            'lagging': self.is_lagging(),
+        }
+
+
+# Текущий монитор (для health check)
+loop_monitor: LoopMonitor | None = None
+
+register_gauge('bot_event_loop_lag_p50_seconds', 'Медианная задержка event loop',
+               lambda: _percentile(list(loop_monitor.samples), 50) if loop_monitor and loop_monitor.samples else None)
+register_gauge('bot_event_loop_lag_p99_seconds', '99-й перцентиль задержки event loop',
+               lambda: _percentile(list(loop_monitor.samples), 99) if loop_monitor and loop_monitor.samples else None)
+register_gauge('bot_event_loop_stalls_total', 'Блокировки event loop дольше порога',
+               lambda: loop_monitor.stall_count if loop_monitor else None, kind='counter')
+
+
+def start_loop_monitor() -> LoopMonitor:
+    """Запустить мониторинг event loop (вызывать из работающего loop)"""
+    global loop_monitor
+    loop_monitor = LoopMonitor()
+    loop_monitor.start()
+    logger.info("Мониторинг event loop запущен")
+    return loop_monitor
+
+
+def stop_loop_monitor():
+    """Остановить мониторинг event loop"""
+    if loop_monitor:
+        loop_monitor.stop()
@@ -0,0 +1,200 @@
+"""
+Метрики бота в текстовом формате Prometheus (эндпоинт /metrics)
+
+Счётчики и гистограммы — обычные словари и списки: всё обновляется из
+потока event loop, поэтому блокировки не нужны, а запись стоит пару
+операций со словарём. Значения, которые и так хранятся в других модулях
+(глубина очереди напоминаний, блокировки rate limiter), собираются
+функциями-гейджами только в момент запроса /metrics.
+"""
+import functools
+import time
+from bisect import bisect_left
+from typing import Callable
+
+from telegram.ext import ApplicationHandlerStop, ConversationHandler
+
+# Границы корзин гистограмм длительности, в секундах
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = '') -> str:
+    parts = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class Counter:
+    """Счётчик с метками"""
+
+    def __init__(self, name: str, description: str, labels: tuple = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} counter']
+        for label_values, value in self._values.items():
+            lines.append(f'{self.name}{_format_labels(self.labels, label_values)} {value}')
+        return lines
+
+
+class Histogram:
+    """Гистограмма с метками: счётчики по корзинам, сумма и количество"""
+
+    def __init__(self, name: str, description: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+        # Для каждого набора меток: [счётчики корзин..., +Inf, сумма]
+        self._series: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} histogram']
+        for label_values, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}')
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f'{self.name}_sum{labels} {series[-1]}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Gauge:
+    """
+    Метрика, значение которой вычисляется функцией при каждом запросе /metrics.
+    kind='counter' — для накопительных значений, которые считает другой модуль.
+    """
+
+    def __init__(self, name: str, description: str, collect: Callable[[], float | None], kind: str = 'gauge'):
+        self.name = name
+        self.description = description
+        self.collect = collect
+        self.kind = kind
+
+    def render(self) -> list[str]:
+        value = self.collect()
+        if value is None:
+            return []
+        return [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} {self.kind}', f'{self.name} {value}']
+
+
+_registry: list = []
+
+
+def _register(metric):
+    _registry.append(metric)
+    return metric
+
+
+updates_total = _register(Counter(
+    'bot_updates_total', 'Полученные update по типу', ('type',)))
+handler_errors_total = _register(Counter(
+    'bot_handler_errors_total', 'Исключения в обработчиках', ('handler',)))
+handler_duration = _register(Histogram(
+    'bot_handler_duration_seconds', 'Время работы обработчиков', ('handler',)))
+db_query_duration = _register(Histogram(
+    'bot_db_query_duration_seconds', 'Время выполнения функций database.py', ('function',)))
+update_queue_wait = _register(Histogram(
+    'bot_update_queue_wait_seconds', 'Ожидание update в очереди до начала обработки'))
+db_query_errors_total = _register(Counter(
+    'bot_db_query_errors_total', 'Ошибки функций database.py', ('function',)))
+
+
+def register_gauge(name: str, description: str, collect: Callable[[], float | None], kind: str = 'gauge'):
+    """Добавить вычисляемую метрику; collect вызывается при каждом запросе /metrics"""
+    _register(Gauge(name, description, collect, kind))
+
+
+def render_metrics() -> str:
+    """Все метрики в текстовом формате Prometheus"""
+    lines = []
+    for metric in _registry:
+        try:
+            lines.extend(metric.render())
+        except Exception:
+            # Сломанный гейдж не должен ломать весь /metrics
+            continue
+    return '\n'.join(lines) + '\n'
+
+
+def count_update(update):
+    """Учесть update по его типу (message, callback_query, ...)"""
+    for update_type in update.ALL_TYPES:
+        if getattr(update, update_type, None) is not None:
+            updates_total.inc(update_type)
+            return
+    updates_total.inc('unknown')
+
+
+def timed_query(func):
+    """Декоратор для функций database.py: число вызовов, длительность и ошибки"""
+    name = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            db_query_errors_total.inc(name)
+            raise
+        finally:
+            db_query_duration.observe(time.perf_counter() - started, name)
+
+    return wrapper
+
+
+def timed_handler(callback, name: str | None = None):
+    """Обернуть callback обработчика telegram замером времени"""
+    name = name or getattr(callback, '__name__', repr(callback))
+
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        started = time.perf_counter()
+        try:
+            return await callback(update, context)
+        except ApplicationHandlerStop:
+            raise
+        except Exception:
+            handler_errors_total.inc(name)
+            raise
+        finally:
+            handler_duration.observe(time.perf_counter() - started, name)
+
+    return wrapper
+
+
+def instrument_application(application):
+    """
+    Обернуть замером времени callback всех зарегистрированных обработчиков,
+    включая обработчики внутри ConversationHandler.
+    """
+    def instrument(handlers):
+        for handler in handlers:
+            if isinstance(handler, ConversationHandler):
+                instrument(handler.entry_points)
+                for state_handlers in handler.states.values():
+                    instrument(state_handlers)
+                instrument(handler.fallbacks)
+            elif getattr(handler, 'callback', None) is not None:
+                handler.callback = timed_handler(handler.callback)
+
+    for group_handlers in application.handlers.values():
+        instrument(group_handlers)
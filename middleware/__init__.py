@@ -1,3 +1,3 @@
-from .rate_limiter import rate_limit_middleware, is_rate_limited
+from .rate_limiter import rate_limit_middleware, is_rate_limited, get_rate_limit_stats, close_rate_limiter
 
-__all__ = ['rate_limit_middleware', 'is_rate_limited']
+__all__ = ['rate_limit_middleware', 'is_rate_limited', 'get_rate_limit_stats', 'close_rate_limiter']
@@ -0,0 +1,254 @@
+"""
+Хранилища состояния rate limiter
+
+Лимиты считаются по GCRA (generic cell rate algorithm): для каждого лимита
+хранится одно число — теоретическое время прихода следующего сообщения (TAT).
+Проверка — O(1), запись о пользователе фиксированного размера.
+
+- memory — словарь в памяти процесса (по умолчанию);
+- sqlite — общий файл SQLite: лимиты и блокировки общие для всех процессов
+  бота на одной машине и переживают перезапуск.
+"""
+import asyncio
+import logging
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+# Запас на погрешность float при сравнении TAT с границей окна
+_EPSILON = 1e-9
+
+
+class Decision(NamedTuple):
+    """Результат проверки: можно ли обработать update и сколько ждать, если нет"""
+    allowed: bool
+    retry_after: float = 0.0
+    reason: str = ''            # 'blocked' — пользователь заблокирован, 'cost' — не хватило бюджета
+    just_blocked: bool = False  # блокировка наложена именно этой проверкой
+
+
+_ALLOWED = Decision(True)
+
+
+class _UserState:
+    """Состояние пользователя: TAT для каждого лимита и время окончания блокировки"""
+
+    __slots__ = ('tat_second', 'tat_minute', 'tat_cost', 'blocked_until')
+
+    def __init__(self, now: float):
+        self.tat_second = now
+        self.tat_minute = now
+        self.tat_cost = now
+        self.blocked_until = 0.0
+
+    def idle(self, now: float) -> bool:
+        """Все сроки в прошлом — запись ничем не отличается от новой"""
+        return max(self.tat_second, self.tat_minute, self.tat_cost, self.blocked_until) <= now
+
+
+class RateLimitBackend(ABC):
+    """
+    Базовый класс хранилища: правила GCRA и счётчики, без хранения состояния.
+
+    Два окна (в секунду и в минуту) с блокировкой на block_duration при
+    превышении. Отдельно от счёта сообщений у каждого пользователя есть бюджет
+    cost_budget «токенов» в минуту: дорогие действия (экспорт, фильтры по всем
+    заявкам) стоят больше одного токена. Нехватка бюджета не блокирует
+    пользователя, а только отклоняет это действие до восстановления токенов.
+    """
+
+    name = 'base'
+
+    def __init__(self, per_second: int, per_minute: int, block_duration: float, cost_budget: int):
+        # Интервал между сообщениями при равномерном потоке
+        self.interval_second = 1 / per_second
+        self.interval_minute = 60 / per_minute
+        self.interval_cost = 60 / cost_budget
+        self.block_duration = block_duration
+        self.blocks = 0
+        self.rejections = 0
+
+    def _apply(self, state: _UserState, user_id: int, cost: int, now: float) -> Decision:
+        """Применить действие к состоянию пользователя (состояние меняется на месте)"""
+        if now < state.blocked_until:
+            return Decision(False, state.blocked_until - now, 'blocked')
+
+        # Действие проходит, если новый TAT не уходит дальше чем на окно вперёд
+        tat_second = max(state.tat_second, now) + self.interval_second
+        tat_minute = max(state.tat_minute, now) + self.interval_minute
+        tat_cost = max(state.tat_cost, now) + self.interval_cost * cost
+
+        if tat_second - now > 1 + _EPSILON:
+            logger.warning(f"Rate limit exceeded (per second) for user {user_id}")
+        elif tat_minute - now > 60 + _EPSILON:
+            logger.warning(f"Rate limit exceeded (per minute) for user {user_id}")
+        elif tat_cost - now > 60 + _EPSILON:
+            logger.warning(f"Rate limit exceeded (cost {cost}) for user {user_id}")
+            # Отклонённое действие всё равно считается сообщением, чтобы спам им вёл к блокировке
+            state.tat_second = tat_second
+            state.tat_minute = tat_minute
+            self.rejections += 1
+            return Decision(False, tat_cost - now - 60, 'cost')
+        else:
+            state.tat_second = tat_second
+            state.tat_minute = tat_minute
+            state.tat_cost = tat_cost
+            return _ALLOWED
+
+        # После блокировки пользователь начинает с чистого листа
+        state.blocked_until = now + self.block_duration
+        state.tat_second = state.tat_minute = state.tat_cost = state.blocked_until
+        self.blocks += 1
+        return Decision(False, self.block_duration, 'blocked', just_blocked=True)
+
+    @abstractmethod
+    async def check(self, user_id: int, cost: int = 1) -> Decision:
+        """Учесть действие пользователя стоимостью cost токенов"""
+
+    def stats(self) -> dict:
+        return {'backend': self.name, 'blocks': self.blocks, 'rejections': self.rejections}
+
+    def close(self):
+        pass
+
+
+class MemoryBackend(RateLimitBackend):
+    """
+    Состояние в памяти процесса.
+
+    Пользователи хранятся в OrderedDict в порядке последнего обращения (LRU).
+    Простаивающие записи из начала очереди удаляются при каждой проверке,
+    сверх max_users вытесняются самые давние пользователи.
+    """
+
+    name = 'memory'
+
+    def __init__(self, per_second: int, per_minute: int, block_duration: float, cost_budget: int,
+                 max_users: int = 100_000):
+        super().__init__(per_second, per_minute, block_duration, cost_budget)
+        self.max_users = max_users
+        self._users: OrderedDict[int, _UserState] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def _evict(self, now: float):
+        users = self._users
+        while users:
+            state = next(iter(users.values()))
+            if not state.idle(now) and len(users) <= self.max_users:
+                break
+            users.popitem(last=False)
+
+    def check_at(self, user_id: int, cost: int, now: float) -> Decision:
+        """Синхронная проверка на момент now (монотонное время)"""
+        # Сначала чистим простаивающие записи: новая запись сама по себе «простаивает»
+        self._evict(now)
+        state = self._users.get(user_id)
+        if state is None:
+            state = _UserState(now)
+            self._users[user_id] = state
+        else:
+            self._users.move_to_end(user_id)
+        return self._apply(state, user_id, cost, now)
+
+    async def check(self, user_id: int, cost: int = 1) -> Decision:
+        return self.check_at(user_id, cost, time.monotonic())
+
+    def stats(self) -> dict:
+        return {**super().stats(), 'tracked_users': len(self._users)}
+
+
+class SQLiteBackend(RateLimitBackend):
+    """
+    Состояние в общем файле SQLite.
+
+    Каждая проверка — короткая транзакция BEGIN IMMEDIATE (чтение, расчёт,
+    запись), поэтому одновременные проверки из разных процессов
+    сериализуются и лимит действует на их сумму. Время — часы системы
+    (time.time), одинаковые для всех процессов. Запросы выполняются в
+    отдельном потоке, чтобы ожидание блокировки файла не останавливало
+    event loop. Простаивающие записи удаляются раз в cleanup_every проверок.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, per_second: int, per_minute: int, block_duration: float, cost_budget: int,
+                 path: str = 'rate_limits.db', cleanup_every: int = 1000):
+        super().__init__(per_second, per_minute, block_duration, cost_budget)
+        self.path = path
+        self.cleanup_every = cleanup_every
+        self._checks = 0
+        # Одно соединение и один поток: sqlite3-соединение не должно использоваться параллельно
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rate-limit')
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS rate_limits (
+                   user_id INTEGER PRIMARY KEY,
+                   tat_second REAL NOT NULL,
+                   tat_minute REAL NOT NULL,
+                   tat_cost REAL NOT NULL,
+                   blocked_until REAL NOT NULL
+               )"""
+        )
+
+    def _check_sync(self, user_id: int, cost: int) -> Decision:
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Время берём после захвата блокировки, чтобы TAT не шли назад
+            now = time.time()
+            row = conn.execute(
+                "SELECT tat_second, tat_minute, tat_cost, blocked_until FROM rate_limits WHERE user_id = ?",
+                (user_id,)
+            ).fetchone()
+            state = _UserState(now)
+            if row:
+                state.tat_second, state.tat_minute, state.tat_cost, state.blocked_until = row
+            decision = self._apply(state, user_id, cost, now)
+            conn.execute(
+                """INSERT OR REPLACE INTO rate_limits
+                   (user_id, tat_second, tat_minute, tat_cost, blocked_until)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (user_id, state.tat_second, state.tat_minute, state.tat_cost, state.blocked_until)
+            )
+
+            self._checks += 1
+            if self._checks % self.cleanup_every == 0:
+                conn.execute(
+                    "DELETE FROM rate_limits WHERE max(tat_second, tat_minute, tat_cost, blocked_until) <= ?",
+                    (now,)
+                )
+            conn.execute("COMMIT")
+            return decision
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    async def check(self, user_id: int, cost: int = 1) -> Decision:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._check_sync, user_id, cost)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._conn.close()
+
+
+BACKENDS = {
+    MemoryBackend.name: MemoryBackend,
+    SQLiteBackend.name: SQLiteBackend,
+}
+
+
+def create_backend(name: str, **options) -> RateLimitBackend:
+    """Создать хранилище по имени ('memory' или 'sqlite')"""
+    if name not in BACKENDS:
+        raise ValueError(f"Неизвестное хранилище rate limit: {name}")
+    return BACKENDS[name](**options)
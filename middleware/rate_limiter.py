@@ -1,87 +1,111 @@
 """
 Rate Limiter middleware для защиты от спама
+
+Само состояние лимитов хранится в backend из rate_limit_backends:
+в памяти процесса или в общем файле SQLite (RATE_LIMIT_BACKEND).
 """
-import time
 import logging
-from collections import defaultdict
 from telegram import Update
 from telegram.ext import ContextTypes
 
+from config import RATE_LIMIT_COSTS, RATE_LIMIT_COST_BUDGET, RATE_LIMIT_BACKEND, RATE_LIMIT_DB_PATH
+from metrics import register_gauge
+from .rate_limit_backends import RateLimitBackend, create_backend
+
 logger = logging.getLogger(__name__)
 
 # Настройки rate limiting
 MAX_MESSAGES_PER_MINUTE = 20  # Максимум сообщений в минуту
 MAX_MESSAGES_PER_SECOND = 3   # Максимум сообщений в секунду
 BLOCK_DURATION = 60           # Блокировка на 60 секунд при превышении лимита
+MAX_TRACKED_USERS = 100_000   # Сколько пользователей держать в памяти одновременно
 
-# Хранилище для отслеживания сообщений пользователей
-user_message_times: dict[int, list[float]] = defaultdict(list)
-blocked_users: dict[int, float] = {}
 
+def _create_limiter() -> RateLimitBackend:
+    options = dict(
+        per_second=MAX_MESSAGES_PER_SECOND,
+        per_minute=MAX_MESSAGES_PER_MINUTE,
+        block_duration=BLOCK_DURATION,
+        cost_budget=RATE_LIMIT_COST_BUDGET,
+    )
+    if RATE_LIMIT_BACKEND == 'sqlite':
+        options['path'] = RATE_LIMIT_DB_PATH
+    else:
+        options['max_users'] = MAX_TRACKED_USERS
+    return create_backend(RATE_LIMIT_BACKEND, **options)
 
-def is_rate_limited(user_id: int) -> bool:
-    """Проверяет, превышен ли лимит сообщений для пользователя"""
-    current_time = time.time()
 
-    # Проверяем, заблокирован ли пользователь
-    if user_id in blocked_users:
-        if current_time < blocked_users[user_id]:
-            return True
-        else:
-            # Разблокируем пользователя
-            del blocked_users[user_id]
-            user_message_times[user_id] = []
+_limiter = _create_limiter()
 
-    # Получаем историю сообщений пользователя
-    message_times = user_message_times[user_id]
+register_gauge('bot_rate_limit_blocks_total', 'Блокировки пользователей rate limiter',
+               lambda: _limiter.blocks, kind='counter')
+register_gauge('bot_rate_limit_rejections_total', 'Дорогие действия, отклонённые из-за бюджета',
+               lambda: _limiter.rejections, kind='counter')
 
-    # Удаляем старые записи (старше 1 минуты)
-    message_times = [t for t in message_times if current_time - t < 60]
-    user_message_times[user_id] = message_times
 
-    # Проверяем лимит в секунду
-    recent_messages = [t for t in message_times if current_time - t < 1]
-    if len(recent_messages) >= MAX_MESSAGES_PER_SECOND:
-        logger.warning(f"Rate limit exceeded (per second) for user {user_id}")
-        blocked_users[user_id] = current_time + BLOCK_DURATION
-        return True
+def get_update_cost(update: Update) -> int:
+    """
+    Стоимость update в токенах по RATE_LIMIT_COSTS: для callback-кнопок —
+    по самому длинному совпавшему префиксу callback_data, для сообщений —
+    по точному тексту. Всё остальное стоит 1.
+    """
+    if update.callback_query and update.callback_query.data:
+        data = update.callback_query.data
+        matched = ''
+        for prefix in RATE_LIMIT_COSTS:
+            if data.startswith(prefix) and len(prefix) > len(matched):
+                matched = prefix
+        if matched:
+            return RATE_LIMIT_COSTS[matched]
+    elif update.message and update.message.text:
+        return RATE_LIMIT_COSTS.get(update.message.text, 1)
+    return 1
+
+
+async def is_rate_limited(user_id: int, cost: int = 1) -> bool:
+    """Проверяет, превышен ли лимит сообщений для пользователя"""
+    return not (await _limiter.check(user_id, cost)).allowed
+
 
-    # Проверяем лимит в минуту
-    if len(message_times) >= MAX_MESSAGES_PER_MINUTE:
-        logger.warning(f"Rate limit exceeded (per minute) for user {user_id}")
-        blocked_users[user_id] = current_time + BLOCK_DURATION
-        return True
+def get_rate_limit_stats() -> dict:
+    """Хранилище, число блокировок и отклонённых дорогих действий (для мониторинга)"""
+    return _limiter.stats()
 
-    # Добавляем текущее сообщение
-    message_times.append(current_time)
-    user_message_times[user_id] = message_times
 
-    return False
+def close_rate_limiter():
+    """Закрыть хранилище лимитов (при остановке бота)"""
+    _limiter.close()
 
 
 async def rate_limit_middleware(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
     """
-    Middleware для проверки rate limit.
+    Middleware для проверки rate limit. Применяется ко всем типам update.
     Возвращает True если нужно заблокировать обработку, False если можно продолжить.
     """
     if not update.effective_user:
         return False
+    # Inline-запросы приходят на каждый набранный символ, а поиск идёт по индексу
+    # в памяти — их не считаем, иначе быстрый набор блокировал бы пользователя
+    if update.inline_query:
+        return False
+
+    decision = await _limiter.check(update.effective_user.id, get_update_cost(update))
+    if decision.allowed:
+        return False
 
-    user_id = update.effective_user.id
-
-    if is_rate_limited(user_id):
-        # Отправляем предупреждение только один раз при блокировке
-        if user_id in blocked_users:
-            block_end = blocked_users[user_id]
-            remaining = int(block_end - time.time())
-            if remaining > 55:  # Только что заблокировали
-                try:
-                    if update.message:
-                        await update.message.reply_text(
-                            f"⚠️ Слишком много сообщений. Подождите {remaining} секунд."
-                        )
-                except Exception as e:
-                    logger.warning(f"Не удалось отправить предупреждение о rate limit: {e}")
-        return True
-
-    return False
+    remaining = max(int(decision.retry_after), 1)
+    try:
+        if update.callback_query:
+            # На нажатие кнопки нужно ответить, иначе у пользователя крутятся «часики»
+            await update.callback_query.answer(
+                f"⚠️ Слишком много запросов. Подождите {remaining} секунд.",
+                show_alert=True
+            )
+        elif update.message and (decision.just_blocked or decision.reason == 'cost'):
+            # При блокировке предупреждаем только один раз, при нехватке бюджета — каждый раз
+            await update.message.reply_text(
+                f"⚠️ Слишком много сообщений. Подождите {remaining} секунд."
+            )
+    except Exception as e:
+        logger.warning(f"Не удалось отправить предупреждение о rate limit: {e}")
+    return True
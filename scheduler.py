@@ -1,26 +1,38 @@
 """
 Планировщик напоминаний о записях
-Запускается в фоне и проверяет, какие напоминания нужно отправить
+Держит ожидающие напоминания в min-heap по времени отправки и спит ровно
+до ближайшего из них; новое более раннее напоминание будит его сразу
 """
 import asyncio
+import heapq
 import logging
-from datetime import datetime, timedelta, date, time as dt_time
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, time as dt_time
+from typing import Callable
 from telegram import Bot
-from telegram.error import TelegramError
+from telegram.error import RetryAfter, TelegramError
 
 from database import (
-    get_pending_reminders,
-    mark_reminder_sent,
-    get_appointments_for_reminder,
-    create_reminder
+    mark_reminders_sent,
+    create_reminders_for_date,
+    get_scheduled_reminders,
+    get_reminders_by_ids,
+    add_reminder_listener,
+    remove_reminder_listener,
 )
-from config import BOT_TOKEN
+from config import REMINDER_CONCURRENCY, REMINDER_RATE, REMINDER_CHAT_INTERVAL, READY_SCHEDULER_MAX_BUSY
+from metrics import register_gauge
 
 logger = logging.getLogger(__name__)
 
 
-async def send_reminder(bot: Bot, reminder: dict):
-    """Отправить напоминание пользователю"""
+async def send_reminder(bot: Bot, reminder: dict) -> str:
+    """
+    Отправить напоминание пользователю.
+    Возвращает статус для записи в БД ('sent' или 'failed');
+    RetryAfter пробрасывается наружу, чтобы диспетчер повторил отправку.
+    """
     try:
         user_id = reminder['user_id']
         client_name = reminder['client_name']
@@ -62,77 +74,331 @@ async def send_reminder(bot: Bot, reminder: dict):
             parse_mode='Markdown'
         )
 
-        await mark_reminder_sent(reminder['id'], 'sent')
         logger.info(f"Напоминание #{reminder['id']} отправлено пользователю {user_id}")
+        return 'sent'
 
+    except RetryAfter:
+        raise
     except TelegramError as e:
         logger.error(f"Ошибка отправки напоминания #{reminder['id']}: {e}")
-        await mark_reminder_sent(reminder['id'], 'failed')
-
-
-async def process_reminders(bot: Bot):
-    """Обработать все ожидающие напоминания"""
-    try:
-        reminders = await get_pending_reminders()
-
+        return 'failed'
+
+
+class TokenBucket:
+    """
+    Ведро токенов: не больше rate отправок в секунду с запасом burst
+    (по умолчанию без запаса — отправки равномерно распределены по секунде).
+    pause() останавливает выдачу токенов (при RetryAfter от Telegram).
+    """
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else 1
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+    async def acquire(self):
+        # Лок выстраивает ожидающих в очередь, чтобы токены доставались по порядку
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class ReminderDispatcher:
+    """
+    Параллельная рассылка напоминаний с учётом лимитов Telegram.
+
+    Не больше concurrency отправок одновременно и rate сообщений в секунду
+    суммарно; сообщения одному пользователю идут последовательно с интервалом
+    chat_interval. На RetryAfter вся рассылка ждёт указанное время и повторяет
+    отправку. Результаты пишутся в БД пачками (один UPDATE на flush_size штук).
+    """
+
+    def __init__(self, bot: Bot, concurrency: int = REMINDER_CONCURRENCY,
+                 rate: float = REMINDER_RATE, chat_interval: float = REMINDER_CHAT_INTERVAL,
+                 max_retries: int = 3, flush_size: int = 100):
+        self.bot = bot
+        self.concurrency = max(concurrency, 1)
+        self.bucket = TokenBucket(rate)
+        self.chat_interval = chat_interval
+        self.max_retries = max_retries
+        self.flush_size = flush_size
+        self._results: list[tuple[int, str]] = []
+
+    async def _flush(self):
+        results, self._results = self._results, []
+        if results:
+            try:
+                await mark_reminders_sent(results)
+            except Exception:
+                # Результаты не теряем — запишутся при следующем flush
+                self._results = results + self._results
+                raise
+
+    async def _send(self, reminder: dict) -> str:
+        for _ in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            try:
+                return await send_reminder(self.bot, reminder)
+            except RetryAfter as e:
+                logger.warning(f"Telegram просит подождать {e.retry_after} с перед отправкой напоминаний")
+                self.bucket.pause(e.retry_after)
+        logger.error(f"Напоминание #{reminder['id']} не отправлено: превышено число повторов")
+        return 'failed'
+
+    async def _worker(self, chats: asyncio.Queue):
+        while True:
+            try:
+                chat_reminders = chats.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            for i, reminder in enumerate(chat_reminders):
+                if i:
+                    await asyncio.sleep(self.chat_interval)
+                status = await self._send(reminder)
+                self._results.append((reminder['id'], status))
+                if len(self._results) >= self.flush_size:
+                    try:
+                        await self._flush()
+                    except Exception as e:
+                        logger.error(f"Не удалось записать результаты напоминаний, повторим при следующей записи: {e}")
+
+    async def dispatch(self, reminders: list[dict]) -> int:
+        """Разослать напоминания, вернуть число обработанных"""
+        by_chat = defaultdict(list)
         for reminder in reminders:
-            await send_reminder(bot, reminder)
-            await asyncio.sleep(0.1)  # Небольшая задержка между отправками
-
-    except Exception as e:
-        logger.error(f"Ошибка обработки напоминаний: {e}")
+            by_chat[reminder['user_id']].append(reminder)
 
+        chats = asyncio.Queue()
+        for chat_reminders in by_chat.values():
+            chats.put_nowait(chat_reminders)
 
-async def schedule_reminders_for_tomorrow():
-    """Создать напоминания для записей на завтра"""
+        workers = [asyncio.create_task(self._worker(chats))
+                   for _ in range(min(self.concurrency, len(by_chat)))]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            # Если один обработчик упал, останавливаем остальные и дожидаемся их,
+            # чтобы ни один результат не появился после последнего flush
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await self._flush()
+        return len(reminders)
+
+
+async def schedule_reminders_for_tomorrow(now: datetime | None = None) -> int:
+    """
+    Создать напоминания для записей на завтра, вернуть число новых.
+    now — текущее время (по умолчанию datetime.now(); планировщик передаёт свои часы)
+    """
     try:
-        tomorrow = date.today() + timedelta(days=1)
-        appointments = await get_appointments_for_reminder(tomorrow)
+        if now is None:
+            now = datetime.now()
+        today = now.date()
+        tomorrow = today + timedelta(days=1)
 
-        for appointment in appointments:
-            # Напоминание за день (сегодня в 18:00)
-            today = date.today()
-            scheduled_at = datetime.combine(today, dt_time(18, 0))
+        # Напоминание за день (сегодня в 18:00)
+        day_before_at = datetime.combine(today, dt_time(18, 0))
 
-            # Если уже позже 18:00, ставим на текущее время + 5 минут
-            if datetime.now() >= scheduled_at:
-                scheduled_at = datetime.now() + timedelta(minutes=5)
+        # Если уже позже 18:00, ставим на текущее время + 5 минут
+        if now >= day_before_at:
+            day_before_at = now + timedelta(minutes=5)
 
-            await create_reminder(
-                appointment_id=appointment['id'],
-                reminder_type='day_before',
-                scheduled_at=scheduled_at
-            )
-            logger.info(f"Создано напоминание для записи #{appointment['id']} на {scheduled_at}")
+        created = await create_reminders_for_date(tomorrow, day_before_at)
+        if created:
+            logger.info(f"Создано напоминаний на {tomorrow}: {created}")
+        return created
 
     except Exception as e:
         logger.error(f"Ошибка создания напоминаний: {e}")
-
-
-async def reminder_loop(bot: Bot):
-    """Основной цикл планировщика напоминаний"""
-    logger.info("Планировщик напоминаний запущен")
-
-    while True:
+        return 0
+
+
+class ReminderScheduler:
+    """
+    Точный планировщик напоминаний.
+
+    Очередь — min-heap из (scheduled_at, reminder_id). Цикл спит до ближайшего
+    момента (напоминание или ежечасное планирование на завтра) и просыпается
+    раньше, если push() добавил напоминание в начало очереди.
+    clock можно подменить виртуальными часами, а шаги цикла выполнять через tick().
+    """
+
+    def __init__(self, bot: Bot, clock: Callable[[], datetime] = datetime.now,
+                 planning_interval: timedelta = timedelta(hours=1)):
+        self.bot = bot
+        self.dispatcher = ReminderDispatcher(bot)
+        self.clock = clock
+        self.planning_interval = planning_interval
+        self._heap: list[tuple[datetime, int]] = []
+        self._queued: set[int] = set()
+        self._wakeup = asyncio.Event()
+        self._next_planning: datetime | None = None
+        self.last_tick: datetime | None = None
+        self.task: asyncio.Task | None = None
+        self.busy_since: datetime | None = None  # начало текущего шага цикла
+
+    @property
+    def busy(self) -> bool:
+        """Идёт шаг цикла (рассылка большой пачки может занять минуты)"""
+        return self.busy_since is not None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, reminder_id: int, scheduled_at: datetime):
+        """Добавить напоминание в очередь (повторное добавление игнорируется)"""
+        if reminder_id in self._queued:
+            return
+        heapq.heappush(self._heap, (scheduled_at, reminder_id))
+        self._queued.add(reminder_id)
+        # Новое напоминание раньше всех остальных — пересчитываем время сна
+        if self._heap[0][1] == reminder_id:
+            self._wakeup.set()
+
+    async def load(self):
+        """Восстановить очередь из таблицы reminders (после перезапуска)"""
+        for reminder in await get_scheduled_reminders():
+            try:
+                scheduled_at = datetime.fromisoformat(reminder['scheduled_at'])
+            except (TypeError, ValueError):
+                logger.warning(f"Некорректное время напоминания #{reminder['id']}: {reminder['scheduled_at']}")
+                continue
+            self.push(reminder['id'], scheduled_at)
+        logger.info(f"Очередь напоминаний загружена: {len(self._heap)}")
+
+    def _pop_due(self, now: datetime) -> list[tuple[datetime, int]]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            scheduled_at, reminder_id = heapq.heappop(self._heap)
+            self._queued.discard(reminder_id)
+            due.append((scheduled_at, reminder_id))
+        return due
+
+    def health(self, grace: timedelta = timedelta(minutes=1),
+               max_busy: timedelta = timedelta(seconds=READY_SCHEDULER_MAX_BUSY)) -> dict:
+        """
+        Состояние для readiness: задача жива, не проспала свой следующий шаг
+        и не застряла в текущем. Между шагами планировщик может законно спать
+        до часа, поэтому проверяем не возраст last_tick, а что ближайший шаг
+        не просрочен; шаг (рассылка) не должен длиться дольше max_busy.
+        """
+        now = self.clock()
+        alive = self.task is not None and not self.task.done()
+        overdue = stuck = False
+        if self.busy_since is not None:
+            stuck = now - self.busy_since > max_busy
+        elif self.last_tick is not None:
+            overdue = now > self.next_wakeup() + grace
+        return {
+            'ok': alive and self.last_tick is not None and not overdue and not stuck,
+            'alive': alive,
+            'last_tick_age_seconds': (
+                round((now - self.last_tick).total_seconds(), 1) if self.last_tick else None
+            ),
+            'busy_seconds': round((now - self.busy_since).total_seconds(), 1) if self.busy_since else None,
+            'overdue': overdue,
+            'stuck': stuck,
+            'queue_depth': len(self._heap),
+        }
+
+    def next_wakeup(self) -> datetime:
+        """Ближайший момент, когда циклу есть что делать"""
+        if self._heap:
+            return min(self._heap[0][0], self._next_planning)
+        return self._next_planning
+
+    async def _deliver(self, due: list[tuple[datetime, int]]):
         try:
-            # Проверяем и отправляем напоминания каждые 5 минут
-            await process_reminders(bot)
-
-            # Раз в час проверяем, нужно ли создать новые напоминания
-            current_minute = datetime.now().minute
-            if current_minute < 5:  # В начале каждого часа
-                await schedule_reminders_for_tomorrow()
-
-        except Exception as e:
-            logger.error(f"Ошибка в цикле напоминаний: {e}")
-
-        await asyncio.sleep(300)  # 5 минут
+            # Напоминание могли отправить/отменить, пока оно лежало в очереди —
+            # get_reminders_by_ids вернёт только актуальные
+            reminders = await get_reminders_by_ids([reminder_id for _, reminder_id in due])
+            if reminders:
+                await self.dispatcher.dispatch(reminders)
+        except Exception:
+            # Неотправленные напоминания остались pending в БД — возвращаем их
+            # в очередь (уже отмеченные get_reminders_by_ids отфильтрует)
+            for scheduled_at, reminder_id in due:
+                self.push(reminder_id, scheduled_at)
+            raise
+
+    async def tick(self) -> float:
+        """
+        Один шаг цикла: планирование и отправка всех наступивших напоминаний.
+        Возвращает, сколько секунд можно спать до следующего шага.
+        """
+        now = self.clock()
+        self.last_tick = now
+
+        if self._next_planning is None or self._next_planning <= now:
+            # Новые напоминания попадают в очередь через add_reminder_listener
+            await schedule_reminders_for_tomorrow(now)
+            # Следующее планирование — в начале следующего часа
+            self._next_planning = (now + self.planning_interval).replace(minute=0, second=0, microsecond=0)
+
+        due = self._pop_due(now)
+        if due:
+            await self._deliver(due)
+
+        return max((self.next_wakeup() - self.clock()).total_seconds(), 0)
+
+    async def run(self):
+        """Основной цикл планировщика"""
+        logger.info("Планировщик напоминаний запущен")
+        await self.load()
+        add_reminder_listener(self.push)
+        try:
+            while True:
+                self.busy_since = self.clock()
+                try:
+                    delay = await self.tick()
+                except Exception as e:
+                    logger.error(f"Ошибка в цикле напоминаний: {e}")
+                    delay = 60
+                finally:
+                    self.busy_since = None
+
+                if delay > 0:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            remove_reminder_listener(self.push)
+
+
+# Текущий экземпляр планировщика (для мониторинга)
+reminder_scheduler: ReminderScheduler | None = None
+
+register_gauge(
+    'bot_reminder_queue_depth', 'Напоминания в очереди планировщика',
+    lambda: len(reminder_scheduler) if reminder_scheduler else None
+)
 
 
 def start_reminder_scheduler(application) -> asyncio.Task:
     """Запустить планировщик напоминаний"""
-    bot = application.bot
-    return asyncio.create_task(reminder_loop(bot))
+    global reminder_scheduler
+    reminder_scheduler = ReminderScheduler(application.bot)
+    reminder_scheduler.task = asyncio.create_task(reminder_scheduler.run())
+    return reminder_scheduler.task
 
 
 def stop_reminder_scheduler(task: asyncio.Task):
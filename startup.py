@@ -0,0 +1,88 @@
+"""
+Отслеживание запуска бота: время до первого update и конфликты polling
+
+Перехват сессии у предыдущего экземпляра делает сам Updater: webhook
+удаляется при старте polling (drop_pending_updates), а на Conflict
+getUpdates повторяется с экспоненциальной задержкой (до 30 секунд).
+Здесь только считаем конфликты и замеряем, сколько прошло от запуска
+процесса до первого обработанного update.
+"""
+import logging
+import time
+from telegram.error import Conflict, TelegramError
+from telegram.request import HTTPXRequest
+
+logger = logging.getLogger(__name__)
+
+process_started_at = time.monotonic()
+initialized_after: float | None = None
+first_update_after: float | None = None
+polling_conflicts = 0
+last_conflict_at: float | None = None
+# Когда последний раз getUpdates успешно вернулся (monotonic) — для readiness
+last_get_updates_at: float | None = None
+
+
+class UpdatesRequest(HTTPXRequest):
+    """HTTPXRequest для getUpdates, запоминающий время последнего успешного ответа"""
+
+    def __init__(self, *args, **kwargs):
+        # Как у запроса getUpdates по умолчанию в ApplicationBuilder
+        kwargs.setdefault('connection_pool_size', 1)
+        super().__init__(*args, **kwargs)
+
+    async def do_request(self, *args, **kwargs):
+        global last_get_updates_at
+        status, payload = await super().do_request(*args, **kwargs)
+        if status == 200:
+            last_get_updates_at = time.monotonic()
+        return status, payload
+
+
+def seconds_since_get_updates() -> float | None:
+    """Сколько секунд назад getUpdates последний раз успешно ответил"""
+    if last_get_updates_at is None:
+        return None
+    return time.monotonic() - last_get_updates_at
+
+
+def mark_initialized():
+    """Вызывается в конце post_init, сразу перед запуском polling"""
+    global initialized_after
+    if initialized_after is None:
+        initialized_after = time.monotonic() - process_started_at
+
+
+def record_first_update():
+    """Вызывается на каждый update; запоминает время только первого"""
+    global first_update_after
+    if first_update_after is None:
+        first_update_after = time.monotonic() - process_started_at
+        logger.info(f"Первый update получен через {first_update_after:.2f} с после запуска")
+
+
+def polling_error_callback(error: TelegramError):
+    """
+    Обработчик ошибок getUpdates для run_polling.
+    Conflict означает, что старый экземпляр ещё держит long polling —
+    Updater сам повторит запрос с нарастающей задержкой.
+    """
+    global polling_conflicts, last_conflict_at
+    if isinstance(error, Conflict):
+        polling_conflicts += 1
+        last_conflict_at = time.monotonic()
+        logger.warning(f"Другой экземпляр бота ещё получает обновления (конфликт #{polling_conflicts}), повторяем")
+        return
+    logger.error(f"Ошибка получения обновлений: {error}")
+
+
+def get_startup_stats() -> dict:
+    """Метрики запуска для health check"""
+    return {
+        "initialized_after_seconds": initialized_after,
+        "time_to_first_update_seconds": first_update_after,
+        "polling_conflicts": polling_conflicts,
+        "seconds_since_last_conflict": (
+            time.monotonic() - last_conflict_at if last_conflict_at is not None else None
+        ),
+    }
@@ -0,0 +1,25 @@
+"""
+Общие настройки тестов: модули бота импортируются из корня репозитория,
+config не завершает процесс без BOT_TOKEN, а каждая проверка работает
+со своей временной БД.
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('BOT_TOKEN', 'test-token')
+
+import database  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Временная БД со всеми миграциями"""
+    path = str(tmp_path / 'bot.db')
+    monkeypatch.setattr(database, 'DB_PATH', path)
+    asyncio.run(database.init_db())
+    return path
@@ -0,0 +1,117 @@
+"""
+Планы запросов database.py: ни один запрос не читает таблицу полным
+проходом без индекса (SCAN <таблица>).
+
+Тест вызывает все функции работы с БД на временной базе, собирает
+выполненные SQL через trace callback соединений и прогоняет каждый
+через EXPLAIN QUERY PLAN. Новая функция в database.py должна попасть
+в список вызовов ниже — иначе тест упадёт на проверке покрытия.
+"""
+import asyncio
+import inspect
+import re
+import sqlite3
+from datetime import date, datetime, timedelta
+
+import database
+
+# Функции, которые не выполняют запросов к данным
+NOT_QUERIES = {'init_db', 'init_db_pool', 'close_db_pool', 'run_migrations', 'load_admin_cache'}
+
+_DML_RE = re.compile(r'^\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b', re.IGNORECASE)
+# Полный проход по таблице без индекса; «SCAN t USING [COVERING] INDEX …»,
+# «SCAN CONSTANT ROW» и «SCAN (subquery-N)» сюда не попадают
+_BARE_SCAN_RE = re.compile(r'^SCAN [\w.]+$')
+
+
+async def _collect(calls) -> list[str]:
+    statements = []
+    await database.init_db_pool(readers=1)
+    try:
+        for db in database._pool._connections:
+            await db.set_trace_callback(statements.append)
+        for func, args, kwargs in calls:
+            result = func(*args, **kwargs)
+            if inspect.isasyncgen(result):
+                async for _ in result:
+                    pass
+            else:
+                await result
+    finally:
+        await database.close_db_pool()
+    return statements
+
+
+def _calls() -> list:
+    tomorrow = date.today() + timedelta(days=1)
+    cursor = '20240131120000-1'
+    return [
+        (database.ping_db, (), {}),
+        (database.get_db_settings, (), {}),
+        (database.add_user, (1, 'user', 'Имя', 'Фамилия'), {}),
+        (database.update_user_phone, (1, '+79990000000'), {}),
+        (database.create_appointment, (1, 'Консультация', 'Иванов', '+79990000000'),
+         {'appointment_date': tomorrow.isoformat(), 'appointment_time': '12:00'}),
+        (database.get_appointments_by_date, (tomorrow,), {}),
+        (database.get_appointments_in_range, (date.today(), tomorrow), {}),
+        (database.get_user_appointments, (1,), {}),
+        (database.get_appointment_by_id, (1,), {}),
+        (database.update_appointment_status, (1, 'confirmed', 1, 'ok'), {}),
+        (database.get_pending_appointments, (), {}),
+        (database.get_appointments_by_status, (), {}),
+        (database.get_appointments_by_status, ('pending',), {}),
+        (database.get_appointments_page, (), {}),
+        (database.get_appointments_page, ('pending', cursor), {}),
+        (database.get_appointments_page, (None, cursor, 'prev'), {}),
+        (database.get_questions_page, (), {}),
+        (database.get_questions_page, ('all', cursor, 'prev'), {}),
+        (database.count_appointments, (), {}),
+        (database.count_appointments, ('pending',), {}),
+        (database.create_question, (1, 'Вопрос'), {}),
+        (database.get_new_questions, (), {}),
+        (database.get_question_by_id, (1,), {}),
+        (database.update_question_status, (1, 'answered'), {}),
+        (database.is_admin, (2,), {}),
+        (database.add_admin, (2,), {}),
+        (database.get_appointment_history, (1,), {}),
+        (database.create_reminder, (1, 'custom', datetime.now()), {}),
+        (database.create_reminders_for_date, (tomorrow, datetime.now()), {}),
+        (database.get_scheduled_reminders, (), {}),
+        (database.get_reminders_by_ids, ([1, 2],), {}),
+        (database.get_pending_reminders, (), {}),
+        (database.mark_reminder_sent, (1,), {}),
+        (database.mark_reminders_sent, ([(2, 'sent'), (3, 'failed')],), {}),
+        (database.update_appointment_status, (1, 'cancelled'), {}),
+        (database.iter_appointments_for_export, (), {}),
+        (database.iter_appointments_for_export, ('pending', date.today(), tomorrow), {}),
+        (database.iter_questions_for_export, (), {}),
+        (database.iter_questions_for_export, ('new',), {}),
+        (database.get_statistics, (), {}),
+        (database.get_new_items_counts, (), {}),
+    ]
+
+
+def test_all_queries_covered():
+    """Список вызовов охватывает все функции database.py, работающие с данными"""
+    called = {func.__name__ for func, _, _ in _calls()}
+    public = {
+        name for name, func in inspect.getmembers(database, inspect.isfunction)
+        if func.__module__ == database.__name__ and not name.startswith('_')
+        and (inspect.iscoroutinefunction(func) or name.startswith('iter_'))
+    }
+    assert public - NOT_QUERIES - called == set()
+
+
+def test_no_full_table_scans(db_path):
+    statements = asyncio.run(_collect(_calls()))
+    queries = sorted({sql for sql in statements if _DML_RE.match(sql)})
+    assert queries
+
+    problems = []
+    with sqlite3.connect(db_path) as conn:
+        for sql in queries:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+            scans = [detail for detail in plan if _BARE_SCAN_RE.match(detail)]
+            if scans:
+                problems.append(f"{' '.join(sql.split())}\n    {'; '.join(plan)}")
+    assert not problems, 'Запросы без индекса:\n' + '\n'.join(problems)
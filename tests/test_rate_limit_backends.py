@@ -0,0 +1,59 @@
+"""
+Хранилища rate limiter: общий лимит для нескольких процессов с
+RATE_LIMIT_BACKEND=sqlite и одним файлом RATE_LIMIT_DB_PATH.
+"""
+import asyncio
+import multiprocessing
+
+import pytest
+
+import config
+from middleware.rate_limit_backends import RateLimitBackend, create_backend
+
+PROCESSES = 4
+CHECKS_PER_PROCESS = 20
+PER_MINUTE = 20
+USER_ID = 42
+
+
+def _hammer(barrier, results):
+    """Процесс бота: хранилище из окружения, CHECKS_PER_PROCESS проверок одного пользователя"""
+    # Лимит в секунду не мешает: общий результат определяется только лимитом в минуту
+    backend = create_backend(config.RATE_LIMIT_BACKEND, path=config.RATE_LIMIT_DB_PATH,
+                             per_second=1000, per_minute=PER_MINUTE, block_duration=60, cost_budget=1000)
+
+    async def run() -> int:
+        allowed = 0
+        for _ in range(CHECKS_PER_PROCESS):
+            allowed += (await backend.check(USER_ID)).allowed
+        return allowed
+
+    try:
+        barrier.wait()
+        results.put(asyncio.run(run()))
+    finally:
+        backend.close()
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        RateLimitBackend(per_second=3, per_minute=20, block_duration=60, cost_budget=60)
+
+
+def test_sqlite_limit_shared_between_processes(tmp_path, monkeypatch):
+    # Новые процессы (spawn) читают config из окружения заново
+    monkeypatch.setenv('RATE_LIMIT_BACKEND', 'sqlite')
+    monkeypatch.setenv('RATE_LIMIT_DB_PATH', str(tmp_path / 'rate_limits.db'))
+    ctx = multiprocessing.get_context('spawn')
+    barrier = ctx.Barrier(PROCESSES)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=_hammer, args=(barrier, results)) for _ in range(PROCESSES)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=30)
+        assert process.exitcode == 0
+
+    allowed = [results.get(timeout=1) for _ in processes]
+    # С хранилищем в памяти каждый процесс пропустил бы по PER_MINUTE
+    assert sum(allowed) == PER_MINUTE
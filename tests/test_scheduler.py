@@ -0,0 +1,249 @@
+"""
+Планировщик напоминаний на виртуальных часах: каждое напоминание
+уходит ровно в своё scheduled_at, планирование на завтра идёт по тем же
+часам, а более раннее новое напоминание будит спящий цикл.
+"""
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import database
+import scheduler
+from scheduler import ReminderDispatcher, ReminderScheduler
+
+
+class FakeClock:
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+class FakeBot:
+    """Запоминает (время по часам, chat_id, текст) каждого отправленного сообщения"""
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.sent: list[tuple[datetime, int, str]] = []
+
+    async def send_message(self, chat_id: int, text: str, **kwargs):
+        self.sent.append((self.clock(), chat_id, text))
+
+
+@pytest.fixture(autouse=True)
+def reminder_listeners(monkeypatch):
+    """Подписчики на новые напоминания — свои у каждого теста"""
+    monkeypatch.setattr(database, '_reminder_listeners', [])
+
+
+def _make_scheduler(clock: FakeClock) -> tuple[ReminderScheduler, FakeBot]:
+    bot = FakeBot(clock)
+    reminder_scheduler = ReminderScheduler(bot, clock=clock)
+    # Как в run(): созданные напоминания сразу попадают в очередь, даже когда тест вызывает tick() сам
+    database.add_reminder_listener(reminder_scheduler.push)
+    # Без реальных пауз между сообщениями — время в тесте виртуальное
+    reminder_scheduler.dispatcher = ReminderDispatcher(bot, rate=10_000, chat_interval=0)
+    return reminder_scheduler, bot
+
+
+async def _create_appointment(user_id: int, day: str, at: str) -> int:
+    return await database.create_appointment(user_id, 'Консультация', f'Клиент {user_id}', '+79990000000',
+                                             appointment_date=day, appointment_time=at)
+
+
+def test_reminders_sent_at_scheduled_time(db_path):
+    async def main():
+        await _create_appointment(100, '2030-01-02', '12:00')
+        await _create_appointment(200, '2030-01-02', '15:30')
+
+        clock = FakeClock(datetime(2030, 1, 1, 9, 0))
+        reminder_scheduler, bot = _make_scheduler(clock)
+        await reminder_scheduler.load()
+
+        # Цикл run() без ожидания: часы переводятся ровно на время сна
+        end = datetime(2030, 1, 2, 16, 0)
+        while clock.now < end:
+            delay = await reminder_scheduler.tick()
+            clock.now += timedelta(seconds=max(delay, 1))
+        return bot.sent
+
+    sent = asyncio.run(main())
+    assert [(at, chat_id) for at, chat_id, _ in sent] == [
+        (datetime(2030, 1, 1, 18, 0), 100),
+        (datetime(2030, 1, 1, 18, 0), 200),
+        (datetime(2030, 1, 2, 11, 0), 100),
+        (datetime(2030, 1, 2, 14, 30), 200),
+    ]
+    assert 'на завтра' in sent[0][2]
+    assert 'через час' in sent[2][2]
+
+
+def test_planning_uses_scheduler_clock(db_path):
+    async def main():
+        await _create_appointment(100, '2030-01-02', '12:00')
+        clock = FakeClock(datetime(2030, 1, 1, 19, 0))
+        reminder_scheduler, _ = _make_scheduler(clock)
+        await reminder_scheduler.tick()
+        return reminder_scheduler, await database.get_scheduled_reminders()
+
+    reminder_scheduler, reminders = asyncio.run(main())
+    # После 18:00 напоминание за день ставится через 5 минут по часам планировщика
+    assert [r['scheduled_at'] for r in reminders] == ['2030-01-01T19:05:00', '2030-01-02T11:00:00']
+    assert len(reminder_scheduler) == 2
+
+
+def test_earlier_reminder_wakes_loop(db_path):
+    async def main():
+        appointment_id = await _create_appointment(100, '2030-01-05', '12:00')
+        clock = FakeClock(datetime(2030, 1, 1, 9, 0))
+        reminder_scheduler, bot = _make_scheduler(clock)
+        await database.create_reminder(appointment_id, 'day_before', datetime(2030, 1, 1, 11, 0))
+
+        reminder_scheduler.task = asyncio.create_task(reminder_scheduler.run())
+        try:
+            # Цикл уснул до ближайшего напоминания (на два часа реального времени)
+            while reminder_scheduler.last_tick is None or reminder_scheduler.busy:
+                await asyncio.sleep(0.01)
+            assert len(reminder_scheduler) == 1
+
+            # Новое напоминание раньше всех в очереди и уже наступило — цикл просыпается сразу
+            await database.create_reminder(appointment_id, 'hour_before', clock.now)
+            async with asyncio.timeout(2):
+                while not bot.sent:
+                    await asyncio.sleep(0.01)
+            return bot.sent, len(reminder_scheduler)
+        finally:
+            reminder_scheduler.task.cancel()
+            await asyncio.gather(reminder_scheduler.task, return_exceptions=True)
+
+    sent, queued = asyncio.run(main())
+    assert [(at, chat_id) for at, chat_id, _ in sent] == [(datetime(2030, 1, 1, 9, 0), 100)]
+    assert 'через час' in sent[0][2]
+    assert queued == 1
+
+
+def test_failed_delivery_is_requeued(db_path, monkeypatch):
+    async def main():
+        appointment_id = await _create_appointment(100, '2030-01-05', '12:00')
+        clock = FakeClock(datetime(2030, 1, 1, 9, 0))
+        reminder_scheduler, bot = _make_scheduler(clock)
+        await database.create_reminder(appointment_id, 'day_before', datetime(2030, 1, 1, 9, 0))
+        await reminder_scheduler.load()
+
+        get_reminders_by_ids = scheduler.get_reminders_by_ids
+
+        async def broken(reminder_ids):
+            raise RuntimeError('database is locked')
+
+        monkeypatch.setattr(scheduler, 'get_reminders_by_ids', broken)
+        with pytest.raises(RuntimeError):
+            await reminder_scheduler.tick()
+        assert len(reminder_scheduler) == 1 and not bot.sent
+
+        monkeypatch.setattr(scheduler, 'get_reminders_by_ids', get_reminders_by_ids)
+        await reminder_scheduler.tick()
+        return bot.sent, len(reminder_scheduler)
+
+    sent, queued = asyncio.run(main())
+    assert len(sent) == 1
+    assert queued == 0
+
+
+def test_dispatcher_keeps_results_when_flush_fails(db_path, monkeypatch):
+    async def main():
+        reminder_ids = []
+        for user_id in range(100, 105):
+            appointment_id = await _create_appointment(user_id, '2030-01-05', '12:00')
+            reminder_ids.append(await database.create_reminder(appointment_id, 'day_before', datetime(2030, 1, 1)))
+
+        mark_reminders_sent = scheduler.mark_reminders_sent
+        calls = []
+
+        async def flaky(results):
+            calls.append(len(results))
+            if len(calls) == 1:
+                raise RuntimeError('database is locked')
+            await mark_reminders_sent(results)
+
+        monkeypatch.setattr(scheduler, 'mark_reminders_sent', flaky)
+        bot = FakeBot(FakeClock(datetime(2030, 1, 1)))
+        dispatcher = ReminderDispatcher(bot, concurrency=2, rate=10_000, chat_interval=0, flush_size=2)
+        await dispatcher.dispatch(await database.get_reminders_by_ids(reminder_ids))
+        return bot.sent, sum(calls[1:]), await database.get_scheduled_reminders()
+
+    sent, written, pending = asyncio.run(main())
+    assert len(sent) == 5
+    # Результаты неудачной записи ушли в следующую, в БД ничего не осталось pending
+    assert written == 5
+    assert pending == []
+
+
+def test_health_reports_stuck_tick(db_path):
+    class HangingBot(FakeBot):
+        async def send_message(self, chat_id: int, text: str, **kwargs):
+            self.sent.append((self.clock(), chat_id, text))
+            await asyncio.Event().wait()
+
+    async def main():
+        appointment_id = await _create_appointment(100, '2030-01-05', '12:00')
+        await database.create_reminder(appointment_id, 'day_before', datetime(2030, 1, 1, 9, 0))
+        clock = FakeClock(datetime(2030, 1, 1, 9, 0))
+        bot = HangingBot(clock)
+        reminder_scheduler = ReminderScheduler(bot, clock=clock)
+        reminder_scheduler.dispatcher = ReminderDispatcher(bot, rate=10_000, chat_interval=0)
+
+        reminder_scheduler.task = asyncio.create_task(reminder_scheduler.run())
+        try:
+            async with asyncio.timeout(2):
+                while not bot.sent:
+                    await asyncio.sleep(0.01)
+            max_busy = timedelta(minutes=15)
+            healthy = reminder_scheduler.health(max_busy=max_busy)
+            # Отправка так и не завершилась
+            clock.now += max_busy + timedelta(seconds=1)
+            return healthy, reminder_scheduler.health(max_busy=max_busy)
+        finally:
+            reminder_scheduler.task.cancel()
+            await asyncio.gather(reminder_scheduler.task, return_exceptions=True)
+
+    healthy, stuck = asyncio.run(main())
+    assert healthy['ok'] and not healthy['stuck']
+    assert not stuck['ok'] and stuck['stuck']
+    assert stuck['busy_seconds'] == 901
+
+
+def test_cancelled_appointment_reminders_are_skipped(db_path):
+    async def main():
+        cancelled = await _create_appointment(100, '2030-01-05', '12:00')
+        active = await _create_appointment(200, '2030-01-05', '12:00')
+        for appointment_id in (cancelled, active):
+            await database.create_reminder(appointment_id, 'day_before', datetime(2030, 1, 4, 12, 0))
+        await database.update_appointment_status(cancelled, 'cancelled')
+
+        clock = FakeClock(datetime(2030, 1, 1, 9, 0))
+        reminder_scheduler, _ = _make_scheduler(clock)
+        await reminder_scheduler.load()
+        return await database.get_scheduled_reminders(), len(reminder_scheduler)
+
+    reminders, queued = asyncio.run(main())
+    # После перезапуска в очередь попадает только напоминание действующей записи
+    assert len(reminders) == 1
+    assert queued == 1
+
+
+def test_bulk_planning_notifies_listeners(db_path):
+    async def main():
+        await _create_appointment(100, '2030-01-02', '12:00')
+        await _create_appointment(200, '2030-01-02', None)
+        received = []
+        database.add_reminder_listener(lambda reminder_id, scheduled_at: received.append((reminder_id, scheduled_at)))
+        first = await database.create_reminders_for_date(date(2030, 1, 2), datetime(2030, 1, 1, 18, 0))
+        # Повторное планирование ничего не создаёт и никого не уведомляет
+        second = await database.create_reminders_for_date(date(2030, 1, 2), datetime(2030, 1, 1, 18, 0))
+        return first, second, received, await database.get_scheduled_reminders()
+
+    first, second, received, reminders = asyncio.run(main())
+    assert (first, second) == (3, 0)
+    assert sorted(received) == [(r['id'], datetime.fromisoformat(r['scheduled_at'])) for r in reminders]
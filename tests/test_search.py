@@ -0,0 +1,36 @@
+"""
+Поиск услуг по каталогу data/catalog.json: названия и темы находятся,
+служебные слова и переписка «ни о чём» не дают случайных результатов.
+"""
+import pytest
+
+from data.catalog import load_catalog
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    return load_catalog()
+
+
+def test_every_service_finds_itself(catalog):
+    for service in catalog.services.values():
+        assert catalog.search(service.name)[0] == service
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('товарный знак', '🏷️ Регистрация товарного знака'),
+    ('товарного знака', '🏷️ Регистрация товарного знака'),
+    ('недвижимость', '🏠 Сделки с недвижимостью'),
+    ('ооо', '📝 Регистрация ООО'),
+    ('тов', '🏷️ Регистрация товарного знака'),
+])
+def test_finds_by_topic(catalog, query, expected):
+    assert catalog.search(query)[0].name == expected
+
+
+@pytest.mark.parametrize('query', [
+    'на', 'у меня вопрос по работе', 'как дела', 'добрый день',
+    'здравствуйте, подскажите пожалуйста', 'можно вопрос', 'что делать',
+])
+def test_filler_text_finds_nothing(catalog, query):
+    assert catalog.search(query) == []
@@ -0,0 +1,52 @@
+"""
+Статистика по дням и неделям: created_at хранится в UTC, а границы суток
+и недель (с понедельника) считаются по местному времени.
+"""
+import asyncio
+import sqlite3
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+import pytest
+
+import database
+from handlers.admin import format_statistics
+
+
+@pytest.fixture
+def moscow_time(monkeypatch):
+    """Местное время UTC+3: полночь по местному времени — 21:00 UTC накануне"""
+    monkeypatch.setenv('TZ', 'Europe/Moscow')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _set_created_at(db_path: str, appointment_id: int, expression: str):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(f"UPDATE appointments SET created_at = {expression} WHERE id = ?", (appointment_id,))
+
+
+def test_days_and_weeks_use_local_time(db_path, moscow_time):
+    async def main():
+        ids = [await database.create_appointment(user_id, 'Консультация', 'Клиент', '+79990000000')
+               for user_id in (1, 2)]
+        # Первая заявка — ровно в местную полночь, вторая — за секунду до неё
+        _set_created_at(db_path, ids[0], "datetime('now', 'localtime', 'start of day', 'utc')")
+        _set_created_at(db_path, ids[1], "datetime('now', 'localtime', 'start of day', '-1 seconds', 'utc')")
+        return await database.get_statistics(days=1, weeks=1), await database.get_statistics(days=2, weeks=2)
+
+    today_only, two_days = asyncio.run(main())
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+    monday = today - timedelta(days=today.weekday())
+    weeks = Counter(day - timedelta(days=day.weekday()) for day in (today, yesterday))
+
+    assert today_only['by_day'] == {today.isoformat(): 1}
+    assert two_days['by_day'] == {today.isoformat(): 1, yesterday.isoformat(): 1}
+    # Неделя начинается с понедельника по местному времени
+    assert today_only['by_week'] == {monday.isoformat(): weeks[monday]}
+    assert two_days['by_week'] == {week.isoformat(): count for week, count in weeks.items()}
+    assert f"с {monday.strftime('%d.%m.%Y')}: {weeks[monday]}" in format_statistics(two_days, days=2)
@@ -0,0 +1,273 @@
+"""
+Webhook при параллельной обработке update: PTB сразу забирает update из
+update_queue, поэтому предел WEBHOOK_MAX_PENDING должен считаться по
+принятым и ещё не обработанным update, а не по размеру очереди. Плюс
+задержка от POST до обработчика и жизненный цикл run_webhook.
+"""
+import asyncio
+import json
+import os
+import signal
+import statistics
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from telegram import Update
+from telegram.error import NetworkError
+from telegram.ext import Application, TypeHandler
+from telegram.request import BaseRequest
+
+import webhook
+from update_processor import UserOrderedUpdateProcessor
+
+MAX_PENDING = 5
+
+
+class FakeRequest(BaseRequest):
+    """Bot API без сети: любой метод отвечает как getMe"""
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_request(self, url, method, request_data=None, **kwargs):
+        return 200, json.dumps({
+            'ok': True,
+            'result': {'id': 1, 'is_bot': True, 'first_name': 'Bot', 'username': 'test_bot'},
+        }).encode()
+
+
+class FailingWebhookRequest(FakeRequest):
+    """setWebhook завершается ошибкой сети"""
+
+    async def do_request(self, url, method, request_data=None, **kwargs):
+        if url.endswith('/setWebhook'):
+            raise NetworkError('setWebhook недоступен')
+        return await super().do_request(url, method, request_data, **kwargs)
+
+
+def _build_application(request: BaseRequest, processor=None) -> Application:
+    builder = Application.builder().token('1:test').request(request).get_updates_request(FakeRequest())
+    if processor is not None:
+        builder = builder.concurrent_updates(processor)
+    return builder.updater(None).build()
+
+
+def _update(update_id: int) -> dict:
+    user = {'id': 1000 + update_id, 'is_bot': False, 'first_name': 'Клиент'}
+    return {
+        'update_id': update_id,
+        'message': {'message_id': update_id, 'date': 0, 'chat': {**user, 'type': 'private'},
+                    'from': user, 'text': 'привет'},
+    }
+
+
+def test_webhook_rejects_when_processing_is_full(monkeypatch):
+    monkeypatch.setattr(webhook, 'WEBHOOK_PATH', '/webhook')
+    monkeypatch.setattr(webhook, 'WEBHOOK_MAX_PENDING', MAX_PENDING)
+
+    async def main():
+        release = asyncio.Event()
+
+        async def slow_handler(update, context):
+            await release.wait()
+
+        processor = UserOrderedUpdateProcessor(concurrency=16, max_pending=1000)
+        application = _build_application(FakeRequest(), processor)
+        application.add_handler(TypeHandler(Update, slow_handler))
+
+        app = web.Application()
+        webhook.add_webhook_route(app, application)
+        async with application:
+            await application.start()
+            client = TestClient(TestServer(app))
+            await client.start_server()
+            try:
+                statuses = []
+                for update_id in range(1, 21):
+                    response = await client.post('/webhook', json=_update(update_id))
+                    statuses.append(response.status)
+                # Update уже забраны из очереди, но ещё обрабатываются
+                queued, in_processor = application.update_queue.qsize(), processor.pending
+
+                release.set()
+                async with asyncio.timeout(2):
+                    while processor.pending:
+                        await asyncio.sleep(0.01)
+                response = await client.post('/webhook', json=_update(21))
+                statuses.append(response.status)
+            finally:
+                release.set()
+                await client.close()
+                await application.stop()
+        return statuses, queued, in_processor
+
+    statuses, queued, in_processor = asyncio.run(main())
+    assert statuses[:MAX_PENDING] == [200] * MAX_PENDING
+    assert statuses[MAX_PENDING:20] == [503] * (20 - MAX_PENDING)
+    assert queued == 0 and in_processor == MAX_PENDING
+    # После обработки webhook снова принимает update
+    assert statuses[20] == 200
+
+
+def test_flooding_user_does_not_block_others(monkeypatch):
+    monkeypatch.setattr(webhook, 'WEBHOOK_PATH', '/webhook')
+    monkeypatch.setattr(webhook, 'WEBHOOK_MAX_PENDING', MAX_PENDING)
+    per_user = 3
+
+    async def main():
+        release = asyncio.Event()
+        handled = []
+
+        async def handler(update, context):
+            # Обработчики пользователя A висят, пока тест их не отпустит
+            if update.effective_user.id == 1:
+                await release.wait()
+            handled.append(update.effective_user.id)
+
+        processor = UserOrderedUpdateProcessor(concurrency=16, max_pending=1000, max_per_user=per_user)
+        application = _build_application(FakeRequest(), processor)
+        application.add_handler(TypeHandler(Update, handler))
+
+        app = web.Application()
+        webhook.add_webhook_route(app, application)
+        async with application:
+            await application.start()
+            client = TestClient(TestServer(app))
+            await client.start_server()
+            try:
+                flood = []
+                for update_id in range(1, 21):
+                    update = _update(update_id)
+                    update['message']['from']['id'] = update['message']['chat']['id'] = 1
+                    response = await client.post('/webhook', json=update)
+                    flood.append(response.status)
+                async with asyncio.timeout(2):
+                    while processor.dropped < 20 - per_user:
+                        await asyncio.sleep(0.01)
+
+                # Очередь A заполнена, но остальные пользователи принимаются и обрабатываются
+                response = await client.post('/webhook', json=_update(100))
+                async with asyncio.timeout(2):
+                    while 1100 not in handled:
+                        await asyncio.sleep(0.01)
+                other = response.status
+
+                release.set()
+                async with asyncio.timeout(2):
+                    while processor.pending:
+                        await asyncio.sleep(0.01)
+            finally:
+                release.set()
+                await client.close()
+                await application.stop()
+        return flood, other, handled, processor.dropped
+
+    flood, other, handled, dropped = asyncio.run(main())
+    assert flood == [200] * 20
+    assert other == 200
+    # У A обработаны первые per_user update, остальные отброшены
+    assert handled == [1100] + [1] * per_user
+    assert dropped == 20 - per_user
+
+
+def test_webhook_latency(monkeypatch):
+    count = 200
+    monkeypatch.setattr(webhook, 'WEBHOOK_PATH', '/webhook')
+    monkeypatch.setattr(webhook, 'WEBHOOK_MAX_PENDING', count)
+
+    async def main():
+        handled_at = {}
+
+        async def record(update, context):
+            handled_at[update.update_id] = time.perf_counter()
+
+        processor = UserOrderedUpdateProcessor(concurrency=16, max_pending=1000)
+        application = _build_application(FakeRequest(), processor)
+        application.add_handler(TypeHandler(Update, record))
+
+        app = web.Application()
+        webhook.add_webhook_route(app, application)
+        posted_at = {}
+        async with application:
+            await application.start()
+            client = TestClient(TestServer(app))
+            await client.start_server()
+            try:
+                for update_id in range(1, count + 1):
+                    posted_at[update_id] = time.perf_counter()
+                    response = await client.post('/webhook', json=_update(update_id))
+                    assert response.status == 200
+                async with asyncio.timeout(5):
+                    while len(handled_at) < count:
+                        await asyncio.sleep(0.01)
+            finally:
+                await client.close()
+                await application.stop()
+        return posted_at, handled_at
+
+    posted_at, handled_at = asyncio.run(main())
+    # Каждый принятый update дошёл до обработчика
+    assert sorted(handled_at) == sorted(posted_at)
+    latencies = sorted((handled_at[i] - posted_at[i]) * 1000 for i in posted_at)
+    p50, p90, p99 = (statistics.quantiles(latencies, n=100)[k - 1] for k in (50, 90, 99))
+    print(f"\nwebhook → обработчик, {count} update: p50 {p50:.2f} мс, p90 {p90:.2f} мс, "
+          f"p99 {p99:.2f} мс, max {latencies[-1]:.2f} мс")
+
+
+def _run_webhook(request: BaseRequest, stop_when_running: bool) -> tuple[list[str], BaseException | None]:
+    """Запустить run_webhook; вернуть порядок вызовов хуков и ошибку, если была"""
+    events = []
+    application = _build_application(request)
+
+    async def post_init(app):
+        events.append('post_init')
+
+    async def post_stop(app):
+        events.append(f'post_stop running={app.running}')
+
+    async def post_shutdown(app):
+        events.append('post_shutdown')
+
+    application.post_init = post_init
+    application.post_stop = post_stop
+    application.post_shutdown = post_shutdown
+
+    async def main():
+        async def stop():
+            # Остановка по SIGTERM, как в продакшене
+            while not application.running:
+                await asyncio.sleep(0.01)
+            events.append('running')
+            os.kill(os.getpid(), signal.SIGTERM)
+
+        stopper = asyncio.create_task(stop()) if stop_when_running else None
+        try:
+            await webhook.run_webhook(application)
+        except Exception as e:
+            return e
+        finally:
+            if stopper:
+                await stopper
+            # Обработчики сигналов сняты: снимать больше нечего
+            loop = asyncio.get_running_loop()
+            events.extend(f'handler {sig.name}' for sig in (signal.SIGINT, signal.SIGTERM)
+                          if loop.remove_signal_handler(sig))
+
+    return events, asyncio.run(main())
+
+
+def test_run_webhook_stops_on_signal():
+    events, error = _run_webhook(FakeRequest(), stop_when_running=True)
+    assert error is None
+    assert events == ['post_init', 'running', 'post_stop running=False', 'post_shutdown']
+
+
+def test_run_webhook_cleans_up_when_set_webhook_fails():
+    events, error = _run_webhook(FailingWebhookRequest(), stop_when_running=False)
+    assert isinstance(error, NetworkError)
+    # Application не запустился, но хуки остановки отработали и сигналы сняты
+    assert events == ['post_init', 'post_stop running=False', 'post_shutdown']
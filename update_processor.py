@@ -0,0 +1,160 @@
+"""
+Параллельная обработка update с сохранением порядка для каждого пользователя
+
+Update разных пользователей обрабатываются одновременно (до
+UPDATE_CONCURRENCY штук), а update одного пользователя — строго по очереди:
+на этом держатся диалоги на user_data (simple_appointment, admin_reply).
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable
+
+from telegram.ext import BaseUpdateProcessor
+
+from config import UPDATE_CONCURRENCY, UPDATE_MAX_PENDING, UPDATE_MAX_PER_USER
+from metrics import update_queue_wait, register_gauge
+
+logger = logging.getLogger(__name__)
+
+
+class UserOrderedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Обработчик update с упорядочиванием по пользователю.
+
+    Для каждого пользователя хранится future последнего принятого update:
+    новый update ждёт его завершения и сам становится «хвостом» очереди.
+    Запись удаляется, когда обработан последний update пользователя, так что
+    словарь не растёт. Ожидающие своей очереди update не занимают слоты:
+    одновременно выполняется не больше concurrency обработчиков.
+
+    max_pending — размер семафора PTB: сколько update одновременно внутри
+    do_process_update (включая ожидающие очереди пользователя). Число
+    принятых update он не ограничивает: PTB сразу забирает каждый update из
+    update_queue и создаёт для него задачу, которая ждёт семафор. Поэтому
+    pending считает все принятые и ещё не обработанные update — по нему
+    webhook решает, принимать ли новые.
+
+    max_per_user — сколько принятых и не обработанных update одного
+    пользователя держать: сверх этого update отбрасываются сразу, не занимая
+    места в pending, иначе один пользователь, засыпающий бота сообщениями,
+    упирал бы webhook в WEBHOOK_MAX_PENDING для всех остальных.
+    """
+
+    def __init__(self, concurrency: int = UPDATE_CONCURRENCY, max_pending: int = UPDATE_MAX_PENDING,
+                 max_per_user: int = UPDATE_MAX_PER_USER):
+        super().__init__(max_concurrent_updates=max(max_pending, concurrency, 2))
+        self.concurrency = concurrency
+        self.max_per_user = max(max_per_user, 1)
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tails: dict[int, asyncio.Future] = {}
+        self._queued: dict[int, int] = {}
+        self._flooding: set[int] = set()
+        self.active = 0
+        self.pending = 0
+        self.dropped = 0
+
+    @staticmethod
+    def _key(update: object) -> int | None:
+        user = getattr(update, 'effective_user', None)
+        if user is not None:
+            return user.id
+        chat = getattr(update, 'effective_chat', None)
+        return chat.id if chat is not None else None
+
+    async def process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = self._key(update)
+        queued = self._queued.get(key, 0) if key is not None else 0
+        if queued >= self.max_per_user:
+            # Предупреждаем один раз, пока очередь пользователя не разберётся
+            if key not in self._flooding:
+                self._flooding.add(key)
+                logger.warning(f"Пользователь {key}: больше {self.max_per_user} update в очереди, лишние отбрасываются")
+            self.dropped += 1
+            coroutine.close()
+            return
+
+        # Считаем update с момента, когда PTB создал для него задачу, — ещё до семафора
+        self.pending += 1
+        if key is not None:
+            self._queued[key] = queued + 1
+        try:
+            await super().process_update(update, coroutine)
+        finally:
+            self.pending -= 1
+            if key is not None:
+                if self._queued[key] > 1:
+                    self._queued[key] -= 1
+                else:
+                    del self._queued[key]
+                    self._flooding.discard(key)
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        received = time.perf_counter()
+        key = self._key(update)
+
+        # Встаём в очередь пользователя синхронно, до первого await —
+        # так порядок совпадает с порядком поступления update
+        previous = done = None
+        if key is not None:
+            previous = self._tails.get(key)
+            done = asyncio.get_running_loop().create_future()
+            self._tails[key] = done
+
+        started = False
+        try:
+            if previous is not None:
+                await previous
+            async with self._slots:
+                update_queue_wait.observe(time.perf_counter() - received)
+                started = True
+                self.active += 1
+                try:
+                    await coroutine
+                finally:
+                    self.active -= 1
+        finally:
+            if not started:
+                # Обработка отменена до запуска — закрываем корутину, чтобы не было предупреждений
+                coroutine.close()
+            if done is not None:
+                if not done.done():
+                    done.set_result(None)
+                if self._tails.get(key) is done:
+                    del self._tails[key]
+
+    def stats(self) -> dict:
+        return {
+            'concurrency': self.concurrency,
+            'active': self.active,
+            'pending': self.pending,
+            'dropped': self.dropped,
+            'users_in_progress': len(self._tails),
+        }
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+
+# Текущий обработчик (для мониторинга)
+update_processor: UserOrderedUpdateProcessor | None = None
+
+register_gauge('bot_updates_in_progress', 'Обработчики update, выполняющиеся сейчас',
+               lambda: update_processor.active if update_processor else None)
+register_gauge('bot_updates_pending', 'Принятые и ещё не обработанные update',
+               lambda: update_processor.pending if update_processor else None)
+register_gauge('bot_updates_dropped_total', 'Update, отброшенные сверх UPDATE_MAX_PER_USER на пользователя',
+               lambda: update_processor.dropped if update_processor else None, kind='counter')
+register_gauge('bot_users_in_progress', 'Пользователи с update в обработке или в очереди',
+               lambda: len(update_processor._tails) if update_processor else None)
+
+
+def create_update_processor() -> UserOrderedUpdateProcessor:
+    """Создать обработчик update для ApplicationBuilder.concurrent_updates()"""
+    global update_processor
+    update_processor = UserOrderedUpdateProcessor()
+    logger.info(f"Параллельная обработка update: до {update_processor.concurrency} одновременно")
+    return update_processor
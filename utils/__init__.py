@@ -1,7 +1,9 @@
 from .validators import validate_phone, normalize_phone, validate_email
 from .export import export_appointments_csv, export_questions_csv, format_history_entry
+from .text import split_message, normalize_label, TELEGRAM_MESSAGE_LIMIT
 
 __all__ = [
     'validate_phone', 'normalize_phone', 'validate_email',
-    'export_appointments_csv', 'export_questions_csv', 'format_history_entry'
+    'export_appointments_csv', 'export_questions_csv', 'format_history_entry',
+    'split_message', 'normalize_label', 'TELEGRAM_MESSAGE_LIMIT'
 ]
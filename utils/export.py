@@ -1,12 +1,28 @@
 """
 Экспорт данных в CSV для администраторов
+
+Строки читаются из БД порциями и сразу пишутся в SpooledTemporaryFile уже
+закодированными в UTF-8: небольшой файл остаётся в памяти, большой уходит
+на диск, так что память не растёт с размером таблицы. Запись идёт в
+отдельном потоке, чтобы не останавливать event loop. Файл нужно закрыть
+после отправки.
 """
+import asyncio
 import csv
 import io
+from contextlib import aclosing
 from datetime import date, datetime
-from typing import List, Dict, Optional
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator, Callable, Dict
+
+from database import iter_appointments_for_export, iter_questions_for_export
 
-from database import get_all_appointments, get_all_questions
+# Сколько строк читать из БД за раз
+EXPORT_CHUNK_ROWS = 1000
+# До какого размера файл экспорта держится в памяти, дальше — временный файл на диске
+EXPORT_SPOOL_MAX_SIZE = 1024 * 1024
+# Telegram принимает от ботов файлы до 50 МБ
+TELEGRAM_UPLOAD_LIMIT = 50 * 1024 * 1024
 
 
 STATUS_NAMES = {
@@ -21,24 +37,62 @@ STATUS_NAMES = {
 }
 
 
+async def _write_csv(header: list, chunks: AsyncIterator[list], convert: Callable) -> SpooledTemporaryFile:
+    """Записать CSV (с BOM для Excel) во временный файл порциями; файл возвращается в начало"""
+    file = SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE)
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+
+        def write_rows(rows: list):
+            writer.writerows(map(convert, rows))
+            file.write(buffer.getvalue().encode('utf-8'))
+            buffer.seek(0)
+            buffer.truncate()
+
+        file.write('\ufeff'.encode('utf-8'))  # BOM для Excel
+        writer.writerow(header)
+        async with aclosing(chunks):
+            async for rows in chunks:
+                # Форматирование и запись порции — в потоке: после EXPORT_SPOOL_MAX_SIZE
+                # файл переносится на диск, и запись не должна останавливать event loop
+                await asyncio.to_thread(write_rows, rows)
+        file.write(buffer.getvalue().encode('utf-8'))
+    except BaseException:
+        file.close()
+        raise
+
+    file.seek(0)
+    return file
+
+
+def _appointment_row(row) -> list:
+    # id, created_at, client_name, client_phone, client_email, service_type,
+    # appointment_date, appointment_time, comment, status
+    row = list(row)
+    row[9] = STATUS_NAMES.get(row[9], row[9])
+    return row
+
+
+def _question_row(row) -> list:
+    # id, created_at, client_name, client_phone, question_text, status
+    row = list(row)
+    row[5] = STATUS_NAMES.get(row[5], row[5])
+    return row
+
+
 async def export_appointments_csv(
     status: str = None,
     date_from: date = None,
     date_to: date = None
-) -> tuple[io.BytesIO, str]:
+) -> tuple[SpooledTemporaryFile, str]:
     """
     Экспорт заявок в CSV файл
 
     Returns:
-        tuple: (BytesIO объект с данными, имя файла)
+        tuple: (временный файл с данными — закрыть после отправки, имя файла)
     """
-    appointments = await get_all_appointments(status, date_from, date_to)
-
-    output = io.StringIO()
-    writer = csv.writer(output, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-
-    # Заголовки
-    writer.writerow([
+    header = [
         'ID',
         'Дата создания',
         'ФИО клиента',
@@ -49,81 +103,47 @@ async def export_appointments_csv(
         'Время записи',
         'Комментарий',
         'Статус'
-    ])
-
-    # Данные
-    for apt in appointments:
-        writer.writerow([
-            apt['id'],
-            apt.get('created_at', ''),
-            apt['client_name'],
-            apt['client_phone'],
-            apt.get('client_email', ''),
-            apt['service_type'],
-            apt.get('appointment_date', ''),
-            apt.get('appointment_time', ''),
-            apt.get('comment', ''),
-            STATUS_NAMES.get(apt['status'], apt['status'])
-        ])
-
-    # Конвертируем в bytes с BOM для корректного открытия в Excel
-    content = output.getvalue()
-    bytes_io = io.BytesIO()
-    bytes_io.write('\ufeff'.encode('utf-8'))  # BOM для Excel
-    bytes_io.write(content.encode('utf-8'))
-    bytes_io.seek(0)
+    ]
+    chunks = iter_appointments_for_export(status, date_from, date_to, chunk_size=EXPORT_CHUNK_ROWS)
+    file = await _write_csv(header, chunks, _appointment_row)
 
     # Генерируем имя файла
     today = datetime.now().strftime('%Y-%m-%d')
     filename = f"appointments_{today}.csv"
 
-    return bytes_io, filename
+    return file, filename
 
 
-async def export_questions_csv(status: str = None) -> tuple[io.BytesIO, str]:
+async def export_questions_csv(status: str = None) -> tuple[SpooledTemporaryFile, str]:
     """
     Экспорт вопросов в CSV файл
 
     Returns:
-        tuple: (BytesIO объект с данными, имя файла)
+        tuple: (временный файл с данными — закрыть после отправки, имя файла)
     """
-    questions = await get_all_questions(status)
-
-    output = io.StringIO()
-    writer = csv.writer(output, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-
-    # Заголовки
-    writer.writerow([
+    header = [
         'ID',
         'Дата создания',
         'ФИО клиента',
         'Телефон',
         'Вопрос',
         'Статус'
-    ])
-
-    # Данные
-    for q in questions:
-        writer.writerow([
-            q['id'],
-            q.get('created_at', ''),
-            q.get('client_name', ''),
-            q.get('client_phone', ''),
-            q['question_text'],
-            STATUS_NAMES.get(q['status'], q['status'])
-        ])
-
-    # Конвертируем в bytes с BOM
-    content = output.getvalue()
-    bytes_io = io.BytesIO()
-    bytes_io.write('\ufeff'.encode('utf-8'))
-    bytes_io.write(content.encode('utf-8'))
-    bytes_io.seek(0)
+    ]
+    chunks = iter_questions_for_export(status, chunk_size=EXPORT_CHUNK_ROWS)
+    file = await _write_csv(header, chunks, _question_row)
 
     today = datetime.now().strftime('%Y-%m-%d')
     filename = f"questions_{today}.csv"
 
-    return bytes_io, filename
+    return file, filename
+
+
+def export_size(file) -> int:
+    """Размер файла экспорта в байтах (позиция в файле не меняется)"""
+    position = file.tell()
+    size = file.seek(0, io.SEEK_END)
+    file.seek(position)
+    return size
 
 
 def format_history_entry(entry: Dict) -> str:
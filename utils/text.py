@@ -0,0 +1,49 @@
+"""
+Утилиты для работы с текстом сообщений
+"""
+import re
+
+# Максимальная длина текста одного сообщения в Telegram
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+_SPACES_RE = re.compile(r'\s+')
+
+
+def normalize_label(text: str) -> str:
+    """Убрать вариационные селекторы эмодзи и лишние пробелы"""
+    return _SPACES_RE.sub(' ', text.replace('\ufe0f', '')).strip()
+
+
+def split_message(blocks: list[str], header: str = '', limit: int = TELEGRAM_MESSAGE_LIMIT) -> list[str]:
+    """
+    Собирает блоки текста в сообщения, не превышающие limit символов.
+
+    Блоки не разрываются между сообщениями (кроме блоков длиннее лимита,
+    которые режутся на части). Заголовок добавляется в начало каждого сообщения.
+
+    Возвращает список текстов сообщений.
+    """
+    room = limit - len(header)
+    if room <= 0:
+        raise ValueError("Заголовок длиннее лимита сообщения")
+
+    pages = []
+    current = ''
+    for block in blocks:
+        # Слишком длинный блок режем на куски
+        while len(block) > room:
+            if current:
+                pages.append(header + current)
+                current = ''
+            pages.append(header + block[:room])
+            block = block[room:]
+
+        if len(current) + len(block) > room:
+            pages.append(header + current)
+            current = ''
+        current += block
+
+    if current or not pages:
+        pages.append(header + current)
+
+    return pages
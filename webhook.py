@@ -0,0 +1,117 @@
+"""
+Режим webhook: Telegram присылает update на эндпоинт health check сервера
+
+Включается переменной WEBHOOK_URL. Эндпоинт проверяет секретный токен и
+кладёт update в очередь Application; если уже WEBHOOK_MAX_PENDING update
+приняты и не обработаны, отвечает 503 и Telegram повторит доставку позже.
+"""
+import asyncio
+import hmac
+import logging
+import signal
+from datetime import datetime
+from urllib.parse import urlparse
+
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application
+
+from config import WEBHOOK_URL, WEBHOOK_SECRET, WEBHOOK_MAX_PENDING
+from metrics import register_gauge
+from update_processor import UserOrderedUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+# Путь эндпоинта берём из WEBHOOK_URL, чтобы не задавать его отдельно
+WEBHOOK_PATH = (urlparse(WEBHOOK_URL).path or '/webhook') if WEBHOOK_URL else None
+
+last_webhook_at: datetime | None = None
+webhook_rejected = 0
+
+register_gauge('bot_webhook_rejected_total', 'Update, отклонённые webhook из-за переполненной очереди',
+               lambda: webhook_rejected, kind='counter')
+
+
+def pending_updates(telegram_app: Application) -> int:
+    """
+    Update, принятые и ещё не обработанные. При параллельной обработке PTB
+    сразу забирает update из update_queue и создаёт задачу, поэтому кроме
+    очереди считаем задачи в обработчике update.
+    """
+    pending = telegram_app.update_queue.qsize()
+    processor = telegram_app.update_processor
+    if isinstance(processor, UserOrderedUpdateProcessor):
+        pending += processor.pending
+    return pending
+
+
+def add_webhook_route(app: web.Application, telegram_app: Application):
+    """Добавить эндпоинт webhook в aiohttp-приложение health check сервера"""
+
+    async def webhook_handler(request: web.Request) -> web.Response:
+        global last_webhook_at, webhook_rejected
+        token = request.headers.get('X-Telegram-Bot-Api-Secret-Token', '')
+        if not hmac.compare_digest(token, WEBHOOK_SECRET):
+            logger.warning("Webhook: неверный секретный токен")
+            return web.Response(status=403)
+
+        # Слишком много необработанных update — пусть Telegram повторит позже, а не копим их в памяти
+        if pending_updates(telegram_app) >= WEBHOOK_MAX_PENDING:
+            webhook_rejected += 1
+            return web.Response(status=503)
+
+        try:
+            update = Update.de_json(await request.json(), telegram_app.bot)
+        except Exception as e:
+            logger.warning(f"Webhook: некорректный update: {e}")
+            return web.Response(status=400)
+
+        last_webhook_at = datetime.now()
+        await telegram_app.update_queue.put(update)
+        return web.Response()
+
+    app.router.add_post(WEBHOOK_PATH, webhook_handler)
+    logger.info(f"Webhook эндпоинт: POST {WEBHOOK_PATH}")
+
+
+async def run_webhook(application: Application):
+    """
+    Запустить бота в режиме webhook (аналог run_polling без Updater).
+    Update принимает health check сервер, запущенный в post_init.
+    Как и run_polling, при любой ошибке запуска останавливает Application
+    и вызывает post_stop и post_shutdown.
+    """
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    signals = (signal.SIGINT, signal.SIGTERM)
+    for sig in signals:
+        loop.add_signal_handler(sig, stop_event.set)
+
+    try:
+        async with application:
+            try:
+                if application.post_init:
+                    await application.post_init(application)
+
+                await application.bot.set_webhook(
+                    url=WEBHOOK_URL,
+                    secret_token=WEBHOOK_SECRET,
+                    allowed_updates=Update.ALL_TYPES,
+                    drop_pending_updates=True,  # Игнорируем сообщения, пришедшие пока бот был выключен
+                )
+                await application.start()
+                logger.info(f"Бот принимает обновления через webhook {WEBHOOK_URL}")
+
+                await stop_event.wait()
+            finally:
+                if application.running:
+                    await application.stop()
+                if application.post_stop:
+                    await application.post_stop(application)
+    finally:
+        try:
+            if application.post_shutdown:
+                await application.post_shutdown(application)
+        finally:
+            for sig in signals:
+                loop.remove_signal_handler(sig)